@@ -1,10 +1,44 @@
-import csv
+import heapq
 import json
+import multiprocessing
 import os
+import re
+import threading
+import time
 import zipfile
-from datetime import datetime, timedelta
-from typing import Optional, Iterator, Dict
-from collections import defaultdict
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import partial
+from operator import itemgetter
+from typing import Optional, Iterator, Dict, List, Sequence, Tuple
+
+from network.metrics import REGISTRY
+from storage import columnar, csv_scan, log_sources
+from storage.archiver import BackgroundArchiver
+from storage.backends import writer_class
+from storage.log_index import INDEX_SUFFIX, index_csv, index_path, load_index
+from storage.query_cache import QueryCache
+from storage.readings_store import ReadingsStore
+from storage.stats import percentile_ms
+
+# plik zrotowany, czekający w archive/ na kompresję w tle: <nazwa logu>_<czas>[_<n>].<rozszerzenie>
+PENDING_ARCHIVE = re.compile(r"^(?P<member>.+)_\d{8}_\d{6}(?:_\d+)?(?P<ext>\.csv|\.col)$")
+
+# Trwałość zapisu: "never" - bez fsync (dane w pamięci podręcznej systemu),
+# "interval" - fsync co `fsync_interval_s`, "batch" - fsync po każdej paczce
+FSYNC_POLICIES = ("never", "interval", "batch")
+
+# Metryki zapisu (wspólne dla wszystkich instancji Loggera w procesie)
+ROWS_WRITTEN = REGISTRY.counter("logger_rows_written_total", "Wiersze zapisane do pliku logu")
+FLUSHES = REGISTRY.counter("logger_flushes_total", "Zapisy oczekujących paczek zakończone flush")
+FSYNCS = REGISTRY.counter("logger_fsyncs_total", "Wywołania fsync pliku logu")
+ROTATIONS = REGISTRY.counter("logger_rotations_total", "Rotacje pliku logu")
+FLUSH_SECONDS = REGISTRY.histogram("logger_flush_seconds", "Czas zapisu oczekujących paczek (z flush i fsync)")
+COMMIT_SECONDS = REGISTRY.histogram(
+    "logger_commit_latency_seconds", "Opóźnienie od pierwszego wiersza paczki do jej zapisu"
+)
 
 
 class Logger:
@@ -29,57 +63,237 @@ class Logger:
         self.max_size_mb = config["max_size_mb"]
         self.rotate_after_lines = config.get("rotate_after_lines")
         self.retention_days = config["retention_days"]
+        self.memory_retention_hours = config.get("memory_retention_hours", 12)
+        self.aggregate_windows_hours = config.get("aggregate_windows_hours", [1, 12])
+        self.storage_backend = config.get("storage_backend", "csv")
+        self.writer_class = writer_class(self.storage_backend)
+        # zapis grupowy: bufor trafia do pliku po `buffer_size` wierszach
+        # lub najpóźniej po `flush_interval_ms` od pierwszego wiersza (0 - wyłączone)
+        self.flush_interval_ms = config.get("flush_interval_ms", 200)
+        self.fsync_policy = config.get("fsync", "never")
+        self.fsync_interval = config.get("fsync_interval_s", 1.0)
+        if self.fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Nieznana polityka fsync: {self.fsync_policy} (dostępne: {', '.join(FSYNC_POLICIES)})")
+        # liczba procesów równoległego odczytu archiwów (1 - sekwencyjnie)
+        self.read_workers = config.get("read_workers", 1)
+        # pamięć podręczna agregatów `query` (0 - wyłączona), opcjonalnie zapisywana do pliku
+        self.query_cache_mb = config.get("query_cache_mb", 16)
+        self.query_cache_path = config.get("query_cache_path")
 
         # utworzenie katalogów jeśli nie istnieją
         os.makedirs(self.log_dir, exist_ok=True)
         os.makedirs(os.path.join(self.log_dir, "archive"), exist_ok=True)
 
-        self.current_file = None
         self.current_writer = None
         self.current_filename = ""
         self.last_rotation = datetime.now()
         self.buffer = []
         self.line_count = 0
 
+        # Synchronizacja (wiele wątków serwera zapisuje, GUI czyta):
+        # _buffer_lock - krótki, tylko dopisanie wiersza i podmiana bufora,
+        # _io_lock - zapis do pliku i rotacja (jeden piszący na raz),
+        # _store_lock - bufor odczytów w pamięci i agregaty.
+        self._buffer_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        # pełne bufory czekające na zapis, w kolejności podmiany: (czas pierwszego wiersza, wiersze)
+        self._pending = deque()
+        self._buffer_since = None
+
+        # wątek zapisu po przekroczeniu maksymalnego opóźnienia
+        self._flusher = None
+        self._flusher_stop = threading.Event()
+        # statystyki zapisu
+        self._last_sync = time.monotonic()
+        self._unsynced = False
+        self.batches_written = 0
+        self.fsyncs = 0
+        self._write_durations = deque(maxlen=1000)
+        self._commit_latencies = deque(maxlen=1000)
+
+        # kompresja, indeksowanie i retencja archiwów wykonywane w tle
+        self.archiver = BackgroundArchiver()
+        # pula procesów równoległego odczytu archiwów
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
+        self.rotations = 0
+        self._swap_durations = deque(maxlen=100)
+
+        self.query_cache = None
+        if self.query_cache_mb:
+            self.query_cache = QueryCache(int(self.query_cache_mb * 1024 * 1024), self.query_cache_path)
+            self.query_cache.load(self._archive_names())
+
         # Bufor w pamięci dla ostatnich odczytów
-        self.readings = defaultdict(list)
+        self.readings = ReadingsStore(self.memory_retention_hours * 3600)
+        for hours in self.aggregate_windows_hours:
+            self.register_window(hours)
 
     def start(self) -> None:
         """
-        Otwiera nowy plik CSV do logowania. Jeśli plik jest nowy, zapisuje nagłówek.
+        Otwiera nowy plik logu (CSV z nagłówkiem lub plik kolumnowy).
         """
-        self.current_filename = self._get_log_filename()
-        filepath = os.path.join(self.log_dir, self.current_filename)
-        file_exists = os.path.exists(filepath)
-
-        self.current_file = open(filepath, "a+", newline="")
-        self.current_file.seek(0)
-        first_line = self.current_file.readline()
-        self.current_writer = csv.writer(self.current_file)
+        with self._io_lock:
+            self.current_filename = self._get_log_filename()
+            filepath = os.path.join(self.log_dir, self.current_filename)
+            self.current_writer = self.writer_class(filepath)
+            self._resume_pending_archives()
+            # bufory zapełnione, gdy plik był zamknięty
+            self._write_pending()
 
-        # tylko jeśli plik nie istnieje lub jest pusty, dodaj nagłówek
-        if not file_exists or not first_line.strip():
-            self.current_writer.writerow(["timestamp", "sensor_id", "value", "unit"])
-            self.current_file.flush()
+        if self.flush_interval_ms and (self._flusher is None or not self._flusher.is_alive()):
+            self._flusher_stop.clear()
+            self._flusher = threading.Thread(target=self._flush_periodically, name="LoggerFlusher", daemon=True)
+            self._flusher.start()
 
     def _get_log_filename(self):
-        return datetime.now().strftime(self.filename_pattern)
+        filename = datetime.now().strftime(self.filename_pattern)
+        # rozszerzenie pliku wynika z formatu zapisu
+        return os.path.splitext(filename)[0] + self.writer_class.extension
 
     def stop(self) -> None:
         """
         Wymusza zapis bufora i zamyka bieżący plik.
+        Czeka na dokończenie archiwizacji zrotowanych plików.
         """
-        self._flush()
-        if self.current_file:
-            self.current_file.close()
-            self.current_file = None
+        if self._flusher is not None:
+            self._flusher_stop.set()
+            self._flusher.join()
+            self._flusher = None
+        with self._io_lock:
+            if self.current_writer:
+                self._flush()
+                if self._unsynced:
+                    self._sync()
+                self.current_writer.close()
+                self.current_writer = None
+        self.archiver.wait()
+        if self.query_cache is not None:
+            self.query_cache.save(self._archive_names())
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
 
     def _flush(self):
-        for row in self.buffer:
-            self.current_writer.writerow(row)
-            self.line_count += 1
-        self.current_file.flush()
-        self.buffer.clear()
+        """
+        Zapisuje bieżący bufor i wszystkie oczekujące. Wymaga `_io_lock`.
+        """
+        with self._buffer_lock:
+            self._swap_buffer()
+        self._write_pending()
+
+    def _swap_buffer(self) -> None:
+        """
+        Przenosi bieżący bufor do kolejki zapisu. Wymaga `_buffer_lock`.
+        """
+        if self.buffer:
+            self._pending.append((self._buffer_since, self.buffer))
+            self.buffer = []
+            self._buffer_since = None
+
+    def _write_pending(self) -> None:
+        """
+        Zapisuje oczekujące bufory w kolejności ich podmiany (jedna paczka
+        = jeden write), a następnie flush i fsync zgodnie z polityką.
+        Wymaga `_io_lock`. Bez otwartego pliku bufory czekają na `start()`.
+        """
+        if self.current_writer is None:
+            return
+        started = time.perf_counter()
+        oldest = None
+        written_min = None
+        rows = 0
+        while True:
+            with self._buffer_lock:
+                if not self._pending:
+                    break
+                since, batch = self._pending.popleft()
+            if oldest is None:
+                oldest = since
+            if self.query_cache is not None:
+                batch_min = min(row[0] for row in batch)
+                written_min = batch_min if written_min is None else min(written_min, batch_min)
+            self.current_writer.write_rows(batch)
+            self.line_count += len(batch)
+            self.batches_written += 1
+            rows += len(batch)
+        if oldest is None:
+            return
+
+        self.current_writer.flush()
+        if written_min is not None:
+            # po flush wiersze są widoczne dla odczytu (lub zgłasza je `_unflushed_since`)
+            self.query_cache.note_write(columnar.to_micros(written_min))
+        self._unsynced = self.fsync_policy != "never"
+        if self.fsync_policy == "batch":
+            self._sync()
+        elif self.fsync_policy == "interval":
+            self._maybe_sync()
+        duration = time.perf_counter() - started
+        latency = time.monotonic() - oldest
+        self._write_durations.append(duration)
+        self._commit_latencies.append(latency)
+        ROWS_WRITTEN.inc(rows)
+        FLUSHES.inc()
+        FLUSH_SECONDS.observe(duration)
+        COMMIT_SECONDS.observe(latency)
+
+    def _sync(self) -> None:
+        self.current_writer.sync()
+        self.fsyncs += 1
+        FSYNCS.inc()
+        self._unsynced = False
+        self._last_sync = time.monotonic()
+
+    def _maybe_sync(self) -> None:
+        if self._unsynced and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _flush_periodically(self) -> None:
+        """
+        Zapisuje bufor, gdy jego najstarszy wiersz czeka `flush_interval_ms`,
+        aby odczyty rzadko raportujących czujników nie zostawały w pamięci.
+        """
+        interval = self.flush_interval_ms / 1000
+        while True:
+            since = self._buffer_since
+            timeout = interval if since is None else max(0.0, since + interval - time.monotonic())
+            if self._flusher_stop.wait(timeout):
+                return
+            with self._buffer_lock:
+                since = self._buffer_since
+                if since is not None and time.monotonic() - since >= interval:
+                    self._swap_buffer()
+            if self._pending or self._unsynced:
+                with self._io_lock:
+                    if self.current_writer is None:
+                        continue
+                    self._write_pending()
+                    if self.fsync_policy == "interval":
+                        self._maybe_sync()
+                    self._check_rotation()
+
+    def get_write_metrics(self) -> Dict[str, float]:
+        """
+        Statystyki zapisu: liczba paczek i fsync, czas zapisu paczki (ms)
+        oraz opóźnienie od pierwszego wiersza paczki do jej zapisu (ms).
+        """
+        durations = sorted(self._write_durations)
+        latencies = sorted(self._commit_latencies)
+        return {
+            "batches": self.batches_written,
+            "fsyncs": self.fsyncs,
+            "fsync_policy": self.fsync_policy,
+            "write_ms_p50": percentile_ms(durations, 0.50),
+            "write_ms_p95": percentile_ms(durations, 0.95),
+            "write_ms_p99": percentile_ms(durations, 0.99),
+            "commit_latency_ms_p50": percentile_ms(latencies, 0.50),
+            "commit_latency_ms_p95": percentile_ms(latencies, 0.95),
+            "commit_latency_ms_p99": percentile_ms(latencies, 0.99),
+        }
 
     def log_reading(
         self,
@@ -91,24 +305,37 @@ class Logger:
         """
         Dodaje wpis do bufora i ewentualnie wykonuje rotację pliku.
         Dodatkowo buforuje dane w pamięci dla GUI.
+
+        Bezpieczne dla wielu wątków: wątek, który zapełnił bufor, podmienia go
+        na pusty i dopisuje do kolejki zapisu; zapis do pliku wykonuje jeden
+        wątek na raz. Na dysk czeka tylko wątek, który podmienił bufor,
+        pozostali producenci dopisują wiersze bez czekania.
         """
-        # Buforowanie danych w pamięci dla GUI (przechowujemy tylko ostatnie 12h)
-        self.readings[sensor_id].append((timestamp, value, unit))
-        cutoff = datetime.now() - timedelta(hours=12)
-        self.readings[sensor_id] = [r for r in self.readings[sensor_id] if r[0] >= cutoff]
+        # Buforowanie danych w pamięci dla GUI (przechowujemy tylko okno retencji)
+        with self._store_lock:
+            self.readings.append(sensor_id, timestamp.timestamp(), value, unit)
 
         # Logowanie do pliku
-        row = [timestamp.isoformat(), sensor_id, value, unit]
-        self.buffer.append(row)
+        with self._buffer_lock:
+            if not self.buffer:
+                self._buffer_since = time.monotonic()
+            self.buffer.append((timestamp, sensor_id, value, unit))
+            if len(self.buffer) < self.buffer_size:
+                return
+            self._swap_buffer()
 
-        if len(self.buffer) >= self.buffer_size:
-            self._flush()
-            self._check_rotation()
+        # jeśli inny wątek właśnie zapisuje, zwykle zapisze również ten bufor;
+        # czekamy na niego, bo mógł skończyć zapis tuż przed podmianą bufora
+        # (bez wątku zapisu w tle bufor czekałby do kolejnego odczytu)
+        with self._io_lock:
+            if self._pending and self.current_writer is not None:
+                self._write_pending()
+                self._check_rotation()
 
     def _check_rotation(self):
         now = datetime.now()
         elapsed = (now - self.last_rotation).total_seconds() / 3600
-        file_size_mb = os.path.getsize(self.current_file.name) / (1024 * 1024)
+        file_size_mb = self.current_writer.size() / (1024 * 1024)
 
         if (
             elapsed >= self.rotate_every_hours
@@ -118,85 +345,515 @@ class Logger:
             self._rotate()
 
     def _rotate(self):
-        self.stop()
-        archive_dir = os.path.join(self.log_dir, "archive")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        archive_name = f"{self.current_filename}_{timestamp}"
-        archive_path = os.path.join(archive_dir, f"{archive_name}.zip")
+        """
+        Podmienia plik logu: zamyka bieżący, przenosi go do archive/ i otwiera
+        nowy. Kompresja, indeks i retencja wykonywane są w tle (`_archive`),
+        więc log_reading czeka tylko na zamknięcie i zmianę nazwy pliku.
+        """
+        started = time.perf_counter()
+        self._flush()
+        if self._unsynced:
+            self._sync()
+        self.current_writer.close()
+        self.current_writer = None
 
-        with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            zipf.write(os.path.join(self.log_dir, self.current_filename), arcname=self.current_filename)
+        member = self.current_filename
+        log_path = os.path.join(self.log_dir, member)
+        pending_path = os.path.join(self.log_dir, "archive", self._archive_name(member) + self.writer_class.extension)
+        ordered = csv_scan.is_ordered(log_path)
+        if not ordered:
+            # znacznik przed plikiem, aby odczyt nigdy nie zobaczył pliku bez niego
+            csv_scan.mark_unordered(pending_path)
+        os.replace(log_path, pending_path)
+        if not ordered:
+            os.remove(csv_scan.unordered_path(log_path))
 
-        os.remove(os.path.join(self.log_dir, self.current_filename))
-        self._cleanup_old_archives()
         self.last_rotation = datetime.now()
         self.line_count = 0
-        self.start()
+        self.rotations += 1
+        ROTATIONS.inc()
+        self.current_filename = self._get_log_filename()
+        self.current_writer = self.writer_class(os.path.join(self.log_dir, self.current_filename))
+        self._swap_durations.append(time.perf_counter() - started)
+
+        self.archiver.submit(partial(self._archive, pending_path, member))
+
+    def _archive_name(self, member: str) -> str:
+        """
+        Unikalna nazwa archiwum (bez rozszerzenia); kilka rotacji w tej samej
+        sekundzie dostaje kolejne sufiksy zamiast nadpisywać archiwum.
+        """
+        archive_dir = os.path.join(self.log_dir, "archive")
+        base = f"{member}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        name, n = base, 0
+        while any(
+            os.path.exists(os.path.join(archive_dir, name + ext))
+            for ext in (".zip", ".csv", columnar.ColumnarWriter.extension)
+        ):
+            n += 1
+            name = f"{base}_{n}"
+        return name
+
+    def _archive(self, pending_path: str, member: str) -> None:
+        """
+        Kompresuje zrotowany plik do archiwum ZIP (wykonywane w tle).
+        Archiwum zapisywane jest pod tymczasową nazwą i podmieniane atomowo,
+        a plik źródłowy usuwany dopiero po jego opublikowaniu.
+        """
+        archive_path = os.path.splitext(pending_path)[0] + ".zip"
+        tmp_path = archive_path + ".tmp"
+        if pending_path.endswith(".csv"):
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                zipf.write(pending_path, arcname=member)
+            # indeks archiwum pozwala read_logs pomijać pliki i bloki spoza zapytania
+            index_csv(pending_path, target=archive_path, member=member)
+        else:
+            # bloki kolumnowe są już skompresowane i niosą własne statystyki
+            with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as zipf:
+                zipf.write(pending_path, arcname=member)
+        os.replace(tmp_path, archive_path)
+        os.remove(pending_path)
+        # archiwum ma indeks z zakresem czasu każdego bloku
+        if not csv_scan.is_ordered(pending_path):
+            os.remove(csv_scan.unordered_path(pending_path))
+        self._cleanup_old_archives()
+
+    def _resume_pending_archives(self) -> None:
+        """
+        Zleca archiwizację plików pozostawionych w archive/ przez przerwany proces.
+        """
+        if self.archiver.pending():
+            return
+        archive_dir = os.path.join(self.log_dir, "archive")
+        for filename in sorted(os.listdir(archive_dir)):
+            match = PENDING_ARCHIVE.match(filename)
+            if match:
+                self.archiver.submit(partial(self._archive, os.path.join(archive_dir, filename), match.group("member")))
+
+    def get_rotation_metrics(self) -> Dict[str, float]:
+        """
+        Statystyki rotacji: liczba rotacji, czas podmiany pliku na ścieżce
+        zapisu (ms) oraz stan i czasy archiwizacji w tle.
+        """
+        swaps = list(self._swap_durations)
+        metrics = {
+            "rotations": self.rotations,
+            "swap_ms_last": round(swaps[-1] * 1000, 3) if swaps else 0.0,
+            "swap_ms_max": round(max(swaps) * 1000, 3) if swaps else 0.0,
+        }
+        metrics.update(self.archiver.metrics())
+        return metrics
+
+    def _unflushed_since(self) -> Optional[datetime]:
+        """
+        Najstarszy wiersz przekazany do pliku, ale jeszcze niewidoczny dla odczytu
+        (niepełny blok kolumnowy); przedziały od tej chwili nie trafiają do `query_cache`.
+        """
+        writer = self.current_writer
+        return writer.oldest_unflushed() if writer is not None else None
+
+    def get_cache_metrics(self) -> Dict[str, float]:
+        """
+        Statystyki pamięci podręcznej `query`: wpisy, rozmiar, trafienia i chybienia
+        (na przedział, czujnik i agregat), usunięcia LRU i unieważnienia.
+        """
+        if self.query_cache is None:
+            return {}
+        return self.query_cache.metrics()
 
     def _cleanup_old_archives(self):
         archive_dir = os.path.join(self.log_dir, "archive")
         now = datetime.now()
         for filename in os.listdir(archive_dir):
             filepath = os.path.join(archive_dir, filename)
-            if os.path.isfile(filepath):
+            if os.path.isfile(filepath) and not filename.endswith((INDEX_SUFFIX, ".tmp")):
                 file_time = datetime.fromtimestamp(os.path.getmtime(filepath))
                 if (now - file_time).days > self.retention_days:
+                    if self.query_cache is not None:
+                        self.query_cache.invalidate_before(self._archive_end(filepath, file_time))
                     os.remove(filepath)
+                    if os.path.exists(index_path(filepath)):
+                        os.remove(index_path(filepath))
+
+    @staticmethod
+    def _archive_end(path: str, file_time: datetime) -> int:
+        """
+        Najpóźniejszy znacznik czasu (µs) w archiwum: z indeksu lub nagłówków
+        bloków kolumnowych, w ostateczności czas modyfikacji pliku.
+        """
+        index = load_index(path)
+        if index is not None and index["max_ts"] is not None:
+            return round(index["max_ts"] * 1_000_000)
+        if path.endswith(".zip"):
+            ends = []
+            try:
+                with zipfile.ZipFile(path) as zipf:
+                    for name in zipf.namelist():
+                        if name.endswith(columnar.ColumnarWriter.extension):
+                            with zipf.open(name) as f:
+                                ends.extend(header.max_ts for header in columnar.iter_block_headers(f))
+            except zipfile.BadZipFile:
+                pass
+            if ends:
+                return max(ends)
+        return columnar.to_micros(file_time + csv_scan.DEFAULT_SLACK)
+
+    def _archive_names(self) -> List[str]:
+        return [os.path.basename(path) for kind, path in self._archive_entries() if kind == "zip"]
+
+    def _archive_entries(self) -> List[Tuple[str, str]]:
+        """
+        Pliki archiwum w kolejności nazw: ("zip", ścieżka) lub ("pending", ścieżka)
+        dla plików czekających na kompresję w tle. Archiwum opublikowane w trakcie
+        listowania, którego plik źródłowy jest jeszcze widoczny, jest pomijane.
+        """
+        archive_dir = os.path.join(self.log_dir, "archive")
+        filenames = sorted(os.listdir(archive_dir))
+        pending = {os.path.splitext(f)[0] for f in filenames if PENDING_ARCHIVE.match(f)}
+        entries = []
+        for filename in filenames:
+            path = os.path.join(archive_dir, filename)
+            if filename.endswith(".zip"):
+                if filename[:-len(".zip")] not in pending:
+                    entries.append(("zip", path))
+            elif PENDING_ARCHIVE.match(filename):
+                entries.append(("pending", path))
+        return entries
+
+    def _pending_sources(self, path: str, start_ts: float, end_ts: float, sensor_ids) -> Iterator[Tuple]:
+        kind = "csv" if path.endswith(".csv") else "columnar"
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            # archiwizacja zakończyła się po listowaniu katalogu
+            yield from log_sources.archive_sources(os.path.splitext(path)[0] + ".zip", start_ts, end_ts, sensor_ids)
+            return
+        with f:
+            yield from log_sources.file_source(f, kind, None, csv_scan.is_ordered(path))
+
+    def _current_sources(self, start_ts: float, end_ts: float, sensor_ids) -> Iterator[Tuple]:
+        for filename in sorted(os.listdir(self.log_dir)):
+            path = os.path.join(self.log_dir, filename)
+            if filename.endswith(".csv"):
+                index, blocks = log_sources.csv_blocks(path, start_ts, end_ts, sensor_ids)
+                if index is not None and not blocks:
+                    continue
+                kind = "csv"
+            elif filename.endswith(columnar.ColumnarWriter.extension):
+                kind, blocks = "columnar", None
+            else:
+                continue
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                # plik przeniesiony w międzyczasie przez rotację
+                continue
+            with f:
+                yield from log_sources.file_source(f, kind, blocks, csv_scan.is_ordered(path))
+
+    def _log_sources(
+        self,
+        start: datetime,
+        end: datetime,
+        sensor_ids: Optional[List[str]] = None
+    ) -> Iterator[Tuple]:
+        """
+        Otwiera kolejno pliki logów (najpierw archiwa, potem bieżące), które
+        mogą zawierać dane z zakresu. Zwraca źródła (plik, format, bloki)
+        opisane w storage.log_sources. Pliki z indeksem (storage.log_index)
+        spoza zakresu są pomijane bez otwierania.
+        """
+        start_ts = start.timestamp()
+        end_ts = end.timestamp()
+        for kind, path in self._archive_entries():
+            if kind == "zip":
+                yield from log_sources.archive_sources(path, start_ts, end_ts, sensor_ids)
+            else:
+                yield from self._pending_sources(path, start_ts, end_ts, sensor_ids)
+        yield from self._current_sources(start_ts, end_ts, sensor_ids)
 
     def read_logs(
         self,
         start: datetime,
         end: datetime,
-        sensor_id: Optional[str] = None
+        sensor_id: Optional[str] = None,
+        workers: Optional[int] = None,
+        ordered: bool = True
     ) -> Iterator[Dict]:
         """
         Pobiera wpisy z logów zadanego zakresu i opcjonalnie konkretnego czujnika.
+        Z plików CSV z indeksem czytane są tylko pasujące bloki wierszy, a pliki
+        kolumnowe (.col) pomijają bloki na podstawie statystyk w nagłówkach.
+        Parametry `workers` i `ordered` opisuje `read_rows`.
         """
-        def _parse_csv(fileobj):
-            reader = csv.DictReader(fileobj)
-            for row in reader:
-                row_time = datetime.fromisoformat(row["timestamp"])
-                if start <= row_time <= end:
-                    if sensor_id is None or row["sensor_id"] == sensor_id:
-                        yield {
-                            "timestamp": row_time,
-                            "sensor_id": row["sensor_id"],
-                            "value": float(row["value"]),
-                            "unit": row["unit"]
-                        }
-
-        # odczyt zarchiwizowanych logów
-        archive_dir = os.path.join(self.log_dir, "archive")
-        for filename in os.listdir(archive_dir):
-            if filename.endswith(".zip"):
-                with zipfile.ZipFile(os.path.join(archive_dir, filename), 'r') as zipf:
-                    for name in zipf.namelist():
-                        with zipf.open(name) as f:
-                            yield from _parse_csv(f)
+        for row_time, row_sensor, value, unit in self.read_rows(start, end, sensor_id, workers, ordered):
+            yield {
+                "timestamp": row_time,
+                "sensor_id": row_sensor,
+                "value": value,
+                "unit": unit
+            }
 
-        # odczyt aktualnych logów
-        for filename in os.listdir(self.log_dir):
-            if filename.endswith(".csv"):
-                with open(os.path.join(self.log_dir, filename), "r") as f:
-                    yield from _parse_csv(f)
+    def read_rows(
+        self,
+        start: datetime,
+        end: datetime,
+        sensor_id: Optional[str] = None,
+        workers: Optional[int] = None,
+        ordered: bool = True
+    ) -> Iterator[Tuple[datetime, str, float, str]]:
+        """
+        Jak `read_logs`, ale zwraca krotki (timestamp, sensor_id, value, unit)
+        zamiast słowników. Bieżący plik CSV czytany jest przez mmap: początek
+        zakresu wyszukiwany jest binarnie, więc zapytanie o ostatnie godziny
+        nie parsuje całego pliku dnia.
+
+        :param workers: Liczba procesów do równoległego odczytu archiwów ZIP
+            (domyślnie `read_workers` z konfiguracji; 1 - odczyt sekwencyjny)
+        :param ordered: True - wszystkie wiersze scalone rosnąco po czasie
+            (niezależnie od `workers`; wiersze każdego pliku trzymane są
+            w pamięci do scalenia), False - wiersze w kolejności plików,
+            a przy odczycie równoległym archiwa w kolejności ukończenia
+            (bez czekania na najwolniejsze archiwum)
+        """
+        workers = self.read_workers if workers is None else workers
+        if workers > 1:
+            yield from self._read_rows_parallel(start, end, sensor_id, workers, ordered)
+            return
+        sensor_ids = [sensor_id] if sensor_id is not None else None
+        if not ordered:
+            for fileobj, kind, blocks in self._log_sources(start, end, sensor_ids):
+                yield from log_sources.source_rows(fileobj, kind, blocks, start, end, sensor_id)
+            return
+        # spóźnione wiersze (np. z outboxa) mogą leżeć w późniejszym pliku
+        streams = [
+            sorted(log_sources.source_rows(fileobj, kind, blocks, start, end, sensor_id), key=itemgetter(0))
+            for fileobj, kind, blocks in self._log_sources(start, end, sensor_ids)
+        ]
+        yield from heapq.merge(*streams, key=itemgetter(0))
+
+    def _read_pool(self, workers: int) -> ProcessPoolExecutor:
+        """
+        Pula procesów odczytu, tworzona przy pierwszym użyciu i zamykana w `stop()`.
+        Kontekst "spawn", bo proces Loggera ma już działające wątki.
+        """
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers != workers:
+                if self._pool is not None:
+                    self._pool.shutdown()
+                self._pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+                self._pool_workers = workers
+            return self._pool
+
+    def _read_rows_parallel(
+        self,
+        start: datetime,
+        end: datetime,
+        sensor_id: Optional[str],
+        workers: int,
+        ordered: bool
+    ) -> Iterator[Tuple[datetime, str, float, str]]:
+        """
+        Archiwa ZIP dekompresowane i parsowane są w puli procesów
+        (storage.log_sources.scan_archive), pliki czekające na kompresję
+        i bieżące - w tym procesie.
+        """
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+        sensor_ids = [sensor_id] if sensor_id is not None else None
+        pool = self._read_pool(workers)
+
+        # pliki archiwum w kolejności nazw: Future archiwum z puli lub ścieżka pliku czytanego tutaj
+        futures, entries = [], []
+        for kind, path in self._archive_entries():
+            if kind == "zip":
+                # archiwa z indeksem spoza zakresu odrzucane bez wysyłania do puli
+                index, blocks = log_sources.csv_blocks(path, start_ts, end_ts, sensor_ids)
+                if index is None or blocks:
+                    futures.append(pool.submit(log_sources.scan_archive, path, start, end, sensor_id))
+                    entries.append(futures[-1])
+            else:
+                entries.append(path)
+        local = [entry for entry in entries if isinstance(entry, str)]
+
+        def _pending_rows(path):
+            for source in self._pending_sources(path, start_ts, end_ts, sensor_ids):
+                yield from log_sources.source_rows(*source, start, end, sensor_id)
+
+        def _current_streams():
+            for source in self._current_sources(start_ts, end_ts, sensor_ids):
+                yield log_sources.source_rows(*source, start, end, sensor_id)
+
+        try:
+            if ordered:
+                # te same strumienie i ta sama kolejność co przy odczycie sekwencyjnym
+                streams = []
+                for entry in entries:
+                    if isinstance(entry, str):
+                        streams.append(sorted(_pending_rows(entry), key=itemgetter(0)))
+                    else:
+                        streams.append(log_sources.columns_rows(entry.result()))
+                streams.extend(sorted(rows, key=itemgetter(0)) for rows in _current_streams())
+                yield from heapq.merge(*streams, key=itemgetter(0))
+            else:
+                for future in as_completed(futures):
+                    yield from log_sources.columns_rows(future.result())
+                for path in local:
+                    yield from _pending_rows(path)
+                for rows in _current_streams():
+                    yield from rows
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _iter_chunks(
+        self,
+        start: datetime,
+        end: datetime,
+        sensor_ids: Optional[List[str]] = None
+    ) -> Iterator[Tuple[List[str], array, array, array]]:
+        """
+        Dane z logów w postaci kolumnowej, porcjami (blok pliku kolumnowego
+        lub plik/bloki CSV): (nazwy czujników, indeksy czujników, różnice
+        kolejnych znaczników czasu w µs, wartości). Porcje mogą zawierać wiersze
+        spoza zakresu i innych czujników - odfiltrowuje je wywołujący (storage.query).
+        """
+        start_us, end_us = columnar.to_micros(start), columnar.to_micros(end)
+        wanted = set(sensor_ids) if sensor_ids is not None else None
+
+        for fileobj, kind, blocks in self._log_sources(start, end, sensor_ids):
+            if kind == "columnar":
+                for header in columnar.matching_blocks(fileobj, start_us, end_us):
+                    if wanted is not None and wanted.isdisjoint(header.sensors):
+                        continue
+                    deltas, values, sensor_idx, _ = columnar.read_block_raw(fileobj, header)
+                    yield header.sensors, sensor_idx, deltas, values
+                continue
+            if kind == "mapped":
+                chunk = csv_scan.read_arrays(fileobj, start, end, sensor_ids)
+                if chunk[2]:
+                    yield chunk
+                continue
+
+            sensors = {}
+            sensor_idx, deltas, values = array("H"), array("q"), array("d")
+            previous = 0
+            for row in log_sources.csv_lines(fileobj, blocks):
+                if len(row) < 4 or row[0] == "timestamp":
+                    continue
+                if wanted is not None and row[1] not in wanted:
+                    continue
+                ts = columnar.to_micros(datetime.fromisoformat(row[0]))
+                sensor_idx.append(sensors.setdefault(row[1], len(sensors)))
+                deltas.append(ts - previous)
+                values.append(float(row[2]))
+                previous = ts
+            if deltas:
+                yield list(sensors), sensor_idx, deltas, values
+
+    def query(
+        self,
+        sensor_ids: Optional[List[str]],
+        start: datetime,
+        end: datetime,
+        resample: Optional[str] = "1min",
+        aggs: Sequence[str] = ("mean", "min", "max", "p95")
+    ) -> Dict[str, Dict]:
+        """
+        Agregaty historycznych odczytów liczone wektorowo (wymaga numpy).
+        Dla podanej listy czujników zamknięte przedziały zapamiętywane są
+        w `query_cache` (statystyki: `get_cache_metrics`).
+
+        :param sensor_ids: Lista czujników (None - wszystkie)
+        :param start: Początek zakresu
+        :param end: Koniec zakresu
+        :param resample: Szerokość przedziału, np. "30s", "1min", "1h", "1d",
+            liczona od początku doby, w której zaczyna się zakres
+            (None - jeden przedział dla całego zakresu)
+        :param aggs: Agregaty: count, sum, mean, min, max, std, pNN (percentyl, np. p95)
+        :return: {sensor_id: {"timestamp": początki przedziałów (epoch, s), agregat: tablica}}
+        """
+        from storage.query import query
+
+        return query(self, sensor_ids, start, end, resample, aggs)
 
     def get_latest_readings(self):
+        """
+        Ostatni odczyt każdego czujnika (spójny stan z jednej chwili).
+        """
+        with self._store_lock:
+            return self._latest_readings()
+
+    def _latest_readings(self) -> Dict[str, Dict]:
         result = {}
-        for sensor_id, entries in self.readings.items():
-            if entries:
-                timestamp, value, unit = entries[-1]
+        for sensor_id in self.readings:
+            latest = self.readings.latest(sensor_id)
+            if latest:
+                ts, value, unit = latest
                 result[sensor_id] = {
                     "last_value": value,
                     "unit": unit,
-                    "timestamp": timestamp
+                    "timestamp": datetime.fromtimestamp(ts)
                 }
         return result
 
-    def get_average(self, sensor_id: str, hours: int):
-        if sensor_id not in self.readings:
-            return None
-        cutoff = datetime.now() - timedelta(hours=hours)
-        values = [v for (ts, v, unit) in self.readings[sensor_id] if ts >= cutoff]
-        if not values:
+    def get_snapshot(self, hours: Sequence[float] = (1, 12)) -> Dict[str, Dict]:
+        """
+        Ostatnie odczyty razem z agregatami z podanych okien, pobrane pod jedną
+        blokadą, więc wartości i średnie pochodzą z tego samego stanu.
+
+        :param hours: Okna agregatów w godzinach
+        :return: {sensor_id: {"last_value", "unit", "timestamp", "stats": {hours: agregaty}}}
+        """
+        with self._store_lock:
+            result = self._latest_readings()
+            for sensor_id, data in result.items():
+                data["stats"] = {h: self._window_stats(sensor_id, h) for h in hours}
+        return result
+
+    def update_trend(self, trend) -> None:
+        """
+        Dopisuje do wykresu (storage.downsample.MinMaxDownsampler) odczyty
+        czujnika z pamięci, które pojawiły się od poprzedniej aktualizacji.
+        """
+        with self._store_lock:
+            trend.update(self.readings.series(trend.sensor_id), time.time())
+
+    def register_window(self, hours: float) -> None:
+        """
+        Rejestruje okno agregatów kroczących (np. 5 min = 1/12 h, 24 h).
+        Po rejestracji odczyt średniej z okna kosztuje O(1).
+        """
+        with self._store_lock:
+            self.readings.register_window(hours * 3600)
+
+    def _window_stats(self, sensor_id: str, hours: float) -> Optional[Dict[str, float]]:
+        """
+        Agregaty z okna zarejestrowanego (O(1)) lub, dla pozostałych okien,
+        liczone z odczytów w pamięci bez rejestracji. Wymaga `_store_lock`.
+        """
+        seconds = hours * 3600
+        if self.readings.has_window(seconds):
+            return self.readings.window_stats(sensor_id, seconds)
+        return self.readings.scan_stats(sensor_id, seconds)
+
+    def get_stats(self, sensor_id: str, hours: float) -> Optional[Dict[str, float]]:
+        """
+        Zwraca agregaty (count, mean, min, max, variance) z ostatnich `hours` godzin.
+        Okna zarejestrowane przez `register_window` kosztują O(1), pozostałe są
+        liczone z odczytów w pamięci (O(n), w granicach `memory_retention_hours`).
+        """
+        with self._store_lock:
+            return self._window_stats(sensor_id, hours)
+
+    def get_average(self, sensor_id: str, hours: float):
+        stats = self.get_stats(sensor_id, hours)
+        if stats is None:
             return None
-        return sum(values) / len(values)
+        return stats["mean"]
+
+    def get_memory_usage(self) -> Dict[str, Dict[str, int]]:
+        """
+        Zwraca zajętość pamięci bufora odczytów dla każdego czujnika.
+        """
+        with self._store_lock:
+            return self.readings.memory_usage()
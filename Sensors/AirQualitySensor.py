@@ -11,27 +11,32 @@ class AirQualitySensor(Sensor):
         self.noise_level = 2.0
         self.time_counter = 0
 
+    def model(self, t, noise, now, xp=math):
+        """
+        Model oparty na numerze odczytu (`now` nieużywane), opis parametrów: `Sensor.model`.
+        """
+        # Symulacja dziennego cyklu (np. ruch uliczny rano i wieczorem)
+        daily_cycle = xp.sin(t / 20.0) * 7 + xp.sin(t / 10.0) * 5
+
+        trend_component = self.trend * (t / 100.0)
+
+        return self.base_quality + daily_cycle + trend_component + noise
+
     def read_value(self):
         if not self.active:
             raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
-        # Symulacja dziennego cyklu (np. ruch uliczny rano i wieczorem)
-        daily_cycle = math.sin(self.time_counter / 20.0) * 7 + math.sin(self.time_counter / 10.0) * 5
-
-        trend_component = self.trend * (self.time_counter / 100.0)
-
         # Dodanie szumu
         noise = random.uniform(-self.noise_level, self.noise_level)
 
-        value = self.base_quality + daily_cycle + trend_component + noise
-
-        value = max(min(value, self.max_value), self.min_value)
+        now = datetime.now()
+        value = self._clamp(self.model(self.time_counter, noise, now))
 
         self.last_value = value
         self.time_counter += 1
 
         # Wywołanie callbacka
         for callback in self.callbacks:
-            callback(self.sensor_id, datetime.now(), value, self.unit)
+            callback(self.sensor_id, now, value, self.unit)
 
         return value
@@ -11,28 +11,33 @@ class HumiditySensor(Sensor):
         self.noise_level = 1.5
         self.time_counter = 0
 
-    def read_value(self):
-        if not self.active:
-            raise Exception(f"Czujnik {self.name} jest wyłączony.")
-
+    def model(self, t, noise, now, xp=math):
+        """
+        Model oparty na numerze odczytu (`now` nieużywane), opis parametrów: `Sensor.model`.
+        """
         # Symulacja dziennego cyklu wilgotności (np. więcej wilgoci nocą)
-        daily_cycle = math.cos(self.time_counter / 40.0) * 10
+        daily_cycle = xp.cos(t / 40.0) * 10
 
         # Powolna zmiana trendu w tle
-        trend_component = self.trend * self.time_counter
+        trend_component = self.trend * t
+
+        return self.base_humidity + daily_cycle + trend_component + noise
+
+    def read_value(self):
+        if not self.active:
+            raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
         # Losowy szum
         noise = random.uniform(-self.noise_level, self.noise_level)
 
-        value = self.base_humidity + daily_cycle + trend_component + noise
-
-        value = max(min(value, self.max_value), self.min_value)
+        now = datetime.now()
+        value = self._clamp(self.model(self.time_counter, noise, now))
 
         self.last_value = value
         self.time_counter += 1
 
         # Wywołanie callbacka
         for callback in self.callbacks:
-            callback(self.sensor_id, datetime.now(), value, self.unit)
+            callback(self.sensor_id, now, value, self.unit)
 
         return value
@@ -11,26 +11,31 @@ class PressureSensor(Sensor):
         self.noise_level = 0.3
         self.time_counter = 0
 
+    def model(self, t, noise, now, xp=math):
+        """
+        Model oparty na numerze odczytu (`now` nieużywane), opis parametrów: `Sensor.model`.
+        """
+        # Symulacja dziennego cyklu wahań ciśnienia
+        daily_cycle = xp.sin(t / 50.0) * 1.5  # amplituda ~1.5 hPa
+
+        trend_component = self.trend * t
+        return self.base_pressure + daily_cycle + trend_component + noise
+
     def read_value(self):
         if not self.active:
             raise Exception(f"Czujnik {self.name} jest wyłączony.")
 
-        # Symulacja dziennego cyklu wahań ciśnienia
-        daily_cycle = math.sin(self.time_counter / 50.0) * 1.5  # amplituda ~1.5 hPa
-
-        # trend i losowy szum
-        trend_component = self.trend * self.time_counter
+        # losowy szum
         noise = random.uniform(-self.noise_level, self.noise_level)
 
-        value = self.base_pressure + daily_cycle + trend_component + noise
-
-        value = max(min(value, self.max_value), self.min_value)
+        now = datetime.now()
+        value = self._clamp(self.model(self.time_counter, noise, now))
 
         self.last_value = value
         self.time_counter += 1
 
         # Wywołanie callbacka
         for callback in self.callbacks:
-            callback(self.sensor_id, datetime.now(), value, self.unit)
+            callback(self.sensor_id, now, value, self.unit)
 
         return value
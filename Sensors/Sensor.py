@@ -1,8 +1,12 @@
 import datetime
+import math
 import random
 from datetime import datetime
 
 class Sensor:
+    # liczba miejsc po przecinku odczytu (None - bez zaokrąglania), patrz `_clamp`
+    precision = None
+
     def __init__(self, sensor_id, name, unit, min_value, max_value, frequency=1):
         """
         Inicjalizacja czujnika.
@@ -43,6 +47,22 @@ class Sensor:
             callback(self.sensor_id, datetime.now(), value, self.unit)
         return value
 
+    def model(self, t, noise, now, xp=math):
+        """
+        Wartość przed ograniczeniem do zakresu dla odczytu numer `t` z szumem `noise`
+        wykonanego w chwili `now` (modele oparte tylko na numerze odczytu jej nie używają).
+        `t` i `noise` mogą być liczbami (xp=math) lub tablicami (xp=numpy, SensorBank).
+        """
+        raise NotImplementedError
+
+    def _clamp(self, value):
+        """
+        Ogranicza wartość z `model()` do zakresu czujnika i zaokrągla ją
+        do `precision` miejsc po przecinku.
+        """
+        value = max(min(value, self.max_value), self.min_value)
+        return value if self.precision is None else round(value, self.precision)
+
     def calibrate(self, calibration_factor):
         """
         Kalibruje ostatni odczyt przez przemnożenie go przez calibration_factor.
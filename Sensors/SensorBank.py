@@ -0,0 +1,207 @@
+import numpy as np
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from Sensors.AirQualitySensor import AirQualitySensor
+from Sensors.HumiditySensor import HumiditySensor
+from Sensors.PressureSensor import PressureSensor
+from Sensors.TemperatureSensor import TemperatureSensor
+
+
+class ReadingBatch:
+    """
+    Odczyty wszystkich aktywnych czujników banku z jednego taktu.
+    """
+    __slots__ = ("timestamp", "sensor_ids", "values", "units")
+
+    def __init__(self, timestamp: datetime, sensor_ids: np.ndarray, values: np.ndarray, units: np.ndarray):
+        self.timestamp = timestamp
+        self.sensor_ids = sensor_ids
+        self.values = values
+        self.units = units
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[Tuple[str, datetime, float, str]]:
+        """
+        Odczyty w postaci argumentów callbacka czujnika: (sensor_id, timestamp, value, unit).
+        """
+        timestamp = self.timestamp
+        for sensor_id, value, unit in zip(self.sensor_ids.tolist(), self.values.tolist(), self.units.tolist()):
+            yield sensor_id, timestamp, value, unit
+
+    def records(self) -> List[dict]:
+        """
+        Odczyty jako słowniki wysyłane przez NetworkClient (np. do `send_many`).
+        """
+        timestamp = self.timestamp.isoformat()
+        return [
+            {"sensor_id": sensor_id, "timestamp": timestamp, "value": value, "unit": unit}
+            for sensor_id, value, unit in zip(self.sensor_ids.tolist(), self.values.tolist(), self.units.tolist())
+        ]
+
+
+class _Group:
+    """
+    Czujniki jednego typu i zakresu: parametry modelu wspólne, stan w tablicach.
+    """
+
+    def __init__(self, sensor_class, sensor_ids, unit, min_value, max_value, rng):
+        # model i jego parametry (poziom bazowy, trend, szum) pochodzą z klasy pojedynczego czujnika
+        self.prototype = sensor_class(sensor_ids[0], sensor_class.__name__, unit, min_value, max_value)
+        self.sensor_class = sensor_class
+        self.sensor_ids = np.array(sensor_ids, dtype=object)
+        self.units = np.full(len(sensor_ids), unit, dtype=object)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.rng = rng
+        self.time_counter = np.zeros(len(sensor_ids), dtype=np.int64)
+        self.active = np.ones(len(sensor_ids), dtype=bool)
+
+    def values(self, now: datetime) -> np.ndarray:
+        prototype = self.prototype
+        t = self.time_counter[self.active].astype(np.float64)
+        noise = self.rng.uniform(-prototype.noise_level, prototype.noise_level, len(t))
+        # wektorowy odpowiednik Sensor._clamp
+        value = np.clip(prototype.model(t, noise, now, xp=np), self.min_value, self.max_value)
+        if prototype.precision is not None:
+            value = np.round(value, prototype.precision)
+        return value
+
+
+class SensorBank:
+    """
+    Wektorowa symulacja wielu czujników (np. tysięcy każdego typu) do testów
+    obciążeniowych. Wartości liczy `model()` klas TemperatureSensor, HumiditySensor,
+    PressureSensor i AirQualitySensor (cykl, trend, szum), wywoływany na tablicach
+    NumPy dla całej grupy naraz, z ograniczeniem do zakresu jak w `read_value`.
+
+    Każdy `tick()` zwraca paczkę odczytów wszystkich aktywnych czujników
+    i przekazuje ją callbackom paczek oraz (wolniej) callbackom pojedynczych
+    odczytów o sygnaturze jak w `Sensor.register_callback`.
+    Przy tym samym `seed` i tych samych czasach taktów wyniki są powtarzalne.
+    """
+
+    SENSOR_CLASSES = (TemperatureSensor, HumiditySensor, PressureSensor, AirQualitySensor)
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        :param seed: Ziarno generatora liczb losowych (None - losowe)
+        """
+        self.seed = seed
+        self.groups: List[_Group] = []
+        self.callbacks = []
+        self.batch_callbacks = []
+        self._index: Dict[str, Tuple[_Group, int]] = {}
+
+    def add(
+        self,
+        sensor_class,
+        count: int,
+        unit: str,
+        min_value: float,
+        max_value: float,
+        prefix: Optional[str] = None
+    ) -> List[str]:
+        """
+        Dodaje `count` czujników danego typu. Zwraca ich identyfikatory.
+
+        :param sensor_class: Klasa czujnika, którego model jest symulowany (SENSOR_CLASSES)
+        :param count: Liczba czujników
+        :param unit: Jednostka miary
+        :param min_value: Minimalna wartość odczytu
+        :param max_value: Maksymalna wartość odczytu
+        :param prefix: Początek identyfikatorów (domyślnie pierwsza litera nazwy klasy)
+        """
+        if sensor_class not in self.SENSOR_CLASSES:
+            raise ValueError(f"Nieobsługiwany typ czujnika: {sensor_class.__name__}")
+        if count <= 0:
+            raise ValueError("Liczba czujników musi być dodatnia.")
+        prefix = prefix or sensor_class.__name__[0]
+        width = max(2, len(str(count)))
+        sensor_ids = [f"{prefix}{i + 1:0{width}d}" for i in range(count)]
+        duplicates = [sensor_id for sensor_id in sensor_ids if sensor_id in self._index]
+        if duplicates:
+            raise ValueError(f"Identyfikator czujnika już istnieje: {duplicates[0]}")
+
+        # osobny strumień losowy dla każdej grupy - dodanie grupy nie zmienia pozostałych
+        rng = np.random.default_rng(None if self.seed is None else [self.seed, len(self.groups)])
+        group = _Group(sensor_class, sensor_ids, unit, min_value, max_value, rng)
+        self.groups.append(group)
+        for i, sensor_id in enumerate(sensor_ids):
+            self._index[sensor_id] = (group, i)
+        return sensor_ids
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def register_callback(self, callback: Callable[[str, datetime, float, str], None]) -> None:
+        """
+        Callback wywoływany dla każdego odczytu: callback(sensor_id, timestamp, value, unit).
+        """
+        self.callbacks.append(callback)
+
+    def register_batch_callback(self, callback: Callable[[ReadingBatch], None]) -> None:
+        """
+        Callback wywoływany raz na takt z całą paczką odczytów.
+        """
+        self.batch_callbacks.append(callback)
+
+    def start(self, sensor_ids: Optional[Sequence[str]] = None) -> None:
+        """
+        Włącza wskazane czujniki (None - wszystkie).
+        """
+        self._set_active(sensor_ids, True)
+
+    def stop(self, sensor_ids: Optional[Sequence[str]] = None) -> None:
+        """
+        Wyłącza wskazane czujniki (None - wszystkie); wyłączone nie dają odczytów.
+        """
+        self._set_active(sensor_ids, False)
+
+    def _set_active(self, sensor_ids, active: bool) -> None:
+        if sensor_ids is None:
+            for group in self.groups:
+                group.active[:] = active
+            return
+        for sensor_id in sensor_ids:
+            try:
+                group, i = self._index[sensor_id]
+            except KeyError:
+                raise KeyError(f"Nieznany czujnik: {sensor_id}")
+            group.active[i] = active
+
+    def tick(self, now: Optional[datetime] = None) -> ReadingBatch:
+        """
+        Generuje po jednym odczycie każdego aktywnego czujnika.
+
+        :param now: Znacznik czasu odczytów (domyślnie bieżący czas)
+        :return: Paczka odczytów
+        """
+        now = now or datetime.now()
+        sensor_ids, values, units = [], [], []
+        for group in self.groups:
+            if not group.active.any():
+                continue
+            values.append(group.values(now))
+            sensor_ids.append(group.sensor_ids[group.active])
+            units.append(group.units[group.active])
+            group.time_counter[group.active] += 1
+
+        if values:
+            batch = ReadingBatch(now, np.concatenate(sensor_ids), np.concatenate(values), np.concatenate(units))
+        else:
+            batch = ReadingBatch(now, np.empty(0, dtype=object), np.empty(0), np.empty(0, dtype=object))
+
+        for callback in self.batch_callbacks:
+            callback(batch)
+        if self.callbacks:
+            for reading in batch:
+                for callback in self.callbacks:
+                    callback(*reading)
+        return batch
+
+    def __str__(self):
+        counts = ", ".join(f"{group.sensor_class.__name__}={len(group.sensor_ids)}" for group in self.groups)
+        return f"SensorBank({counts})"
@@ -0,0 +1,232 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from network.system_logger import system_logger as sys_logger
+from storage.stats import percentile_ms
+
+
+class _Entry:
+    """
+    Stan harmonogramu jednego czujnika i jego statystyki.
+    """
+
+    def __init__(self, sensor, period: float):
+        self.sensor = sensor
+        self.period = period
+        self.removed = False
+        # odczyt w toku (tylko z pulą wątków)
+        self.running = False
+        self.reads = 0
+        self.errors = 0
+        # terminy pominięte, bo harmonogram był za nimi o cały okres lub więcej
+        self.skipped = 0
+        # terminy, w których poprzedni odczyt jeszcze trwał
+        self.overruns = 0
+        self.last_start = None
+        self.lateness = deque(maxlen=1000)
+        self.intervals = deque(maxlen=1000)
+
+
+class SensorScheduler:
+    """
+    Wywołuje `read_value()` każdego czujnika co `sensor.frequency` sekund.
+
+    Terminy kolejnych odczytów trzymane są w kopcu i liczone od zegara
+    monotonicznego jako start + n * okres, więc czas trwania callbacków
+    nie przesuwa harmonogramu. Jeden wątek obsługuje dowolną liczbę czujników;
+    przy `workers` > 0 odczyty wykonywane są w puli wątków, dzięki czemu wolny
+    czujnik nie opóźnia pozostałych. Odczyt czujnika nie startuje, dopóki
+    trwa jego poprzedni odczyt (termin liczony jest jako `overruns`).
+
+    :param sensors: Czujniki (obiekty z `sensor_id`, `frequency`, `read_value()`)
+    :param workers: Liczba wątków odczytu (0 - odczyty w wątku harmonogramu)
+    :param spread: Rozłożenie pierwszych odczytów równomiernie w okresie
+        zamiast uruchamiania wszystkich czujników naraz
+    """
+
+    def __init__(self, sensors: Iterable = (), workers: int = 0, spread: bool = False):
+        self.workers = workers
+        self.spread = spread
+        self._heap: List[Tuple[float, int, _Entry]] = []
+        self._entries: Dict[str, _Entry] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._pool = None
+        for sensor in sensors:
+            self.add(sensor)
+
+    def add(self, sensor, frequency: Optional[float] = None) -> None:
+        """
+        Dodaje czujnik do harmonogramu (także w trakcie działania).
+
+        :param sensor: Czujnik
+        :param frequency: Okres odczytów w sekundach (domyślnie `sensor.frequency`)
+        """
+        period = frequency if frequency is not None else sensor.frequency
+        if not period or period <= 0:
+            raise ValueError(f"Okres odczytów czujnika {sensor.sensor_id} musi być dodatni.")
+        with self._cond:
+            if sensor.sensor_id in self._entries:
+                raise ValueError(f"Czujnik {sensor.sensor_id} jest już w harmonogramie.")
+            entry = _Entry(sensor, period)
+            self._entries[sensor.sensor_id] = entry
+            if self._running:
+                self._push(time.monotonic(), entry)
+            self._cond.notify()
+
+    def remove(self, sensor_id: str) -> None:
+        with self._cond:
+            entry = self._entries.pop(sensor_id, None)
+            if entry is None:
+                raise KeyError(f"Nieznany czujnik: {sensor_id}")
+            # wpis w kopcu usuwany jest leniwie, gdy dojdzie do niego kolej
+            entry.removed = True
+
+    def _push(self, due: float, entry: _Entry) -> None:
+        heapq.heappush(self._heap, (due, next(self._seq), entry))
+
+    def start(self) -> None:
+        """
+        Uruchamia harmonogram w wątku w tle.
+        """
+        self._begin()
+        self._thread = threading.Thread(target=self._loop, name="SensorScheduler", daemon=True)
+        self._thread.start()
+
+    def run(self) -> None:
+        """
+        Uruchamia harmonogram w bieżącym wątku (do `stop()` lub KeyboardInterrupt).
+        """
+        self._begin()
+        try:
+            self._loop()
+        finally:
+            self.stop()
+
+    def _begin(self) -> None:
+        with self._cond:
+            if self._running:
+                raise RuntimeError("Harmonogram już działa.")
+            self._running = True
+            if self.workers > 0:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="SensorRead")
+            now = time.monotonic()
+            self._heap = []
+            entries = list(self._entries.values())
+            for i, entry in enumerate(entries):
+                offset = entry.period * i / len(entries) if self.spread else 0.0
+                self._push(now + offset, entry)
+
+    def stop(self) -> None:
+        """
+        Zatrzymuje harmonogram i czeka na dokończenie trwających odczytów.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                due = self._take_due()
+                if due is None:
+                    return
+                pool = self._pool
+            for entry, deadline in due:
+                if pool is None:
+                    self._read(entry, deadline)
+                elif entry.running:
+                    entry.overruns += 1
+                else:
+                    entry.running = True
+                    pool.submit(self._read, entry, deadline)
+
+    def _take_due(self) -> Optional[List[Tuple[_Entry, float]]]:
+        """
+        Czeka na najbliższy termin i zwraca wszystkie przypadające czujniki
+        z ich terminami, planując kolejne odczyty. Wymaga `_cond`.
+        None - harmonogram zatrzymany.
+        """
+        while self._running:
+            if not self._heap:
+                self._cond.wait()
+                continue
+            now = time.monotonic()
+            if self._heap[0][0] > now:
+                self._cond.wait(self._heap[0][0] - now)
+                continue
+
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, entry = heapq.heappop(self._heap)
+                if entry.removed:
+                    continue
+                next_due = deadline + entry.period
+                if next_due <= now:
+                    # harmonogram nie nadąża: pomijamy zaległe terminy zamiast odczytów seriami
+                    missed = int((now - deadline) // entry.period)
+                    entry.skipped += missed
+                    next_due = deadline + (missed + 1) * entry.period
+                self._push(next_due, entry)
+                due.append((entry, deadline))
+            return due
+        return None
+
+    def _read(self, entry: _Entry, deadline: float) -> None:
+        started = time.monotonic()
+        sensor = entry.sensor
+        try:
+            if not getattr(sensor, "active", True):
+                return
+            entry.lateness.append(started - deadline)
+            if entry.last_start is not None:
+                entry.intervals.append(started - entry.last_start)
+            entry.last_start = started
+            sensor.read_value()
+            entry.reads += 1
+        except Exception as e:
+            entry.errors += 1
+            sys_logger.error(f"Błąd odczytu czujnika {sensor.sensor_id}: {e}")
+        finally:
+            entry.running = False
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Statystyki czujników: liczba odczytów, błędów, pominiętych terminów,
+        opóźnienie startu odczytu względem terminu (ms) oraz średni odstęp
+        między odczytami i jego odchylenie standardowe - jitter (ms).
+        """
+        with self._cond:
+            entries = dict(self._entries)
+        stats = {}
+        for sensor_id, entry in entries.items():
+            lateness = sorted(entry.lateness)
+            intervals = list(entry.intervals)
+            mean = sum(intervals) / len(intervals) if intervals else 0.0
+            jitter = (sum((x - mean) ** 2 for x in intervals) / len(intervals)) ** 0.5 if intervals else 0.0
+            stats[sensor_id] = {
+                "frequency_s": entry.period,
+                "reads": entry.reads,
+                "errors": entry.errors,
+                "skipped": entry.skipped,
+                "overruns": entry.overruns,
+                "lateness_ms_p50": percentile_ms(lateness, 0.50),
+                "lateness_ms_p99": percentile_ms(lateness, 0.99),
+                "lateness_ms_max": round(lateness[-1] * 1000, 3) if lateness else 0.0,
+                "interval_ms_mean": round(mean * 1000, 3),
+                "jitter_ms": round(jitter * 1000, 3),
+            }
+        return stats
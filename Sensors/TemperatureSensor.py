@@ -4,6 +4,8 @@ from Sensors.Sensor import Sensor
 from datetime import datetime
 
 class TemperatureSensor(Sensor):
+    precision = 2
+
     def __init__(self, sensor_id, name, unit, min_value, max_value, frequency=1):
         super().__init__(sensor_id, name, unit, min_value, max_value, frequency)
         self.base_temp = (min_value + max_value) / 2
@@ -12,26 +14,27 @@ class TemperatureSensor(Sensor):
         self.trend = 0.005
         self.time_counter = 0
 
-    def read_value(self):
-        if not self.active:
-            raise Exception(f"Czujnik {self.name} jest wyłączony.")
-
-        now = datetime.now()
+    def model(self, t, noise, now, xp=math):
+        """
+        Cykl dobowy według godziny `now`, opis parametrów: `Sensor.model`.
+        """
         hour = now.hour + now.minute / 60.0  # uwzględniamy dokładniejszy czas
 
         # Cykl dobowy temperatury (sinus: min nocą, max ok. 14:00)
-        daily_cycle = math.sin((hour - 6) / 24 * 2 * math.pi)
+        daily_cycle = xp.sin((hour - 6) / 24 * 2 * xp.pi)
 
-        # Wahania dzienne (amplituda dostosowana do zakresu)
-        temperature = self.base_temp + self.variation * daily_cycle
+        # Wahania dzienne (amplituda dostosowana do zakresu), trend i szum
+        return self.base_temp + self.variation * daily_cycle + self.trend * t + noise
 
-        temperature += self.trend * self.time_counter
+    def read_value(self):
+        if not self.active:
+            raise Exception(f"Czujnik {self.name} jest wyłączony.")
+
+        now = datetime.now()
 
         # Losowy szum
         noise = random.uniform(-self.noise_level, self.noise_level)
-        temperature += noise
-
-        temperature = round(max(min(temperature, self.max_value), self.min_value), 2)
+        temperature = self._clamp(self.model(self.time_counter, noise, now))
 
         self.last_value = temperature
         self.time_counter += 1
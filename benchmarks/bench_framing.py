@@ -0,0 +1,80 @@
+"""
+Mikro-benchmark dzielenia strumienia na linie.
+
+Porównuje dotychczasowe podejście (`recv(1024)`, `buffer += chunk`,
+`buffer.split(b"\\n", 1)`) z `LineFramer` (recv_into do wstępnie
+zaalokowanego bufora) dla paczek 10k-1M odczytów przesyłanych przez socketpair.
+
+Przykład:
+    python benchmarks/bench_framing.py --bursts 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.framing import LineFramer, DEFAULT_RECV_SIZE
+
+
+def _make_burst(count):
+    line = json.dumps({
+        "sensor_id": "T01",
+        "timestamp": datetime.now().isoformat(),
+        "value": 21.37,
+        "unit": "C"
+    }).encode() + b"\n"
+    return line * count
+
+
+def _naive(sock):
+    lines = 0
+    buffer = b""
+    while True:
+        chunk = sock.recv(1024)
+        if not chunk:
+            break
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            lines += 1
+    return lines
+
+
+def _framer(sock, recv_size):
+    lines = 0
+    framer = LineFramer(recv_size)
+    while framer.recv_into(sock):
+        for _ in framer.lines():
+            lines += 1
+    return lines
+
+
+def run(name, reader, payload):
+    a, b = socket.socketpair()
+    sender = threading.Thread(target=lambda: (a.sendall(payload), a.shutdown(socket.SHUT_WR)))
+    started = time.perf_counter()
+    sender.start()
+    lines = reader(b)
+    elapsed = time.perf_counter() - started
+    sender.join()
+    a.close()
+    b.close()
+    return {"method": name, "lines": lines, "seconds": round(elapsed, 4), "lines_per_sec": round(lines / elapsed)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bursts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--recv-size", type=int, default=DEFAULT_RECV_SIZE)
+    args = parser.parse_args()
+
+    for count in args.bursts:
+        payload = _make_burst(count)
+        print(json.dumps(run("naive", _naive, payload)))
+        print(json.dumps(run("framer", lambda s: _framer(s, args.recv_size), payload)))
@@ -0,0 +1,89 @@
+"""
+Zapis grupowy Loggera: przepustowość i opóźnienia dla polityk fsync.
+
+Dla każdej polityki (`never`, `interval`, `batch`) mierzy:
+- przepustowość zapisu `--readings` odczytów bez przerw,
+- opóźnienie zapisu przy rzadkich odczytach (`--slow-rate` odczytów/s),
+  gdzie bufor zapisywany jest na podstawie `flush_interval_ms`, a nie rozmiaru.
+
+Przykład:
+    python benchmarks/bench_group_commit.py --readings 100000 --flush-interval-ms 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Logger import Logger
+
+
+def _logger(log_dir, policy, flush_interval_ms, backend):
+    config_path = os.path.join(log_dir, "config.json")
+    with open(config_path, "w") as f:
+        json.dump({
+            "log_dir": log_dir,
+            "filename_pattern": "sensors_%Y%m%d.csv",
+            "buffer_size": 200,
+            "rotate_every_hours": 24,
+            "max_size_mb": 10_000,
+            "retention_days": 30,
+            "storage_backend": backend,
+            "flush_interval_ms": flush_interval_ms,
+            "fsync": policy,
+            "fsync_interval_s": 1.0
+        }, f)
+    return Logger(config_path)
+
+
+def run(policy, readings, slow_rate, slow_seconds, flush_interval_ms, backend):
+    with tempfile.TemporaryDirectory() as log_dir:
+        logger = _logger(log_dir, policy, flush_interval_ms, backend)
+        logger.start()
+        started = time.perf_counter()
+        for i in range(readings):
+            logger.log_reading("T01", datetime.now(), float(i), "C")
+        elapsed = time.perf_counter() - started
+        logger.stop()
+        throughput = logger.get_write_metrics()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        logger = _logger(log_dir, policy, flush_interval_ms, backend)
+        logger.start()
+        for i in range(int(slow_rate * slow_seconds)):
+            logger.log_reading("T02", datetime.now(), float(i), "C")
+            time.sleep(1 / slow_rate)
+        slow = logger.get_write_metrics()
+        logger.stop()
+
+    return {
+        "policy": policy,
+        "backend": backend,
+        "writes_per_sec": round(readings / elapsed),
+        "fsyncs": throughput["fsyncs"],
+        "write_ms_p50": throughput["write_ms_p50"],
+        "write_ms_p99": throughput["write_ms_p99"],
+        "slow_batches": slow["batches"],
+        "slow_commit_latency_ms_p50": slow["commit_latency_ms_p50"],
+        "slow_commit_latency_ms_p99": slow["commit_latency_ms_p99"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=100_000)
+    parser.add_argument("--slow-rate", type=float, default=20.0)
+    parser.add_argument("--slow-seconds", type=float, default=3.0)
+    parser.add_argument("--flush-interval-ms", type=int, default=200)
+    parser.add_argument("--policies", nargs="+", default=["never", "interval", "batch"])
+    parser.add_argument("--backend", choices=["csv", "columnar"], default="csv")
+    args = parser.parse_args()
+
+    for policy in args.policies:
+        print(json.dumps(run(
+            policy, args.readings, args.slow_rate, args.slow_seconds, args.flush_interval_ms, args.backend
+        )))
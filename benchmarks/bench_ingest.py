@@ -0,0 +1,242 @@
+"""
+Przepustowość i opóźnienia całej ścieżki: NetworkClient -> NetworkServer -> Logger.
+
+Uruchamia NetworkServer na localhost z Loggerem w katalogu tymczasowym
+i `--clients` równoległych klientów (wątki), z których każdy wysyła odczyty
+wygenerowane przez klasy czujników (po jednym czujniku każdego typu).
+W trybie `batch` odczyty wysyłane są przez `send_many` paczkami po `--batch`
+(opóźnienie = wysłanie paczki do potwierdzenia całej paczki), w trybie
+`single` przez `send` (opóźnienie jednego odczytu).
+
+Raportuje: odczyty/s, percentyle opóźnienia potwierdzeń, czas CPU na odczyt
+i maksymalny RSS procesu (serwer i klienci działają w jednym procesie, więc
+wynik obejmuje obie strony), a także statystyki zapisu Loggera.
+
+Wynik to jeden obiekt JSON; `--output` zapisuje go do pliku, a `--baseline`
+porównuje z wcześniejszym wynikiem i oznacza regresje większe niż
+`--threshold` procent (kod wyjścia 1, jeśli są).
+
+Przykład:
+    python benchmarks/bench_ingest.py --clients 8 --readings 5000 --output base.json
+    python benchmarks/bench_ingest.py --clients 8 --readings 5000 --baseline base.json
+"""
+import argparse
+import json
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Logger import Logger
+from network.client import NetworkClient
+from Sensors.AirQualitySensor import AirQualitySensor
+from Sensors.HumiditySensor import HumiditySensor
+from Sensors.PressureSensor import PressureSensor
+from Sensors.TemperatureSensor import TemperatureSensor
+from server.server import ACK_MODES, DEFAULT_ACK_MODE, NetworkServer
+from storage.stats import percentile_ms
+
+# kierunek metryk przy porównaniu z wynikiem bazowym
+HIGHER_IS_BETTER = ("readings_per_sec", "logger_rows_per_sec")
+LOWER_IS_BETTER = ("ack_ms_p50", "ack_ms_p95", "ack_ms_p99", "cpu_us_per_reading", "max_rss_mb",
+                   "logger_write_ms_p99", "logger_commit_latency_ms_p99")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _records(client_id, count):
+    """
+    Odczyty wygenerowane przez klasy czujników, w formacie wysyłanym przez main.py.
+    """
+    records = []
+
+    def collect(sensor_id, timestamp, value, unit):
+        records.append({
+            "sensor_id": sensor_id,
+            "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+            "value": value,
+            "unit": unit
+        })
+
+    sensors = [
+        PressureSensor(f"P{client_id:03d}", "PressureSensor", "hPa", 950, 1050),
+        HumiditySensor(f"H{client_id:03d}", "HumiditySensor", "%", 0, 100),
+        AirQualitySensor(f"A{client_id:03d}", "AirQualitySensor", "AQI", 0, 500),
+        TemperatureSensor(f"T{client_id:03d}", "TemperatureSensor", "°C", -20, 50),
+    ]
+    for sensor in sensors:
+        sensor.register_callback(collect)
+    while len(records) < count:
+        for sensor in sensors:
+            sensor.read_value()
+    return records[:count]
+
+
+def _client(port, records, args, barrier, latencies, acked):
+    client = NetworkClient("127.0.0.1", port, protocol=args.protocol, batch_size=args.batch, window=args.window)
+    client.connect()
+    barrier.wait()
+    own = []
+    count = 0
+    if args.mode == "batch":
+        for i in range(0, len(records), args.batch):
+            started = time.perf_counter()
+            count += client.send_many(records[i:i + args.batch])
+            own.append(time.perf_counter() - started)
+    else:
+        for data in records:
+            started = time.perf_counter()
+            count += client.send(data)
+            own.append(time.perf_counter() - started)
+    client.close()
+    latencies.extend(own)
+    acked.append(count)
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as log_dir:
+        config_path = os.path.join(log_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "log_dir": log_dir, "filename_pattern": "sensors_%Y%m%d.csv", "buffer_size": 200,
+                "rotate_every_hours": 24, "max_size_mb": 10_000, "retention_days": 30,
+                "storage_backend": args.backend, "query_cache_mb": 0
+            }, f)
+        logger = Logger(config_path)
+        logger.start()
+
+        port = _free_port()
+        server = NetworkServer(logger=logger, mode=args.server_mode, ack_mode=args.ack_mode)
+        server.configure(port)
+        thread = threading.Thread(target=server.start, daemon=True)
+        thread.start()
+        while not server.running:
+            time.sleep(0.01)
+
+        per_client = [_records(i, args.readings) for i in range(args.clients)]
+        barrier = threading.Barrier(args.clients + 1)
+        latencies, acked = [], []
+        threads = [
+            threading.Thread(target=_client, args=(port, records, args, barrier, latencies, acked))
+            for records in per_client
+        ]
+        for t in threads:
+            t.start()
+        barrier.wait()
+        cpu_started = _cpu_seconds()
+        started = time.perf_counter()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+        cpu = _cpu_seconds() - cpu_started
+
+        server.stop()
+        thread.join(timeout=5)
+        logger.stop()
+        write = logger.get_write_metrics()
+        rows = logger.line_count
+
+    latencies.sort()
+    total = sum(acked)
+    return {
+        "readings": args.clients * args.readings,
+        "acked": total,
+        "seconds": round(elapsed, 3),
+        "readings_per_sec": round(total / elapsed, 1),
+        "ack_ms_p50": percentile_ms(latencies, 0.50),
+        "ack_ms_p95": percentile_ms(latencies, 0.95),
+        "ack_ms_p99": percentile_ms(latencies, 0.99),
+        "cpu_us_per_reading": round(cpu / max(total, 1) * 1_000_000, 2),
+        "cpu_percent": round(cpu / elapsed * 100, 1),
+        # ru_maxrss w KB (Linux)
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "logger_rows": rows,
+        "logger_rows_per_sec": round(rows / elapsed, 1),
+        "logger_batches": write["batches"],
+        "logger_write_ms_p50": write["write_ms_p50"],
+        "logger_write_ms_p99": write["write_ms_p99"],
+        "logger_commit_latency_ms_p99": write["commit_latency_ms_p99"],
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(metrics, baseline, threshold):
+    """
+    Lista regresji względem `baseline`: metryki gorsze o więcej niż `threshold` procent.
+    """
+    regressions = []
+    for key in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+        old, new = baseline.get(key), metrics.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        worse = -change if key in HIGHER_IS_BETTER else change
+        if worse > threshold:
+            regressions.append({"metric": key, "baseline": old, "current": new, "change_percent": round(change, 1)})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--readings", type=int, default=5000, help="odczytów na klienta")
+    parser.add_argument("--mode", choices=["batch", "single"], default="batch")
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--window", type=int, default=1000)
+    parser.add_argument("--protocol", choices=["json", "binary"], default="json")
+    parser.add_argument("--server-mode", default="threaded")
+    parser.add_argument("--ack-mode", choices=ACK_MODES, default=DEFAULT_ACK_MODE)
+    parser.add_argument("--backend", choices=["csv", "columnar"], default="csv")
+    parser.add_argument("--repeat", type=int, default=1, help="liczba powtórzeń (wynik: mediana każdej metryki)")
+    parser.add_argument("--output", help="zapis wyniku do pliku JSON")
+    parser.add_argument("--baseline", help="wynik bazowy JSON do porównania")
+    parser.add_argument("--threshold", type=float, default=10.0, help="próg regresji w procentach")
+    args = parser.parse_args()
+
+    runs = [run(args) for _ in range(args.repeat)]
+    metrics = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "threshold", "repeat")}
+    result = {"commit": _commit(), "config": config, "metrics": metrics}
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            result["baseline_config_differs"] = True
+        result["baseline_commit"] = baseline.get("commit")
+        result["regressions"] = compare(metrics, baseline["metrics"], args.threshold)
+        exit_code = 1 if result["regressions"] else 0
+
+    print(json.dumps(result))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    sys.exit(exit_code)
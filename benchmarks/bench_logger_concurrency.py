@@ -0,0 +1,110 @@
+"""
+Test obciążeniowy Loggera przy wielu wątkach producentów.
+
+Każdy z `--threads` wątków zapisuje `--readings` odczytów własnego czujnika
+z kolejnymi wartościami 0..N-1, a wątek czytający w tym czasie pobiera
+`get_snapshot`. Po zatrzymaniu loggera wszystkie wiersze są wczytywane
+z plików (także archiwów po rotacjach) i sprawdzane: brak zgubionych
+i zdublowanych wierszy, poprawnie sparsowane pola oraz zachowana kolejność
+odczytów każdego producenta.
+
+Przykład:
+    python benchmarks/bench_logger_concurrency.py --threads 128 --readings 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Logger import Logger
+
+
+def run(threads, readings, backend, rotate_after_lines):
+    with tempfile.TemporaryDirectory() as log_dir:
+        config_path = os.path.join(log_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "log_dir": log_dir,
+                "filename_pattern": "sensors_%Y%m%d.csv",
+                "buffer_size": 200,
+                "rotate_every_hours": 24,
+                "max_size_mb": 10_000,
+                "rotate_after_lines": rotate_after_lines,
+                "retention_days": 30,
+                "storage_backend": backend
+            }, f)
+        logger = Logger(config_path)
+        logger.start()
+
+        begin = datetime.now() - timedelta(hours=1)
+        barrier = threading.Barrier(threads + 1)
+        done = threading.Event()
+        snapshots = 0
+
+        def producer(n):
+            barrier.wait()
+            sensor_id = f"T{n:03d}"
+            for i in range(readings):
+                logger.log_reading(sensor_id, begin + timedelta(microseconds=i), float(i), "C")
+
+        def reader():
+            nonlocal snapshots
+            while not done.is_set():
+                logger.get_snapshot()
+                snapshots += 1
+
+        workers = [threading.Thread(target=producer, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        reader_thread = threading.Thread(target=reader)
+        reader_thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        reader_thread.join()
+        logger.stop()
+
+        last = {}
+        rows = 0
+        errors = 0
+        for row in logger.read_logs(begin - timedelta(seconds=1), begin + timedelta(seconds=1)):
+            rows += 1
+            previous = last.get(row["sensor_id"], -1.0)
+            if row["value"] != previous + 1 or row["unit"] != "C":
+                errors += 1
+            last[row["sensor_id"]] = row["value"]
+
+        complete = len(last) == threads and all(v == readings - 1 for v in last.values())
+        return {
+            "backend": backend,
+            "threads": threads,
+            "expected_rows": threads * readings,
+            "rows": rows,
+            "order_errors": errors,
+            "ok": rows == threads * readings and errors == 0 and complete,
+            "readings_per_sec": round(threads * readings / elapsed),
+            "snapshots": snapshots,
+            "rotations": logger.rotations,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=128)
+    parser.add_argument("--readings", type=int, default=2000)
+    parser.add_argument("--backend", choices=["csv", "columnar"], default="csv")
+    parser.add_argument("--rotate-after-lines", type=int, default=50_000)
+    args = parser.parse_args()
+
+    result = run(args.threads, args.readings, args.backend, args.rotate_after_lines)
+    print(json.dumps(result))
+    sys.exit(0 if result["ok"] else 1)
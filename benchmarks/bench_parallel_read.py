@@ -0,0 +1,105 @@
+"""
+Równoległy odczyt archiwów (`read_rows(workers=N)`) kontra sekwencyjny.
+
+Generuje `--days` dni syntetycznych archiwów ZIP (jedno na dzień, CSV
+z indeksem lub plik kolumnowy) i odczytuje cały zakres dla kolejnych
+liczb procesów, w trybie uporządkowanym (scalanie po czasie) oraz
+strumieniowym (archiwa w kolejności ukończenia). Sprawdza, czy liczba
+wierszy się zgadza, a tryb uporządkowany zwraca wiersze rosnąco po czasie.
+
+Przykład:
+    python benchmarks/bench_parallel_read.py --days 30 --rows-per-day 86400 --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Logger import Logger
+from storage.backends import writer_class
+from storage.log_index import index_csv
+
+
+def _generate(log_dir, backend, days, rows_per_day, sensors, begin):
+    cls = writer_class(backend)
+    archive_dir = os.path.join(log_dir, "archive")
+    os.makedirs(archive_dir, exist_ok=True)
+    step = 86_400 / rows_per_day
+    for day in range(days):
+        day_start = begin + timedelta(days=day)
+        member = f"sensors_{day_start:%Y%m%d}{cls.extension}"
+        path = os.path.join(log_dir, member)
+        writer = cls(path)
+        writer.write_rows(
+            (day_start + timedelta(seconds=i * step), f"S{i % sensors:02d}", float(i % 1000), "C")
+            for i in range(rows_per_day)
+        )
+        writer.close()
+        archive_path = os.path.join(archive_dir, f"{member}_{day_start:%Y%m%d}_000000.zip")
+        compression = zipfile.ZIP_DEFLATED if backend == "csv" else zipfile.ZIP_STORED
+        with zipfile.ZipFile(archive_path, "w", compression) as zipf:
+            zipf.write(path, arcname=member)
+        if backend == "csv":
+            index_csv(path, target=archive_path, member=member)
+        os.remove(path)
+
+
+def _measure(logger, begin, end, workers, ordered):
+    started = time.perf_counter()
+    rows = 0
+    previous = None
+    in_order = True
+    for row in logger.read_rows(begin, end, workers=workers, ordered=ordered):
+        rows += 1
+        if previous is not None and row[0] < previous:
+            in_order = False
+        previous = row[0]
+    return rows, time.perf_counter() - started, in_order
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--rows-per-day", type=int, default=20_000)
+    parser.add_argument("--sensors", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--backend", choices=["csv", "columnar"], default="csv")
+    args = parser.parse_args()
+
+    begin = datetime(2025, 1, 1)
+    end = begin + timedelta(days=args.days)
+    with tempfile.TemporaryDirectory() as log_dir:
+        _generate(log_dir, args.backend, args.days, args.rows_per_day, args.sensors, begin)
+        config_path = os.path.join(log_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "log_dir": log_dir, "filename_pattern": "sensors_%Y%m%d.csv", "buffer_size": 200,
+                "rotate_every_hours": 24, "max_size_mb": 5, "retention_days": 10_000,
+                "storage_backend": args.backend
+            }, f)
+        logger = Logger(config_path)
+        expected = args.days * args.rows_per_day
+
+        for workers in sorted(set(args.workers)):
+            for ordered in ([True] if workers == 1 else [True, False]):
+                # pierwsze wywołanie uruchamia pulę procesów
+                if workers > 1:
+                    _measure(logger, end, end, workers, ordered)
+                rows, seconds, in_order = _measure(logger, begin, end, workers, ordered)
+                print(json.dumps({
+                    "backend": args.backend,
+                    "cpus": os.cpu_count(),
+                    "workers": workers,
+                    "ordered": ordered,
+                    "rows": rows,
+                    "ok": rows == expected and (in_order or not ordered),
+                    "seconds": round(seconds, 3),
+                    "rows_per_sec": round(rows / seconds),
+                }))
+        logger.stop()
@@ -0,0 +1,80 @@
+"""
+Porównanie protokołu JSON i binarnego: bajty na odczyt oraz czas CPU
+serializacji (klient) i parsowania (serwer) w przeliczeniu na odczyt.
+
+Przykład:
+    python benchmarks/bench_protocol.py --readings 200000 --sensors 100
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.framing import LineFramer
+from network.protocol import BinaryEncoder, BinaryDecoder
+
+
+def _readings(count, sensors):
+    start = datetime.now()
+    return [
+        {
+            "sensor_id": f"S{i % sensors:04d}",
+            "timestamp": (start + timedelta(milliseconds=i)).isoformat(),
+            "value": 20.0 + (i % 1000) / 100,
+            "unit": "°C"
+        }
+        for i in range(count)
+    ]
+
+
+def bench_json(readings):
+    started = time.process_time()
+    payload = b"".join(json.dumps(data).encode("utf-8") + b"\n" for data in readings)
+    encode = time.process_time() - started
+
+    framer = LineFramer(len(payload) + 1)
+    framer.feed(payload)
+    started = time.process_time()
+    for line in framer.lines():
+        data = json.loads(line.decode())
+        datetime.fromisoformat(data["timestamp"])
+    decode = time.process_time() - started
+    return len(payload), encode, decode
+
+
+def bench_binary(readings):
+    encoder = BinaryEncoder()
+    started = time.process_time()
+    payload = b"".join(encoder.encode(data) for data in readings)
+    encode = time.process_time() - started
+
+    framer = LineFramer(len(payload) + 1)
+    framer.feed(payload)
+    decoder = BinaryDecoder()
+    started = time.process_time()
+    for frame in framer.frames():
+        decoder.decode(frame)
+    decode = time.process_time() - started
+    return len(payload), encode, decode
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=100)
+    args = parser.parse_args()
+
+    readings = _readings(args.readings, args.sensors)
+    for name, bench in (("json", bench_json), ("binary", bench_binary)):
+        size, encode, decode = bench(readings)
+        print(json.dumps({
+            "protocol": name,
+            "readings": args.readings,
+            "bytes_per_reading": round(size / args.readings, 2),
+            "encode_us_per_reading": round(encode / args.readings * 1e6, 3),
+            "parse_us_per_reading": round(decode / args.readings * 1e6, 3),
+        }))
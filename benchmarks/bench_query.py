@@ -0,0 +1,114 @@
+"""
+Raport historyczny: iteracja `read_logs` z agregacją w Pythonie
+kontra wektorowe `Logger.query` (wymaga numpy).
+
+Generuje syntetyczne dane 1 Hz dla `--sensors` czujników z `--days` dni
+(jeden plik dziennie w archiwum) i liczy średnią/min/max/p95 co godzinę.
+Zapytanie wykonywane jest dwukrotnie: powtórzone korzysta z pamięci
+podręcznej zamkniętych przedziałów (`query_cache_mb`).
+
+Przykład:
+    python benchmarks/bench_query.py --days 7 --sensors 2 --backend columnar
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Logger import Logger
+from storage.backends import writer_class
+from storage.log_index import index_csv
+
+
+def _generate(log_dir, backend, days, sensors, begin):
+    cls = writer_class(backend)
+    archive_dir = os.path.join(log_dir, "archive")
+    os.makedirs(archive_dir, exist_ok=True)
+    for day in range(days):
+        name = f"sensors_{(begin + timedelta(days=day)):%Y%m%d}{cls.extension}"
+        path = os.path.join(log_dir, name)
+        writer = cls(path)
+        day_start = begin + timedelta(days=day)
+        rows = []
+        for second in range(86_400):
+            timestamp = day_start + timedelta(seconds=second)
+            for s in range(sensors):
+                rows.append((timestamp, f"S{s:02d}", 20 + 5 * math.sin(second / 3600 + s), "C"))
+            if len(rows) >= 10_000:
+                writer.write_rows(rows)
+                rows = []
+        writer.write_rows(rows)
+        writer.close()
+        archive_path = os.path.join(archive_dir, f"{name}.zip")
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_STORED) as zipf:
+            zipf.write(path, arcname=name)
+        if backend == "csv":
+            # jak przy rotacji Loggera: indeks pozwala pomijać bloki spoza zapytania
+            index_csv(path, target=archive_path, member=name)
+        os.remove(path)
+
+
+def _python_report(logger, sensor_id, start, end):
+    buckets = {}
+    for row in logger.read_logs(start, end, sensor_id):
+        key = int((row["timestamp"] - start).total_seconds() // 3600)
+        buckets.setdefault(key, []).append(row["value"])
+    report = {}
+    for key, values in buckets.items():
+        values.sort()
+        report[key] = (sum(values) / len(values), values[0], values[-1], values[int(0.95 * (len(values) - 1))])
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--sensors", type=int, default=2)
+    parser.add_argument("--backend", choices=["csv", "columnar"], default="columnar")
+    args = parser.parse_args()
+
+    begin = datetime(2025, 1, 1)
+    end = begin + timedelta(days=args.days)
+    with tempfile.TemporaryDirectory() as log_dir:
+        _generate(log_dir, args.backend, args.days, args.sensors, begin)
+        config_path = os.path.join(log_dir, "config.json")
+        with open(config_path, "w") as f:
+            json.dump({
+                "log_dir": log_dir, "filename_pattern": "sensors_%Y%m%d.csv", "buffer_size": 200,
+                "rotate_every_hours": 24, "max_size_mb": 5, "retention_days": 10_000,
+                "memory_retention_hours": 0, "aggregate_windows_hours": [],
+                "storage_backend": args.backend
+            }, f)
+        logger = Logger(config_path)
+
+        started = time.perf_counter()
+        report = _python_report(logger, "S00", begin, end)
+        python_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = logger.query(["S00"], begin, end, resample="1h", aggs=["mean", "min", "max", "p95"])
+        query_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        cached = logger.query(["S00"], begin, end, resample="1h", aggs=["mean", "min", "max", "p95"])
+        cached_seconds = time.perf_counter() - started
+        cache_metrics = logger.get_cache_metrics()
+
+    print(json.dumps({
+        "backend": args.backend,
+        "readings": args.days * 86_400,
+        "buckets": len(report),
+        "read_logs_seconds": round(python_seconds, 3),
+        "query_seconds": round(query_seconds, 3),
+        "query_buckets": len(result["S00"]["mean"]),
+        "cached_query_seconds": round(cached_seconds, 4),
+        "cached_equal": all((cached["S00"][key] == result["S00"][key]).all() for key in result["S00"]),
+        "cache_hit_ratio": cache_metrics["cache_hit_ratio"],
+    }))
@@ -0,0 +1,97 @@
+"""
+Harmonogram czujników: dokładność terminów przy wielu częstotliwościach.
+
+Porównuje dotychczasową pętlę z main.py (odczyt wszystkich czujników po kolei
+i `time.sleep(1)`) z SensorScheduler bez puli i z pulą wątków. Część czujników
+ma wolny odczyt (`--slow-ms`), co w pętli i w trybie bez puli opóźnia pozostałe.
+Raportuje liczbę odczytów względem oczekiwanej oraz opóźnienie i jitter
+szybkich czujników.
+
+Przykład:
+    python benchmarks/bench_scheduler.py --sensors 2000 --seconds 5 --workers 0 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sensors.SensorScheduler import SensorScheduler
+from Sensors.TemperatureSensor import TemperatureSensor
+
+FREQUENCIES = (0.1, 0.5, 1.0)
+
+
+class SlowSensor(TemperatureSensor):
+    def __init__(self, *args, delay=0.05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+
+    def read_value(self):
+        time.sleep(self.delay)
+        return super().read_value()
+
+
+def _sensors(count, slow, slow_ms):
+    sensors = []
+    for i in range(count):
+        frequency = FREQUENCIES[i % len(FREQUENCIES)]
+        if i < slow:
+            sensor = SlowSensor(f"X{i:05d}", "SlowSensor", "°C", -20, 50, 1.0, delay=slow_ms / 1000)
+        else:
+            sensor = TemperatureSensor(f"T{i:05d}", "TemperatureSensor", "°C", -20, 50, frequency)
+        sensors.append(sensor)
+    return sensors
+
+
+def _expected(sensors, seconds):
+    return sum(int(seconds / sensor.frequency) + 1 for sensor in sensors)
+
+
+def _summary(mode, sensors, reads, seconds, stats=None):
+    result = {"mode": mode, "sensors": len(sensors), "reads": reads, "expected": _expected(sensors, seconds)}
+    if stats:
+        fast = [s for sensor_id, s in stats.items() if sensor_id.startswith("T") and s["frequency_s"] == FREQUENCIES[0]]
+        result["fast_lateness_ms_p99"] = max((s["lateness_ms_p99"] for s in fast), default=0.0)
+        result["fast_jitter_ms_max"] = max((s["jitter_ms"] for s in fast), default=0.0)
+        result["skipped"] = sum(s["skipped"] for s in stats.values())
+    return result
+
+
+def run_loop(count, slow, slow_ms, seconds):
+    sensors = _sensors(count, slow, slow_ms)
+    reads = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for sensor in sensors:
+            sensor.read_value()
+            reads += 1
+        time.sleep(1)
+    return _summary("sleep_loop", sensors, reads, seconds)
+
+
+def run_scheduler(count, slow, slow_ms, seconds, workers):
+    sensors = _sensors(count, slow, slow_ms)
+    scheduler = SensorScheduler(sensors, workers=workers, spread=True)
+    scheduler.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    stats = scheduler.get_stats()
+    reads = sum(s["reads"] for s in stats.values())
+    return _summary(f"scheduler_workers_{workers}", sensors, reads, seconds, stats)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sensors", type=int, default=2000)
+    parser.add_argument("--slow", type=int, default=4, help="liczba czujników z wolnym odczytem")
+    parser.add_argument("--slow-ms", type=float, default=50.0)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 4])
+    args = parser.parse_args()
+
+    print(json.dumps(run_loop(args.sensors, args.slow, args.slow_ms, args.seconds)))
+    for workers in args.workers:
+        print(json.dumps(run_scheduler(args.sensors, args.slow, args.slow_ms, args.seconds, workers)))
@@ -0,0 +1,104 @@
+"""
+Generowanie odczytów do testów obciążeniowych: wektorowy SensorBank
+kontra pętla po obiektach Sensor (`read_value`), w odczytach na sekundę.
+
+Opcjonalnie (`--port`) paczki z banku wysyłane są do działającego serwera
+przez NetworkClient.send_many, co mierzy przepustowość całej ścieżki ingestu.
+
+Przykład:
+    python benchmarks/bench_sensor_bank.py --per-type 1000 --ticks 50 --seed 1
+    python benchmarks/bench_sensor_bank.py --per-type 250 --ticks 20 --port 9000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sensors.SensorBank import SensorBank
+from Sensors.AirQualitySensor import AirQualitySensor
+from Sensors.HumiditySensor import HumiditySensor
+from Sensors.PressureSensor import PressureSensor
+from Sensors.TemperatureSensor import TemperatureSensor
+
+SENSOR_TYPES = [
+    (TemperatureSensor, "°C", -20, 50),
+    (HumiditySensor, "%", 0, 100),
+    (PressureSensor, "hPa", 950, 1050),
+    (AirQualitySensor, "AQI", 0, 500),
+]
+
+
+def bench_objects(per_type, ticks):
+    received = []
+    sensors = []
+    for sensor_class, unit, min_value, max_value in SENSOR_TYPES:
+        for i in range(per_type):
+            sensor = sensor_class(f"{sensor_class.__name__[0]}{i}", sensor_class.__name__, unit, min_value, max_value)
+            sensor.register_callback(lambda *reading: received.append(reading))
+            sensors.append(sensor)
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for sensor in sensors:
+            sensor.read_value()
+    return len(received), time.perf_counter() - started
+
+
+def _bank(per_type, seed):
+    bank = SensorBank(seed)
+    for sensor_class, unit, min_value, max_value in SENSOR_TYPES:
+        bank.add(sensor_class, per_type, unit, min_value, max_value)
+    return bank
+
+
+def bench_bank(per_type, ticks, seed):
+    bank = _bank(per_type, seed)
+    received = []
+    bank.register_batch_callback(received.append)
+    begin = datetime(2025, 1, 1)
+    started = time.perf_counter()
+    for tick in range(ticks):
+        bank.tick(begin + timedelta(seconds=tick))
+    return sum(len(batch) for batch in received), time.perf_counter() - started
+
+
+def bench_send(per_type, ticks, seed, host, port, protocol):
+    from network.client import NetworkClient
+
+    bank = _bank(per_type, seed)
+    client = NetworkClient(host, port, protocol=protocol, batch_size=500, window=5000)
+    client.connect()
+    sent = acked = 0
+    started = time.perf_counter()
+    for _ in range(ticks):
+        batch = bank.tick()
+        sent += len(batch)
+        acked += client.send_many(batch.records())
+    elapsed = time.perf_counter() - started
+    client.close()
+    return sent, acked, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-type", type=int, default=1000, help="liczba czujników każdego typu")
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port działającego serwera (pomija wysyłkę, jeśli brak)")
+    parser.add_argument("--protocol", choices=["json", "binary"], default="json")
+    args = parser.parse_args()
+
+    readings, seconds = bench_objects(args.per_type, args.ticks)
+    print(json.dumps({"mode": "objects", "readings": readings, "seconds": round(seconds, 3),
+                      "readings_per_sec": round(readings / seconds)}))
+    readings, seconds = bench_bank(args.per_type, args.ticks, args.seed)
+    print(json.dumps({"mode": "bank", "readings": readings, "seconds": round(seconds, 3),
+                      "readings_per_sec": round(readings / seconds)}))
+    if args.port:
+        sent, acked, seconds = bench_send(args.per_type, args.ticks, args.seed, args.host, args.port, args.protocol)
+        print(json.dumps({"mode": "bank+send", "protocol": args.protocol, "readings": sent, "acked": acked,
+                          "seconds": round(seconds, 3), "readings_per_sec": round(sent / seconds)}))
@@ -0,0 +1,84 @@
+"""
+Porównanie trybów NetworkServer (threaded vs async).
+
+Otwiera N jednoczesnych połączeń (klienci asyncio), każde wysyła M odczytów
+i czeka na ACK po każdym z nich. Wypisuje przepustowość w odczytach/s.
+
+Przykład:
+    python benchmarks/bench_server_modes.py --mode async --connections 2000 --readings 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.server import NetworkServer, SERVER_MODES
+
+
+async def _client(port, readings, sensor_id):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    line = json.dumps({
+        "sensor_id": sensor_id,
+        "timestamp": datetime.now().isoformat(),
+        "value": 1.0,
+        "unit": "C"
+    }).encode() + b"\n"
+    acked = 0
+    for _ in range(readings):
+        writer.write(line)
+        await writer.drain()
+        if (await reader.readline()).strip() == b"ACK":
+            acked += 1
+    writer.close()
+    return acked
+
+
+async def _run_clients(port, connections, readings):
+    tasks = [_client(port, readings, f"S{i:05d}") for i in range(connections)]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    return sum(r for r in results if isinstance(r, int)), sum(1 for r in results if not isinstance(r, int))
+
+
+def run(mode, port, connections, readings):
+    server = NetworkServer(mode=mode, max_connections=connections)
+    server.configure(port)
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    while not server.running:
+        if not thread.is_alive():
+            raise RuntimeError(f"Serwer w trybie {mode} nie wystartował")
+        time.sleep(0.01)
+
+    started = time.perf_counter()
+    acked, failed = asyncio.run(_run_clients(port, connections, readings))
+    elapsed = time.perf_counter() - started
+
+    server.stop()
+    thread.join(timeout=5)
+    return {
+        "mode": mode,
+        "connections": connections,
+        "failed_connections": failed,
+        "acked": acked,
+        "seconds": round(elapsed, 3),
+        "readings_per_sec": round(acked / elapsed, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=SERVER_MODES + ("both",), default="both")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--readings", type=int, default=20)
+    args = parser.parse_args()
+
+    modes = SERVER_MODES if args.mode == "both" else (args.mode,)
+    for i, mode in enumerate(modes):
+        print(json.dumps(run(mode, args.port + i, args.connections, args.readings)))
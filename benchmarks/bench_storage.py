@@ -0,0 +1,85 @@
+"""
+Porównanie formatów zapisu logów: CSV i kolumnowego (storage.columnar).
+
+Dla każdego formatu mierzy przepustowość zapisu przez Logger, liczbę
+bajtów na odczyt oraz szybkość skanu `read_logs` (cały zakres oraz
+jeden czujnik w ostatniej godzinie).
+
+Przykład:
+    python benchmarks/bench_storage.py --readings 200000 --sensors 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Logger import Logger
+
+
+def _make_logger(log_dir, backend):
+    config_path = os.path.join(log_dir, "config.json")
+    with open(config_path, "w") as f:
+        json.dump({
+            "log_dir": log_dir,
+            "filename_pattern": "sensors_%Y%m%d.csv",
+            "buffer_size": 200,
+            "rotate_every_hours": 10_000,
+            "max_size_mb": 10_000,
+            "retention_days": 30,
+            "memory_retention_hours": 0,
+            "aggregate_windows_hours": [],
+            "storage_backend": backend
+        }, f)
+    return Logger(config_path)
+
+
+def _time_scan(logger, start, end, sensor_id=None):
+    started = time.perf_counter()
+    rows = sum(1 for _ in logger.read_logs(start, end, sensor_id))
+    return rows, time.perf_counter() - started
+
+
+def run(backend, readings, sensors):
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as log_dir:
+        logger = _make_logger(log_dir, backend)
+        logger.start()
+        begin = datetime.now() - timedelta(seconds=readings)
+        started = time.perf_counter()
+        for i in range(readings):
+            logger.log_reading(f"S{i % sensors:02d}", begin + timedelta(seconds=i), round(rng.uniform(0, 100), 2), "C")
+        logger.stop()
+        write_seconds = time.perf_counter() - started
+
+        size = os.path.getsize(os.path.join(log_dir, logger.current_filename))
+        end = begin + timedelta(seconds=readings)
+        full_rows, full_seconds = _time_scan(logger, begin, end)
+        hour_rows, hour_seconds = _time_scan(logger, end - timedelta(hours=1), end, "S00")
+
+    return {
+        "backend": backend,
+        "readings": readings,
+        "writes_per_sec": round(readings / write_seconds),
+        "bytes_per_reading": round(size / readings, 2),
+        "full_scan_rows": full_rows,
+        "full_scan_rows_per_sec": round(full_rows / full_seconds),
+        "hour_scan_rows": hour_rows,
+        "hour_scan_ms": round(hour_seconds * 1000, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readings", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--backends", nargs="+", default=["csv", "columnar"])
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        print(json.dumps(run(backend, args.readings, args.sensors)))
@@ -1,11 +1,18 @@
+import queue
 import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 import json
 
 from Logger import Logger
-from server.server import NetworkServer
+from storage.downsample import MinMaxDownsampler
+from network import system_logger
+from network.config import load_config
+from network.framing import DEFAULT_RECV_SIZE, DEFAULT_MAX_FRAME
+from network.metrics import REGISTRY, MetricsServer
+from server.server import DEFAULT_ACK_MODE, NetworkServer
 
 
 class ServerThread(threading.Thread):
@@ -23,21 +30,149 @@ class ServerThread(threading.Thread):
                 self.on_error_callback(str(e))
 
 
+def format_row(sensor_id, data):
+    """
+    Wartości wiersza tabeli dla czujnika z `Logger.get_snapshot(hours=(1, 12))`.
+    """
+    stats_1h, stats_12h = data["stats"][1], data["stats"][12]
+    avg_1h = stats_1h["mean"] if stats_1h else None
+    avg_12h = stats_12h["mean"] if stats_12h else None
+    ts_str = data["timestamp"].strftime("%Y-%m-%d %H:%M:%S") if isinstance(data["timestamp"], datetime) else str(data["timestamp"])
+    return (
+        sensor_id,
+        f"{data['last_value']:.2f}",
+        data["unit"],
+        ts_str,
+        f"{avg_1h:.2f}" if avg_1h is not None else "-",
+        f"{avg_12h:.2f}" if avg_12h is not None else "-"
+    )
+
+
+def format_metrics(values, rate):
+    """
+    Podsumowanie metryk na pasku stanu: aktywne połączenia, przyjęte odczyty
+    i ich tempo, błędy parsowania oraz p99 czasu zapisu Loggera
+    (górna granica przedziału histogramu).
+    """
+    flush_p99 = values.get("logger_flush_seconds_p99")
+    flush = f"≤ {flush_p99 * 1000:g} ms" if flush_p99 is not None else "-"
+    return (
+        f"Połączenia: {values.get('server_connections_active', 0)} | "
+        f"odczyty: {values.get('server_readings_total', 0)} ({rate:.0f}/s) | "
+        f"błędy: {values.get('server_parse_errors_total', 0)} | "
+        f"zapis p99: {flush}"
+    )
+
+
+class SnapshotWorker(threading.Thread):
+    """
+    Co `interval` sekund pobiera stan loggera i formatuje wiersze tabeli poza
+    wątkiem Tk, a wynik wkłada do kolejki: {"rows": {sensor_id: wartości wiersza},
+    "trend": dane wykresu wybranego czujnika lub None}.
+    Kolejka ma miejsce na jeden wynik - nieodebrany starszy jest zastępowany.
+
+    Wykres czujnika wskazanego przez `show_trend` liczony jest przyrostowo
+    (MinMaxDownsampler), więc każde odświeżenie przetwarza tylko nowe odczyty.
+    """
+
+    def __init__(self, logger, results, interval=3.0, enabled=lambda: True, trend_hours=12):
+        super().__init__(name="SnapshotWorker")
+        self.logger = logger
+        self.results = results
+        self.interval = interval
+        self.enabled = enabled
+        self.trend_hours = trend_hours
+        self.trend = None
+        self.trend_request = None
+        self.wake = threading.Event()
+        self.stopped = False
+        self.daemon = True
+
+    def show_trend(self, sensor_id, width):
+        """
+        Wybiera czujnik i szerokość wykresu (px); wynik pojawi się bez czekania na `interval`.
+        """
+        self.trend_request = (sensor_id, width)
+        self.wake.set()
+
+    def run(self):
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            if self.stopped:
+                return
+            if not self.enabled():
+                continue
+            snapshot = self.logger.get_snapshot(hours=(1, 12))
+            rows = {sensor_id: format_row(sensor_id, data) for sensor_id, data in snapshot.items()}
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                pass
+            self.results.put({"rows": rows, "trend": self._trend()})
+
+    def _trend(self):
+        request = self.trend_request
+        if request is None:
+            return None
+        sensor_id, width = request
+        if self.trend is None or (self.trend.sensor_id, self.trend.width) != request:
+            self.trend = MinMaxDownsampler(sensor_id, self.trend_hours * 3600, width)
+        self.logger.update_trend(self.trend)
+        return {
+            "sensor_id": sensor_id,
+            "width": width,
+            "points": self.trend.points(time.time()),
+            "range": self.trend.value_range(),
+        }
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
+
+
 class SensorGUI(tk.Tk):
+    # odświeżanie danych (s), sprawdzanie kolejki wyników (ms), wierszy na stronę
+    REFRESH_S = 3.0
+    POLL_MS = 200
+    PAGE_SIZE = 100
+    TREND_HEIGHT = 120
+
     def __init__(self, logger):
         super().__init__()
         self.title("Serwer TCP - GUI czujników")
         self.geometry("750x400")
 
         self.logger = logger
+        # okna średnich wyświetlanych w tabeli liczone przyrostowo przez logger
+        self.logger.register_window(1)
+        self.logger.register_window(12)
         self.server_thread = None
         self.server = None
+        self.settings = {}
 
         self.updating_enabled = False  # domyślnie wyłączone
 
+        # ostatnie wartości wierszy wszystkich czujników, posortowane identyfikatory,
+        # czujniki widoczne na bieżącej stronie (tylko one są w Treeview)
+        # i wyświetlane wartości ich wierszy
+        self.rows = {}
+        self.sensor_ids = []
+        self.visible_ids = []
+        self.shown = {}
+        self.page = 0
+        # (czas, liczba odczytów) poprzedniego odświeżenia metryk - do tempa odczytów
+        self._metrics_prev = None
+
         self.create_widgets()
         self.load_port_from_settings()  # Załaduj port z pliku
+
+        # agregaty liczone w tle, wyniki odbierane w wątku Tk przez kolejkę
+        self.results = queue.Queue(maxsize=1)
+        self.snapshot_worker = SnapshotWorker(self.logger, self.results, self.REFRESH_S, lambda: self.updating_enabled)
+        self.snapshot_worker.start()
         self.update_table()
+        self.update_metrics()
 
         self.minsize(800, 300)
 
@@ -64,15 +199,35 @@ class SensorGUI(tk.Tk):
             self.tree.column(col, width=100, anchor=tk.CENTER)
         self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        self.status_var = tk.StringVar(value="Serwer zatrzymany.")
-        status_bar = tk.Label(self, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W)
+        page_frame = tk.Frame(self)
+        page_frame.pack(fill=tk.X, padx=5)
+        self.prev_button = tk.Button(page_frame, text="<", command=lambda: self.show_page(self.page - 1))
+        self.prev_button.pack(side=tk.LEFT)
+        self.page_var = tk.StringVar(value="Strona 1/1")
+        tk.Label(page_frame, textvariable=self.page_var).pack(side=tk.LEFT, padx=5)
+        self.next_button = tk.Button(page_frame, text=">", command=lambda: self.show_page(self.page + 1))
+        self.next_button.pack(side=tk.LEFT)
+
+        # wykres ostatnich 12 h czujnika zaznaczonego w tabeli
+        self.trend_canvas = tk.Canvas(self, height=self.TREND_HEIGHT, bg="white", highlightthickness=0)
+        self.trend_canvas.pack(fill=tk.X, padx=5, pady=5)
+        self.trend_line = None
+        self.trend_label = self.trend_canvas.create_text(4, 4, anchor=tk.NW, text="Wybierz czujnik w tabeli")
+        self.tree.bind("<<TreeviewSelect>>", lambda event: self.request_trend())
+        self.trend_canvas.bind("<Configure>", lambda event: self.request_trend())
+
+        status_bar = tk.Frame(self, bd=1, relief=tk.SUNKEN)
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
+        self.status_var = tk.StringVar(value="Serwer zatrzymany.")
+        tk.Label(status_bar, textvariable=self.status_var, anchor=tk.W).pack(side=tk.LEFT)
+        self.metrics_var = tk.StringVar(value="")
+        tk.Label(status_bar, textvariable=self.metrics_var, anchor=tk.E).pack(side=tk.RIGHT)
 
     def load_port_from_settings(self):
         try:
             with open("settings.json", "r") as f:
-                settings = json.load(f)
-                port = settings.get("port", 9000)
+                self.settings = json.load(f)
+                port = self.settings.get("port", 9000)
                 self.port_var.set(str(port))
         except Exception:
             pass
@@ -84,10 +239,11 @@ class SensorGUI(tk.Tk):
             messagebox.showerror("Błąd", "Port musi być liczbą całkowitą.")
             return
 
-        # Zapis portu do settings.json
+        # Zapis portu do settings.json (z zachowaniem pozostałych ustawień)
+        self.settings["port"] = port
         try:
             with open("settings.json", "w") as f:
-                json.dump({"port": port}, f)
+                json.dump(self.settings, f)
         except Exception as e:
             messagebox.showwarning("Ostrzeżenie", f"Nie udało się zapisać ustawień: {e}")
 
@@ -95,7 +251,17 @@ class SensorGUI(tk.Tk):
             messagebox.showinfo("Info", "Serwer już działa.")
             return
 
-        self.server = NetworkServer(logger=self.logger)
+        self.server = NetworkServer(
+            logger=self.logger,
+            mode=self.settings.get("server_mode", "threaded"),
+            max_connections=self.settings.get("max_connections", 1000),
+            idle_timeout=self.settings.get("idle_timeout", 60.0),
+            recv_size=self.settings.get("recv_size", DEFAULT_RECV_SIZE),
+            max_frame_size=self.settings.get("max_frame_size", DEFAULT_MAX_FRAME),
+            ack_mode=self.settings.get("ack_mode", DEFAULT_ACK_MODE),
+            workers=self.settings.get("workers"),
+            worker_mode=self.settings.get("worker_mode", "async")
+        )
         self.server.configure(port)
         self.server_thread = ServerThread(self.server, self.on_server_error)
         self.server_thread.start()
@@ -128,40 +294,137 @@ class SensorGUI(tk.Tk):
         self.updating_enabled = False
 
     def update_table(self):
-        if not self.updating_enabled:
-            # Nie aktualizujemy jeśli flaga wyłączona
-            self.after(3000, self.update_table)  # odpalamy ponownie za 3 sekundy
+        """
+        Odbiera z kolejki najnowszy stan czujników (bez czekania) i nanosi
+        zmiany na tabelę; wywoływane cyklicznie w wątku Tk.
+        """
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            result = None
+        if result is not None:
+            rows = result["rows"]
+            self.rows = rows
+            if len(rows) != len(self.sensor_ids) or any(sensor_id not in rows for sensor_id in self.sensor_ids):
+                self.sensor_ids = sorted(rows)
+            self.show_page(self.page)
+            if result["trend"] is not None:
+                self.draw_trend(result["trend"])
+
+        self.after(self.POLL_MS, self.update_table)
+
+    def update_metrics(self):
+        """
+        Odświeża podsumowanie metryk procesu na pasku stanu co `REFRESH_S`.
+        """
+        values = REGISTRY.snapshot()
+        now = time.monotonic()
+        readings = values.get("server_readings_total", 0)
+        rate = 0.0
+        if self._metrics_prev is not None:
+            prev_time, prev_readings = self._metrics_prev
+            rate = (readings - prev_readings) / max(now - prev_time, 1e-9)
+        self._metrics_prev = (now, readings)
+        self.metrics_var.set(format_metrics(values, rate))
+
+        self.after(int(self.REFRESH_S * 1000), self.update_metrics)
+
+    def request_trend(self):
+        selection = self.tree.selection()
+        if selection:
+            self.snapshot_worker.show_trend(selection[0], max(self.trend_canvas.winfo_width(), 10))
+
+    def draw_trend(self, trend):
+        """
+        Rysuje wykres jako jedną linię przez (min, max) kolejnych pikseli;
+        istniejąca linia dostaje tylko nowe współrzędne.
+        """
+        canvas = self.trend_canvas
+        if trend["range"] is None or not trend["points"]:
+            if self.trend_line is not None:
+                canvas.coords(self.trend_line, 0, 0, 0, 0)
+            canvas.itemconfig(self.trend_label, text=f"{trend['sensor_id']}: brak odczytów")
             return
+        low, high = trend["range"]
+        span = (high - low) or 1.0
+        top, bottom = 18, self.TREND_HEIGHT - 4
+
+        def y(value):
+            return bottom - (value - low) / span * (bottom - top)
+
+        coords = []
+        for x, point_low, point_high in trend["points"]:
+            coords += (x, y(point_low), x, y(point_high))
+        if self.trend_line is None:
+            self.trend_line = canvas.create_line(*coords, fill="steelblue")
+        else:
+            canvas.coords(self.trend_line, *coords)
+        canvas.itemconfig(
+            self.trend_label,
+            text=f"{trend['sensor_id']} ({self.snapshot_worker.trend_hours} h): min {low:.2f}, max {high:.2f}"
+        )
+
+    def page_count(self):
+        return max(1, -(-len(self.sensor_ids) // self.PAGE_SIZE))
+
+    def show_page(self, page):
+        """
+        Wyświetla stronę `page`: w Treeview są tylko jej wiersze, a dla czujników
+        już widocznych zmieniane są jedynie komórki o nowych wartościach.
+        """
+        self.page = min(max(page, 0), self.page_count() - 1)
+        first = self.page * self.PAGE_SIZE
+        page_ids = self.sensor_ids[first:first + self.PAGE_SIZE]
+
+        if page_ids != self.visible_ids:
+            wanted = set(page_ids)
+            for sensor_id in self.visible_ids:
+                if sensor_id not in wanted:
+                    self.tree.delete(sensor_id)
+                    del self.shown[sensor_id]
+            for index, sensor_id in enumerate(page_ids):
+                if sensor_id in self.shown:
+                    self.tree.move(sensor_id, "", index)
+                else:
+                    self.tree.insert("", index, iid=sensor_id, values=self.rows[sensor_id])
+                    self.shown[sensor_id] = self.rows[sensor_id]
+            self.visible_ids = page_ids
+
+        columns = self.tree["columns"]
+        for sensor_id in page_ids:
+            current, new = self.shown[sensor_id], self.rows[sensor_id]
+            if current == new:
+                continue
+            for column, old_value, value in zip(columns, current, new):
+                if old_value != value:
+                    self.tree.set(sensor_id, column, value)
+            self.shown[sensor_id] = new
+
+        self.page_var.set(f"Strona {self.page + 1}/{self.page_count()}")
+        self.prev_button.config(state=tk.NORMAL if self.page > 0 else tk.DISABLED)
+        self.next_button.config(state=tk.NORMAL if self.page < self.page_count() - 1 else tk.DISABLED)
 
-        readings = self.logger.get_latest_readings()
-
-        for row in self.tree.get_children():
-            self.tree.delete(row)
 
-        for sensor_id, data in readings.items():
-            avg_1h = self.logger.get_average(sensor_id, 1)
-            avg_12h = self.logger.get_average(sensor_id, 12)
-            ts_str = data["timestamp"].strftime("%Y-%m-%d %H:%M:%S") if isinstance(data["timestamp"], datetime) else str(data["timestamp"])
-
-            self.tree.insert("", tk.END, values=(
-                sensor_id,
-                f"{data['last_value']:.2f}",
-                data["unit"],
-                ts_str,
-                f"{avg_1h:.2f}" if avg_1h is not None else "-",
-                f"{avg_12h:.2f}" if avg_12h is not None else "-"
-            ))
-
-        self.after(3000, self.update_table)
+if __name__ == "__main__":
+    network_config = load_config()
+    system_logger.configure(**network_config.get("system_log", {}))
 
+    # endpoint HTTP z metrykami serwera i Loggera
+    metrics_config = network_config.get("metrics", {})
+    metrics_server = None
+    if metrics_config.get("server_port"):
+        metrics_server = MetricsServer(metrics_config["server_port"], metrics_config.get("host", "127.0.0.1"))
+        metrics_server.start()
 
-if __name__ == "__main__":
     logger = Logger("config.json")
     logger.start()
 
     app = SensorGUI(logger)
     app.mainloop()
+    app.snapshot_worker.stop()
 
     logger.stop()
     if app.server and app.server.running:
         app.server.stop()
+    if metrics_server:
+        metrics_server.stop()
@@ -1,26 +1,51 @@
 import json
-import time
 from datetime import datetime
 from Sensors.PressureSensor import PressureSensor
 from Sensors.HumiditySensor import HumiditySensor
 from Sensors.AirQualitySensor import AirQualitySensor
 from Sensors.TemperatureSensor import TemperatureSensor
+from Sensors.SensorScheduler import SensorScheduler
 from Logger import Logger
 from network.client import NetworkClient
+from network.config import load_config
+from network.metrics import MetricsServer
+from network.sender import BackgroundSender
+from network import system_logger
 
 # Wczytanie konfiguracji portu z pliku settings.json
 with open("settings.json", "r") as f:
     settings = json.load(f)
 port = settings.get("port", 9000)
+network_config = load_config()
+sender_config = network_config.get("sender", {})
+system_logger.configure(**network_config.get("system_log", {}))
+
+# endpoint HTTP z metrykami klienta i Loggera
+metrics_config = network_config.get("metrics", {})
+metrics_server = None
+if metrics_config.get("client_port"):
+    metrics_server = MetricsServer(metrics_config["client_port"], metrics_config.get("host", "127.0.0.1"))
+    metrics_server.start()
 
 # Inicjalizacja loggera
 logger = Logger("config.json")
 logger.start()
 
 # Inicjalizacja klienta sieciowego z dynamicznym portem
-client = NetworkClient(host="127.0.0.1", port=port, logger=logger)
+client = NetworkClient(
+    host="127.0.0.1",
+    port=port,
+    logger=logger,
+    outbox_dir=network_config.get("outbox_dir"),
+    outbox_max_mb=network_config.get("outbox_max_mb", 256),
+    protocol=network_config.get("protocol", "json")
+)
 client.connect()
 
+# Wysyłka w tle - pętla czujników nie czeka na serwer
+sender = BackgroundSender(client, **sender_config)
+sender.start()
+
 # Callback do logowania i wysyłki
 def log_callback(sensor_id, timestamp, value, unit):
     if isinstance(timestamp, datetime):
@@ -36,9 +61,7 @@ def log_callback(sensor_id, timestamp, value, unit):
         "value": value,
         "unit": unit
     }
-    success = client.send(data)
-    if not success:
-        print("[ERROR] Nie udało się wysłać danych do serwera.")
+    sender.submit(data)
 
 # Inicjalizacja czujników
 sensors = [
@@ -51,16 +74,19 @@ sensors = [
 for sensor in sensors:
     sensor.register_callback(log_callback)
 
+# każdy czujnik odczytywany co `frequency` sekund, bez dryfu o czas callbacków
+scheduler = SensorScheduler(sensors, **network_config.get("scheduler", {}))
+
 try:
-    while True:
-        for sensor in sensors:
-            try:
-                sensor.read_value()
-            except Exception as e:
-                print(f"[ERROR] {e}")
-        time.sleep(1)
+    scheduler.run()
 
 except KeyboardInterrupt:
     print("Zakończono działanie programu.")
+    scheduler.stop()
+    print(f"Statystyki harmonogramu: {scheduler.get_stats()}")
+    sender.stop()
+    print(f"Statystyki wysyłki: {sender.metrics()}")
     logger.stop()
     client.close()
+    if metrics_server:
+        metrics_server.stop()
@@ -1,15 +1,60 @@
+from collections import deque
 from datetime import datetime
+import json
+import select
 import socket
-from network.system_logger import system_logger as sys_logger
+import time
+from typing import Iterable, List, Tuple
+from network.framing import LineFramer, DEFAULT_MAX_FRAME
+from network.metrics import REGISTRY
+from network.outbox import Outbox
+from network.protocol import BinaryEncoder, BinaryDecoder, BINARY_HELLO
+from network.system_logger import system_logger as sys_logger, reading_log_enabled
+
+# Metryki klienta
+CONNECTIONS = REGISTRY.counter("client_connections_total", "Nawiązane połączenia z serwerem")
+ERRORS = REGISTRY.counter("client_errors_total", "Błędy połączenia i wysyłki")
+SENT = REGISTRY.counter("client_readings_sent_total", "Wysłane odczyty (z ponowieniami)")
+ACKED = REGISTRY.counter("client_readings_acked_total", "Odczyty potwierdzone przez serwer")
+REJECTED = REGISTRY.counter("client_readings_rejected_total", "Odczyty odrzucone przez serwer (NAK)")
+BYTES_SENT = REGISTRY.counter("client_bytes_sent_total", "Bajty wysłane do serwera")
+ACK_RTT = REGISTRY.histogram(
+    "client_ack_rtt_seconds", "Czas od wysłania odczytu lub paczki do potwierdzenia całości przez serwer"
+)
 
 class NetworkClient:
-    def __init__(self, host, port, timeout=5.0, retries=3, logger=None):
+    def __init__(
+        self,
+        host,
+        port,
+        timeout=5.0,
+        retries=3,
+        logger=None,
+        recv_size=4096,
+        max_frame_size=DEFAULT_MAX_FRAME,
+        batch_size=100,
+        window=1000,
+        outbox_dir=None,
+        outbox_max_mb=256,
+        protocol="json"
+    ):
         self.host = host
         self.port = port
         self.timeout = timeout
         self.retries = retries
         self.sock = None
         self.logger = logger
+        self.framer = LineFramer(recv_size, max_frame_size)
+        # wysyłka wsadowa: liczba odczytów na zapis i limit niepotwierdzonych odczytów
+        self.batch_size = batch_size
+        self.window = window
+        # trwały bufor odczytów, których nie udało się wysłać
+        self.outbox = Outbox(outbox_dir, max_bytes=int(outbox_max_mb * 1024 * 1024)) if outbox_dir else None
+        # protokół żądany ("json" lub "binary") i wynegocjowany dla bieżącego połączenia
+        self.protocol = protocol
+        self.wire = "json"
+        self.encoder = None
+        self.decoder = None
 
     def _log_info(self, msg: str):
         sys_logger.info(msg)
@@ -17,33 +62,216 @@ class NetworkClient:
     def _log_error(self, msg: str):
         sys_logger.error(msg)
 
+    def _log_debug(self, msg: str):
+        sys_logger.debug(msg)
+
     def connect(self):
         try:
             self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self.framer.reset()
             self._log_info(f"Połączono z {self.host}:{self.port}")
+            self._negotiate()
+            CONNECTIONS.inc()
         except Exception as e:
+            ERRORS.inc()
             self._log_error(f"Błąd połączenia: {e}")
-            self.sock = None
+            self.close()
+
+    def _negotiate(self):
+        """
+        Proponuje serwerowi protokół binarny. Serwer bez jego obsługi nie
+        odsyła powitania, więc po odmowie lub upływie `timeout` zostajemy przy JSON.
+        """
+        self.wire = "json"
+        self.encoder = self.decoder = None
+        if self.protocol != "binary":
+            return
+        self.sock.sendall(BINARY_HELLO + b"\n")
+        try:
+            reply = self._read_line().strip()
+        except socket.timeout:
+            reply = b""
+        if reply == BINARY_HELLO:
+            self.wire = "binary"
+            self.encoder = BinaryEncoder()
+            self.decoder = BinaryDecoder()
+        else:
+            self._log_info("Serwer nie obsługuje protokołu binarnego, używam JSON")
 
     def send(self, data: dict) -> bool:
+        if self.outbox is not None and not self.replay_outbox():
+            self.spool([data])
+            return False
         for attempt in range(self.retries):
             if not self.sock:
                 self.connect()
             if not self.sock:
                 continue
             try:
-                serialized = self._serialize(data) + b"\n"
-                self.sock.sendall(serialized)
-                self._log_info(f"Wysłano dane: {data}")
-                ack = self.sock.recv(1024).decode().strip()
-                self._log_info(f"Odebrano potwierdzenie: {ack}")
-                if ack == "ACK":
+                payload = self._serialize(data)
+                started = time.perf_counter()
+                self.sock.sendall(payload)
+                ack = self._read_line().decode().strip()
+                ACK_RTT.observe(time.perf_counter() - started)
+                SENT.inc()
+                BYTES_SENT.inc(len(payload))
+                if reading_log_enabled():
+                    self._log_debug(f"Wysłano dane: {data}, potwierdzenie: {ack}")
+                ack_count, nak_count = self._parse_ack(ack)
+                ACKED.inc(ack_count)
+                REJECTED.inc(nak_count)
+                if ack_count:
                     return True
+                if nak_count:
+                    # odczyt odrzucony przez serwer - ponowienie (także z outboxa) da ten sam wynik
+                    self._log_error(f"Serwer odrzucił odczyt: {data}")
+                    return False
             except Exception as e:
+                ERRORS.inc()
                 self._log_error(f"Błąd wysyłania (próba {attempt+1}): {e}")
                 self.close()
+        if self.outbox is not None:
+            self.spool([data])
         return False
 
+    def send_many(self, items: Iterable[dict]) -> int:
+        """
+        Wysyła wiele odczytów jednym połączeniem, po `batch_size` odczytów na zapis,
+        nie czekając na potwierdzenie każdego z nich. Liczba niepotwierdzonych
+        odczytów jest ograniczona przez `window`. Po błędzie połączenie jest
+        nawiązywane ponownie, a niepotwierdzone odczyty wysyłane jeszcze raz.
+        Jeśli skonfigurowano outbox, niewysłane odczyty trafiają na dysk.
+        Zwraca liczbę odczytów potwierdzonych przez serwer.
+        """
+        return self.deliver(items)[0]
+
+    def deliver(self, items: Iterable[dict]) -> Tuple[int, int]:
+        """
+        Jak `send_many`, ale zwraca (liczba potwierdzonych, liczba obsłużonych
+        przez serwer). Obsłużone to potwierdzone i odrzucone (NAK), zawsze
+        początkowy fragment `items`; pozostałe nie dotarły do serwera
+        (i są w outboxie, jeśli go skonfigurowano).
+        """
+        records = list(items)
+        if self.outbox is not None and not self.replay_outbox():
+            self.spool(records)
+            return 0, 0
+        acked, done = self._send_records(records)
+        if self.outbox is not None and done < len(records):
+            self.spool(records[done:])
+        return acked, done
+
+    def spool(self, items: Iterable[dict]) -> None:
+        """
+        Zapisuje odczyty bezpośrednio do outboxa (wyślemy je przy kolejnej wysyłce).
+        Outbox zawsze przechowuje odczyty jako linie JSON, niezależnie od protokołu.
+        """
+        self.outbox.append_lines([json.dumps(data).encode("utf-8") + b"\n" for data in items])
+
+    def replay_outbox(self) -> bool:
+        """
+        Wysyła paczkami zaległe odczyty z outboxa.
+        Zwraca True, jeśli outbox został opróżniony.
+        """
+        while not self.outbox.empty():
+            lines, position = self.outbox.read_batch(self.window)
+            if not lines:
+                break
+            _, done = self._send_records([json.loads(line) for line in lines])
+            if done < len(lines):
+                return False
+            self.outbox.commit(position)
+            self._log_info(f"Odtworzono {len(lines)} odczytów z outboxa")
+        return True
+
+    def _send_records(self, records: List[dict]) -> Tuple[int, int]:
+        """
+        Wysyła odczyty z oknem potwierdzeń. Serializacja odbywa się dopiero
+        po nawiązaniu połączenia, bo zależy od wynegocjowanego protokołu.
+        Zwraca (liczba potwierdzonych, liczba obsłużonych przez serwer).
+        """
+        total = len(records)
+        acked = 0
+        done = 0
+        batch_size = max(1, min(self.batch_size, self.window))
+        # (koniec paczki, czas wysłania) paczek oczekujących na potwierdzenie - do ACK_RTT
+        in_flight = deque()
+
+        for attempt in range(self.retries):
+            if not self.sock:
+                self.connect()
+            if not self.sock:
+                continue
+            sent = done
+            in_flight.clear()
+            try:
+                while done < total:
+                    if sent < total and sent - done < self.window:
+                        batch = records[sent:sent + batch_size]
+                        payload = b"".join([self._serialize(data) for data in batch])
+                        self.sock.sendall(payload)
+                        sent += len(batch)
+                        in_flight.append((sent, time.perf_counter()))
+                        SENT.inc(len(batch))
+                        BYTES_SENT.inc(len(payload))
+                    # czekamy na potwierdzenia tylko gdy okno jest pełne lub wszystko wysłano
+                    block = sent - done >= self.window or sent == total
+                    for ack_count, nak_count in self._poll_acks(block):
+                        acked += ack_count
+                        done += ack_count + nak_count
+                    while in_flight and in_flight[0][0] <= done:
+                        ACK_RTT.observe(time.perf_counter() - in_flight.popleft()[1])
+                self._log_debug(f"Wysłano paczkę {total} odczytów, potwierdzono {acked}")
+                break
+            except Exception as e:
+                ERRORS.inc()
+                self._log_error(f"Błąd wysyłania paczki (próba {attempt+1}): {e}")
+                self.close()
+        ACKED.inc(acked)
+        REJECTED.inc(done - acked)
+        return acked, done
+
+    def _poll_acks(self, block: bool):
+        """
+        Zwraca potwierdzenia dostępne w buforze lub gnieździe.
+        Przy `block=True` czeka na co najmniej jedno potwierdzenie.
+        """
+        acks = [self._parse_ack(line.decode().strip()) for line in self.framer.lines()]
+        if acks:
+            return acks
+        if block:
+            return [self._parse_ack(self._read_line().decode().strip())]
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        if readable:
+            if not self.framer.recv_into(self.sock):
+                raise ConnectionError("Serwer zamknął połączenie")
+            return [self._parse_ack(line.decode().strip()) for line in self.framer.lines()]
+        return []
+
+    @staticmethod
+    def _parse_ack(ack: str) -> Tuple[int, int]:
+        """
+        Zwraca (liczba potwierdzonych, liczba odrzuconych) dla "ACK", "ACK <n>" lub "NAK <n>".
+        """
+        kind, _, count = ack.partition(" ")
+        count = int(count) if count else 1
+        if kind == "ACK":
+            return count, 0
+        if kind == "NAK":
+            return 0, count
+        return 0, 0
+
+    def _read_line(self) -> bytes:
+        """
+        Odczytuje z gniazda jedną pełną linię odpowiedzi serwera.
+        """
+        line = self.framer.next_line()
+        while line is None:
+            if not self.framer.recv_into(self.sock):
+                raise ConnectionError("Serwer zamknął połączenie")
+            line = self.framer.next_line()
+        return line
+
     def close(self):
         if self.sock:
             self.sock.close()
@@ -51,9 +279,23 @@ class NetworkClient:
             self._log_info("Połączenie zamknięte")
 
     def _serialize(self, data: dict) -> bytes:
-        import json
-        return json.dumps(data).encode('utf-8')
+        """
+        Zwraca odczyt w postaci gotowej do wysłania: linia JSON
+        lub ramki binarne (zależnie od wynegocjowanego protokołu).
+        """
+        if self.wire == "binary":
+            return self.encoder.encode(data)
+        return json.dumps(data).encode('utf-8') + b"\n"
 
     def _deserialize(self, raw: bytes) -> dict:
-        import json
+        """
+        Odwrotność `_serialize` dla pojedynczej linii JSON lub ramki binarnej
+        (bez prefiksu długości). Ramki słownikowe zwracają pusty słownik.
+        """
+        if self.wire == "binary":
+            reading = self.decoder.decode(raw)
+            if reading is None:
+                return {}
+            sensor_id, timestamp, value, unit = reading
+            return {"sensor_id": sensor_id, "timestamp": timestamp.isoformat(), "value": value, "unit": unit}
         return json.loads(raw.decode('utf-8'))
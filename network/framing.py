@@ -0,0 +1,137 @@
+import socket
+import struct
+from typing import List, Optional
+
+FRAME_LENGTH = struct.Struct("<I")
+
+DEFAULT_RECV_SIZE = 65536
+DEFAULT_MAX_FRAME = 1024 * 1024
+
+
+class FrameTooLongError(ValueError):
+    """
+    Ramka (linia) przekroczyła dopuszczalną długość.
+    """
+
+
+class LineFramer:
+    """
+    Dzieli strumień bajtów na linie zakończone znakiem nowej linii
+    lub (po negocjacji protokołu binarnego) na ramki z prefiksem długości.
+
+    Dane trafiają do wstępnie zaalokowanego bufora (`recv_into` lub `feed`),
+    a odczyt linii przesuwa jedynie wskaźnik `_start` — bez kopiowania reszty
+    bufora przy każdej linii. Zajęta część jest przesuwana na początek bufora
+    dopiero, gdy zabraknie miejsca na kolejny odczyt.
+
+    :param recv_size: Maksymalna liczba bajtów pobierana jednym wywołaniem recv
+    :param max_frame: Maksymalna długość pojedynczej linii w bajtach
+    """
+
+    def __init__(self, recv_size: int = DEFAULT_RECV_SIZE, max_frame: int = DEFAULT_MAX_FRAME):
+        self.recv_size = recv_size
+        self.max_frame = max_frame
+        self._buf = bytearray(recv_size * 2)
+        self._start = 0
+        self._end = 0
+        # pozycja, od której kontynuujemy szukanie separatora
+        self._scan = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def reset(self) -> None:
+        self._start = self._end = self._scan = 0
+
+    def _reserve(self, size: int) -> None:
+        if len(self._buf) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if self._start:
+            self._buf[:pending] = self._buf[self._start:self._end]
+            self._scan -= self._start
+            self._start = 0
+            self._end = pending
+        if len(self._buf) - self._end < size:
+            self._buf.extend(bytes(size - (len(self._buf) - self._end)))
+
+    def recv_into(self, sock: socket.socket) -> int:
+        """
+        Odbiera dane z gniazda bezpośrednio do bufora.
+        Zwraca liczbę odebranych bajtów (0 oznacza zamknięte połączenie).
+        """
+        self._reserve(self.recv_size)
+        with memoryview(self._buf) as view:
+            with view[self._end:] as target:
+                n = sock.recv_into(target, self.recv_size)
+        self._end += n
+        return n
+
+    def feed(self, data: bytes) -> None:
+        """
+        Dopisuje do bufora dane odebrane w inny sposób (np. z asyncio).
+        """
+        size = len(data)
+        self._reserve(size)
+        self._buf[self._end:self._end + size] = data
+        self._end += size
+
+    def next_line(self) -> Optional[bytes]:
+        """
+        Zwraca kolejną kompletną linię (bez separatora) lub None.
+        """
+        idx = self._buf.find(b"\n", self._scan, self._end)
+        if idx < 0:
+            self._scan = self._end
+            if self._end - self._start > self.max_frame:
+                raise FrameTooLongError(f"Linia dłuższa niż {self.max_frame} bajtów")
+            return None
+        if idx - self._start > self.max_frame:
+            raise FrameTooLongError(f"Linia dłuższa niż {self.max_frame} bajtów")
+        line = bytes(self._buf[self._start:idx])
+        self._start = self._scan = idx + 1
+        if self._start == self._end:
+            self.reset()
+        return line
+
+    def lines(self) -> List[bytes]:
+        """
+        Zwraca wszystkie kompletne linie obecne w buforze.
+        Linie wydzielane są hurtowo jednym wywołaniem `split`.
+        """
+        last = self._buf.rfind(b"\n", self._scan, self._end)
+        if last < 0:
+            self._scan = self._end
+            if self._end - self._start > self.max_frame:
+                raise FrameTooLongError(f"Linia dłuższa niż {self.max_frame} bajtów")
+            return []
+        block = bytes(self._buf[self._start:last])
+        lines = block.split(b"\n")
+        if len(block) > self.max_frame and max(map(len, lines)) > self.max_frame:
+            raise FrameTooLongError(f"Linia dłuższa niż {self.max_frame} bajtów")
+        self._start = self._scan = last + 1
+        if self._start == self._end:
+            self.reset()
+        return lines
+
+    def frames(self) -> List[bytes]:
+        """
+        Zwraca wszystkie kompletne ramki `<uint32 długość><dane>` z bufora.
+        """
+        frames = []
+        buf = self._buf
+        start = self._start
+        end = self._end
+        header = FRAME_LENGTH.size
+        while end - start >= header:
+            (length,) = FRAME_LENGTH.unpack_from(buf, start)
+            if length > self.max_frame:
+                raise FrameTooLongError(f"Ramka dłuższa niż {self.max_frame} bajtów")
+            if end - start - header < length:
+                break
+            frames.append(bytes(buf[start + header:start + header + length]))
+            start += header + length
+        self._start = self._scan = start
+        if self._start == self._end:
+            self.reset()
+        return frames
@@ -0,0 +1,255 @@
+"""
+Metryki procesu: liczniki, wskaźniki i histogramy udostępniane przez HTTP
+w formacie tekstowym Prometheusa (`GET /metrics`).
+
+Metryki rejestrowane są raz, przy imporcie modułu, we wspólnym rejestrze
+`REGISTRY`, a na ścieżce krytycznej wywoływane jest tylko `inc`/`observe`
+(krótka blokada, bez alokacji). Miejsca instrumentacji aktualizują metryki
+raz na paczkę danych, a nie na każdy odczyt.
+
+Przykład:
+    READINGS = REGISTRY.counter("server_readings_total", "Przyjęte odczyty")
+    READINGS.inc(accepted)
+
+    MetricsServer(9100).start()   # curl http://127.0.0.1:9100/metrics
+"""
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+from network.system_logger import system_logger as sys_logger
+
+# granice przedziałów histogramów czasu (s): od 50 µs do 10 s
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """
+    Licznik rosnący (np. liczba odczytów, bajtów, błędów).
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_format(self.value)}"]
+
+
+class Gauge(Counter):
+    """
+    Wartość bieżąca, która może rosnąć i maleć (np. aktywne połączenia).
+    """
+
+    kind = "gauge"
+
+    def dec(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    """
+    Rozkład wartości (zwykle czasów w sekundach) w stałych przedziałach.
+
+    :param name: Nazwa metryki
+    :param help: Opis metryki
+    :param buckets: Rosnące górne granice przedziałów (+Inf dodawany automatycznie)
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.bounds = tuple(buckets)
+        # counts[i] - wartości z przedziału (bounds[i-1], bounds[i]], ostatni - powyżej bounds[-1]
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Przybliżony kwantyl: górna granica przedziału, w którym wypada
+        (dla przedziału +Inf - największa granica). None - brak obserwacji.
+        """
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.bounds, counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.bounds[-1]
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            counts, total, value_sum = list(self.counts), self.count, self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format(value_sum)}")
+        lines.append(f"{self.name}_count {total}")
+        return lines
+
+
+class Registry:
+    """
+    Zbiór metryk procesu. Ponowna rejestracja tej samej nazwy zwraca
+    istniejącą metrykę (np. przy wielokrotnym imporcie modułu).
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name: str, help: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help, **kwargs)
+            elif type(metric) is not metric_class:
+                raise ValueError(f"Metryka {name} jest już zarejestrowana jako {metric.kind}.")
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._register(Counter, name, help)
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self._register(Gauge, name, help)
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, buckets=buckets)
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Wszystkie metryki w formacie tekstowym Prometheusa (wersja 0.0.4).
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Bieżące wartości liczników i wskaźników; histogramy jako
+        `<nazwa>_count`, `<nazwa>_p50` i `<nazwa>_p99` (s).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        values = {}
+        for metric in metrics:
+            if isinstance(metric, Histogram):
+                values[f"{metric.name}_count"] = metric.count
+                values[f"{metric.name}_p50"] = metric.quantile(0.50)
+                values[f"{metric.name}_p99"] = metric.quantile(0.99)
+            else:
+                values[metric.name] = metric.value
+        return values
+
+
+REGISTRY = Registry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        sys_logger.debug(f"Metryki: {self.address_string()} {format % args}")
+
+
+class MetricsServer:
+    """
+    Endpoint HTTP z metrykami rejestru, obsługiwany w wątku w tle.
+
+    :param port: Port HTTP (0 - dowolny wolny, zob. `port` po `start()`)
+    :param host: Adres nasłuchu (domyślnie tylko lokalnie)
+    :param registry: Rejestr metryk
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1", registry: Registry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._httpd = None
+        self._thread = None
+
+    def start(self) -> bool:
+        """
+        Uruchamia endpoint. Zwraca False (i loguje błąd), jeśli port jest zajęty.
+        """
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        try:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError as e:
+            sys_logger.error(f"Nie udało się uruchomić endpointu metryk na {self.host}:{self.port}: {e}")
+            return False
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        sys_logger.info(f"Metryki dostępne pod http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = self._thread = None
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from network.system_logger import system_logger as sys_logger
+
+CHECKPOINT_FILE = "checkpoint.json"
+SEGMENT_SUFFIX = ".seg"
+
+
+class Outbox:
+    """
+    Trwała kolejka niewysłanych odczytów na dysku.
+
+    Linie (już zserializowane odczyty) dopisywane są do plików segmentów
+    `<numer>.seg`. Pozycja odczytu (segment, przesunięcie w bajtach) zapisywana
+    jest w `checkpoint.json` dopiero po potwierdzeniu wysłania paczki, więc po
+    awarii procesu odtwarzanie zaczyna się od ostatniej potwierdzonej pozycji.
+    Po przekroczeniu budżetu dyskowego usuwane są najstarsze segmenty.
+
+    :param directory: Katalog segmentów
+    :param segment_size: Rozmiar segmentu (bajty), po którym zaczynamy nowy
+    :param max_bytes: Maksymalny łączny rozmiar segmentów (bajty)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_size: int = 4 * 1024 * 1024,
+        max_bytes: int = 256 * 1024 * 1024
+    ):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._segments = sorted(
+            int(name[:-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        self._position = self._load_checkpoint()
+        # outbox zasilają jednocześnie pętla czujników i wątek wysyłki
+        self._lock = threading.RLock()
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self.directory, f"{seq:08d}{SEGMENT_SUFFIX}")
+
+    def _load_checkpoint(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.directory, CHECKPOINT_FILE), "r") as f:
+                checkpoint = json.load(f)
+            return checkpoint["segment"], checkpoint["offset"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return (self._segments[0] if self._segments else 0), 0
+
+    def _save_checkpoint(self) -> None:
+        path = os.path.join(self.directory, CHECKPOINT_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"segment": self._position[0], "offset": self._position[1]}, f)
+        os.replace(tmp_path, path)
+
+    def empty(self) -> bool:
+        with self._lock:
+            segment, offset = self._position
+            for seq in self._segments:
+                if seq < segment:
+                    continue
+                start = offset if seq == segment else 0
+                if os.path.getsize(self._segment_path(seq)) > start:
+                    return False
+            return True
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(os.path.getsize(self._segment_path(seq)) for seq in self._segments)
+
+    def append_lines(self, lines: List[bytes]) -> None:
+        """
+        Dopisuje zserializowane odczyty (zakończone znakiem nowej linii).
+        """
+        if not lines:
+            return
+        with self._lock:
+            if not self._segments:
+                self._segments.append(max(self._position[0], 1))
+                self._position = (self._segments[0], 0)
+            path = self._segment_path(self._segments[-1])
+            with open(path, "ab") as f:
+                f.write(b"".join(lines))
+                size = f.tell()
+            if size >= self.segment_size:
+                self._segments.append(self._segments[-1] + 1)
+                open(self._segment_path(self._segments[-1]), "ab").close()
+            self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        total = self.size_bytes()
+        while total > self.max_bytes and len(self._segments) > 1:
+            seq = self._segments.pop(0)
+            path = self._segment_path(seq)
+            total -= os.path.getsize(path)
+            os.remove(path)
+            sys_logger.error(f"Przekroczono budżet outboxa, usunięto segment {seq}")
+            if self._position[0] <= seq:
+                self._position = (self._segments[0], 0)
+                self._save_checkpoint()
+
+    def read_batch(self, max_items: int) -> Tuple[List[bytes], Optional[Tuple[int, int]]]:
+        """
+        Zwraca do `max_items` linii od bieżącej pozycji oraz pozycję za nimi,
+        którą należy przekazać do `commit` po udanym wysłaniu.
+        """
+        lines = []
+        with self._lock:
+            segment, offset = self._position
+            for seq in self._segments:
+                if seq < segment:
+                    continue
+                if seq > segment:
+                    segment, offset = seq, 0
+                with open(self._segment_path(seq), "rb") as f:
+                    f.seek(offset)
+                    while len(lines) < max_items:
+                        line = f.readline()
+                        # koniec pliku lub niedokończony zapis
+                        if not line.endswith(b"\n"):
+                            break
+                        lines.append(line)
+                        offset += len(line)
+                if len(lines) >= max_items:
+                    break
+        if not lines:
+            return [], None
+        return lines, (segment, offset)
+
+    def commit(self, position: Tuple[int, int]) -> None:
+        """
+        Zapisuje pozycję odczytu i usuwa w pełni wysłane segmenty.
+        """
+        with self._lock:
+            self._position = position
+            while self._segments and self._segments[0] < position[0]:
+                os.remove(self._segment_path(self._segments.pop(0)))
+            if self._segments and self.empty():
+                # wszystko wysłane - kolejne odczyty trafią do nowego segmentu
+                last = self._segments[-1]
+                for seq in self._segments:
+                    os.remove(self._segment_path(seq))
+                self._segments.clear()
+                self._position = (last + 1, 0)
+            self._save_checkpoint()
@@ -0,0 +1,94 @@
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Linia negocjacji: klient wysyła ją zaraz po połączeniu, serwer odsyła
+# ją z powrotem, jeśli zna protokół binarny. Inna odpowiedź (lub brak
+# odpowiedzi starszego serwera) oznacza pozostanie przy JSON.
+BINARY_HELLO = b"PROTO BIN1"
+HELLO_PREFIX = b"PROTO "
+
+# Ramka: <uint32 długość> <typ> <dane>
+FRAME_HEADER = struct.Struct("<I")
+# Odczyt: indeks czujnika, znacznik czasu (µs od epoki), wartość, indeks jednostki
+READING = struct.Struct("<HqdH")
+INDEX = struct.Struct("<H")
+
+TYPE_SENSOR = b"S"
+TYPE_UNIT = b"U"
+TYPE_READING = b"R"
+
+
+def _frame(kind: bytes, body: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(body) + 1) + kind + body
+
+
+def to_micros(timestamp) -> int:
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    return round(timestamp.timestamp() * 1_000_000)
+
+
+def from_micros(micros: int) -> datetime:
+    # rozdzielczość float64 dla bieżących dat (~0.2 µs) pozwala odtworzyć mikrosekundy
+    return datetime.fromtimestamp(micros / 1_000_000)
+
+
+class BinaryEncoder:
+    """
+    Koduje odczyty do ramek binarnych.
+
+    Identyfikatory czujników i jednostki przesyłane są tylko raz na połączenie
+    (ramki S/U), a każdy odczyt zajmuje stałe 25 bajtów (ramka R).
+    Dla nowego połączenia należy utworzyć nowy enkoder.
+    """
+
+    def __init__(self):
+        self._sensors: Dict[str, int] = {}
+        self._units: Dict[str, int] = {}
+
+    def _index(self, table: Dict[str, int], kind: bytes, name: str, out: List[bytes]) -> int:
+        idx = table.get(name)
+        if idx is None:
+            if len(table) > 0xFFFF:
+                raise ValueError("Przekroczono liczbę pozycji słownika połączenia")
+            idx = table[name] = len(table)
+            out.append(_frame(kind, INDEX.pack(idx) + name.encode("utf-8")))
+        return idx
+
+    def encode(self, data: dict) -> bytes:
+        out = []
+        sensor = self._index(self._sensors, TYPE_SENSOR, data["sensor_id"], out)
+        unit = self._index(self._units, TYPE_UNIT, data["unit"], out)
+        out.append(_frame(TYPE_READING, READING.pack(
+            sensor, to_micros(data["timestamp"]), float(data["value"]), unit
+        )))
+        return b"".join(out)
+
+
+class BinaryDecoder:
+    """
+    Dekoduje ramki binarne jednego połączenia.
+    """
+
+    def __init__(self):
+        self._sensors: List[str] = []
+        self._units: List[str] = []
+
+    def decode(self, payload: bytes) -> Optional[Tuple[str, datetime, float, str]]:
+        """
+        Zwraca (sensor_id, timestamp, value, unit) dla ramki odczytu
+        lub None dla ramek słownikowych.
+        """
+        kind = payload[:1]
+        if kind == TYPE_READING:
+            sensor, micros, value, unit = READING.unpack_from(payload, 1)
+            return self._sensors[sensor], from_micros(micros), value, self._units[unit]
+        if kind == TYPE_SENSOR or kind == TYPE_UNIT:
+            (idx,) = INDEX.unpack_from(payload, 1)
+            table = self._sensors if kind == TYPE_SENSOR else self._units
+            if idx != len(table):
+                raise ValueError(f"Nieoczekiwany indeks słownika: {idx}")
+            table.append(payload[1 + INDEX.size:].decode("utf-8"))
+            return None
+        raise ValueError(f"Nieznany typ ramki: {kind!r}")
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+from network.outbox import Outbox
+from network.system_logger import system_logger as sys_logger
+from storage.stats import percentile_ms
+
+# Zachowanie przy przepełnionej kolejce
+OVERFLOW_POLICIES = ("drop_oldest", "block", "spill")
+
+
+class BackgroundSender:
+    """
+    Wysyła odczyty w tle, oddzielając pętlę czujników od opóźnień sieci.
+
+    Odczyty trafiają do ograniczonej kolejki w pamięci, z której wątek
+    roboczy pobiera je paczkami i wysyła przez `NetworkClient.deliver`.
+    Odczyty odrzucone przez serwer (NAK) są liczone jako `rejected` i nie są ponawiane.
+    Po błędzie wątek ponawia połączenie z wykładniczym odstępem.
+    Jeśli klient ma outbox, niewysłane odczyty trafiają na dysk zamiast
+    z powrotem do kolejki, a klient odtwarza je po powrocie serwera.
+
+    :param client: Skonfigurowany NetworkClient
+    :param max_queue: Maksymalna liczba odczytów oczekujących w pamięci
+    :param overflow: "drop_oldest", "block" lub "spill" (zapis nadmiaru do outboxa)
+    :param spill_dir: Katalog outboxa tworzonego dla polityki "spill", gdy klient go nie ma
+    :param backoff_initial: Początkowy odstęp między próbami połączenia (s)
+    :param backoff_max: Maksymalny odstęp między próbami połączenia (s)
+    """
+
+    def __init__(
+        self,
+        client,
+        max_queue: int = 10000,
+        overflow: str = "drop_oldest",
+        spill_dir: str = "logs/outbox",
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Nieznana polityka przepełnienia: {overflow}")
+        self.client = client
+        self.max_queue = max_queue
+        self.overflow = overflow
+        if overflow == "spill" and client.outbox is None:
+            client.outbox = Outbox(spill_dir)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.sent = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.rejected = 0
+        self.failures = 0
+        self._latencies = deque(maxlen=1000)
+
+    def start(self) -> None:
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="BackgroundSender", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Zatrzymuje wątek, próbując wcześniej wysłać zawartość kolejki.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, data: dict) -> None:
+        """
+        Dodaje odczyt do kolejki, stosując politykę przepełnienia.
+        """
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == "block":
+                    while self._running and len(self._queue) >= self.max_queue:
+                        self._cond.wait()
+                elif self.overflow == "spill":
+                    self._spill([data])
+                    return
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+            self._queue.append(data)
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, float]:
+        with self._cond:
+            latencies = sorted(self._latencies)
+            depth = len(self._queue)
+        return {
+            "queue_depth": depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "outbox_bytes": self.client.outbox.size_bytes() if self.client.outbox else 0,
+            "send_latency_avg_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "send_latency_p95_ms": percentile_ms(latencies, 0.95),
+        }
+
+    def _take_batch(self) -> List[dict]:
+        with self._cond:
+            if self._running and not self._queue:
+                self._cond.wait(timeout=1.0)
+            count = min(len(self._queue), self.client.window)
+            batch = [self._queue.popleft() for _ in range(count)]
+            self._cond.notify_all()
+            return batch
+
+    def _requeue(self, items: List[dict]) -> None:
+        """
+        Zwraca niewysłane odczyty na początek kolejki (z zachowaniem limitu).
+        """
+        with self._cond:
+            free = self.max_queue - len(self._queue)
+            if len(items) > free:
+                overflow, items = items[:len(items) - free], items[len(items) - free:]
+                if self.overflow == "spill":
+                    self._spill(overflow)
+                else:
+                    self.dropped += len(overflow)
+            self._queue.extendleft(reversed(items))
+
+    def _spill(self, items: List[dict]) -> None:
+        self.client.spool(items)
+        self.spilled += len(items)
+
+    def _run(self) -> None:
+        backoff = self.backoff_initial
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                if not self._running:
+                    return
+                # brak nowych odczytów - to dobry moment na odtworzenie outboxa
+                if self.client.outbox is not None and not self.client.outbox.empty():
+                    self.client.replay_outbox()
+                continue
+
+            started = time.perf_counter()
+            acked, done = self.client.deliver(batch)
+            elapsed = time.perf_counter() - started
+            self.sent += acked
+            # odrzucone przez serwer (NAK) nie są ponawiane - ponowienie dałoby ten sam wynik
+            self.rejected += done - acked
+
+            if done >= len(batch):
+                self._latencies.append(elapsed)
+                backoff = self.backoff_initial
+                continue
+
+            # Serwer niedostępny - odkładamy nieobsłużone odczyty i czekamy
+            self.failures += 1
+            if self.client.outbox is not None:
+                # klient zapisał już nieobsłużoną resztę paczki w outboxie
+                self.spilled += len(batch) - done
+            else:
+                self._requeue(batch[done:])
+            if not self._running:
+                with self._cond:
+                    pending = list(self._queue)
+                    self._queue.clear()
+                if self.client.outbox is not None:
+                    self._spill(pending)
+                else:
+                    sys_logger.error(f"Nie wysłano {len(pending)} odczytów przed zatrzymaniem")
+                return
+            sys_logger.error(f"Serwer niedostępny, ponowienie za {backoff:.1f}s")
+            with self._cond:
+                self._cond.wait(timeout=backoff)
+            backoff = min(backoff * 2, self.backoff_max)
@@ -1,13 +1,72 @@
+import atexit
+import itertools
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-os.makedirs("logs/system", exist_ok=True)
-
-logging.basicConfig(
-    filename="logs/system/system.log",
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S"
-)
+LOG_PATH = "logs/system/system.log"
 
 system_logger = logging.getLogger("system")
+system_logger.propagate = False
+
+_listener = None
+_reading_counter = itertools.count()
+# co który odczyt trafia do logu na poziomie DEBUG
+reading_log_every = 1000
+
+
+def configure(non_blocking: bool = True, level: str = "INFO", log_every: int = 1000) -> None:
+    """
+    Konfiguruje logger systemowy (zapis do `LOG_PATH`). Wywoływane przez
+    aplikację (main.py, gui.py), a nie przy imporcie, aby import modułów
+    (np. w testach) nie tworzył plików w katalogu roboczym.
+
+    :param non_blocking: Zapis do pliku w osobnym wątku (QueueHandler/QueueListener),
+        dzięki czemu wątki sieciowe nie czekają na operacje dyskowe
+    :param level: Minimalny poziom logowania
+    :param log_every: Co który odczyt logować na poziomie DEBUG
+    """
+    global _listener, reading_log_every
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in list(system_logger.handlers):
+        system_logger.removeHandler(handler)
+        handler.close()
+
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    file_handler = logging.FileHandler(LOG_PATH)
+    file_handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S"
+    ))
+
+    if non_blocking:
+        log_queue = queue.SimpleQueue()
+        system_logger.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, file_handler)
+        _listener.start()
+    else:
+        system_logger.addHandler(file_handler)
+
+    system_logger.setLevel(level)
+    reading_log_every = max(1, log_every)
+
+
+def reading_log_enabled() -> bool:
+    """
+    Czy zalogować bieżący odczyt: tylko na poziomie DEBUG i tylko co
+    `reading_log_every`-ty odczyt. Sprawdzenie poziomu jest tanie, więc
+    wywołanie na ścieżce krytycznej nie formatuje komunikatów.
+    """
+    return system_logger.isEnabledFor(logging.DEBUG) and next(_reading_counter) % reading_log_every == 0
+
+
+def _shutdown() -> None:
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_shutdown)
@@ -0,0 +1,204 @@
+import multiprocessing
+import queue
+import socket
+import threading
+import time
+from datetime import datetime
+
+from network.system_logger import system_logger as logger
+
+# maksymalny czas uruchamiania procesów roboczych (spawn + import + bind)
+STARTUP_TIMEOUT = 30.0
+# czas na zakończenie procesów roboczych przy zatrzymaniu, zanim zostaną zabite
+STOP_TIMEOUT = 5.0
+
+
+class BatchForwarder:
+    """
+    Zastępuje Logger w procesie roboczym: zbiera odczyty w paczki
+    i przekazuje je kanałem (multiprocessing.Queue) do procesu nadrzędnego.
+    Paczka wysyłana jest po `batch_size` odczytach lub co `flush_interval` s.
+    """
+
+    def __init__(self, channel, batch_size: int = 500, flush_interval: float = 0.1):
+        self.channel = channel
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._batch = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._timer.start()
+
+    def log_reading(self, sensor_id: str, timestamp: datetime, value: float, unit: str) -> None:
+        with self._lock:
+            self._batch.append((sensor_id, timestamp.timestamp(), value, unit))
+            if len(self._batch) < self.batch_size:
+                return
+            batch, self._batch = self._batch, []
+        self.channel.put(batch)
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._batch = self._batch, []
+        if batch:
+            self.channel.put(batch)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._timer.join()
+        self.flush()
+
+    def _flush_periodically(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+
+def _worker_main(server_kwargs: dict, port: int, channel, stop_event, ready) -> None:
+    """
+    Punkt wejścia procesu roboczego: własny NetworkServer nasłuchujący
+    na wspólnym porcie (SO_REUSEPORT), przekazujący odczyty do rodzica.
+    `ready` jest ustawiane, gdy serwer nasłuchuje.
+    """
+    from server.server import NetworkServer
+
+    forwarder = BatchForwarder(channel)
+    server = NetworkServer(logger=forwarder, reuse_port=True, **server_kwargs)
+    server.configure(port)
+
+    done = threading.Event()
+
+    def _watch_stop():
+        # czekanie z limitem czasu: proces nie może zakończyć się w trakcie
+        # `stop_event.wait()`, bo zablokowałoby to `stop_event.set()` w rodzicu
+        while not done.is_set():
+            if server.running and not ready.is_set():
+                ready.set()
+            if stop_event.wait(0.05):
+                server.stop()
+                return
+
+    watcher = threading.Thread(target=_watch_stop, daemon=True)
+    watcher.start()
+    try:
+        server.start()
+    finally:
+        done.set()
+        watcher.join()
+        forwarder.close()
+
+
+class MultiProcessIngest:
+    """
+    Uruchamia `workers` procesów roboczych nasłuchujących na tym samym porcie.
+    Każdy proces parsuje dane niezależnie (bez wspólnego GIL), a proces
+    nadrzędny jako jedyny zapisuje odczyty do Loggera.
+
+    :param server: NetworkServer procesu nadrzędnego (port, logger, parametry)
+    :param workers: Liczba procesów roboczych
+    """
+
+    def __init__(self, server, workers: int):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("Tryb wieloprocesowy wymaga SO_REUSEPORT (Linux/BSD/macOS).")
+        self.server = server
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._channel = self._context.Queue(maxsize=workers * 64)
+        self._stop_event = self._context.Event()
+        self._processes = []
+
+    def run(self) -> None:
+        server = self.server
+        server_kwargs = {
+            "mode": server.worker_mode,
+            "max_connections": max(1, -(-server.max_connections // self.workers)),
+            "idle_timeout": server.idle_timeout,
+            "recv_size": server.recv_size,
+            "max_frame_size": server.max_frame_size,
+            "ack_mode": server.ack_mode,
+        }
+        ready = []
+        try:
+            for _ in range(self.workers):
+                event = self._context.Event()
+                process = self._context.Process(
+                    target=_worker_main,
+                    args=(server_kwargs, server.port, self._channel, self._stop_event, event),
+                    daemon=True
+                )
+                process.start()
+                self._processes.append(process)
+                ready.append(event)
+
+            # `running` dopiero, gdy wszystkie procesy nasłuchują na porcie
+            if not self._wait_ready(ready):
+                return
+            server.running = True
+            logger.info(f"Serwer nasłuchuje na porcie {server.port} ({self.workers} procesów)")
+            while server.running:
+                self._drain(timeout=0.5)
+        finally:
+            server.running = False
+            self._shutdown()
+            logger.info("Serwer został zatrzymany.")
+
+    def _wait_ready(self, ready) -> bool:
+        """
+        Czeka, aż każdy proces roboczy zacznie nasłuchiwać. Zwraca False, jeśli
+        w międzyczasie wywołano `stop()`; zgłasza RuntimeError, gdy proces
+        zakończył się przed rozpoczęciem nasłuchu lub nie zdążył w `STARTUP_TIMEOUT`.
+        """
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        for process, event in zip(self._processes, ready):
+            while not event.wait(0.05):
+                if self._stop_event.is_set():
+                    return False
+                if not process.is_alive():
+                    raise RuntimeError(
+                        f"Proces roboczy {process.pid} zakończył się przed rozpoczęciem nasłuchu "
+                        f"na porcie {self.server.port} (kod {process.exitcode})"
+                    )
+                if time.monotonic() >= deadline:
+                    raise RuntimeError(f"Procesy robocze nie zaczęły nasłuchiwać w ciągu {STARTUP_TIMEOUT:.0f} s")
+        return not self._stop_event.is_set()
+
+    def _shutdown(self) -> None:
+        """
+        Zatrzymuje procesy robocze, odbierając w tym czasie ich ostatnie paczki:
+        proces kończy się dopiero po przekazaniu danych do kanału, a odczyty te
+        zostały już potwierdzone klientom. Procesy, które po `STOP_TIMEOUT`
+        wciąż działają przy pustym kanale, są zabijane.
+        """
+        self._stop_event.set()
+        deadline = time.monotonic() + STOP_TIMEOUT
+        while any(process.is_alive() for process in self._processes):
+            if not self._drain(timeout=0.05) and time.monotonic() >= deadline:
+                break
+        for process in self._processes:
+            if process.is_alive():
+                logger.warning(f"Proces roboczy {process.pid} nie zakończył się, zostaje zabity")
+                process.terminate()
+            process.join()
+        # odczyty wysłane przez procesy tuż przed zakończeniem
+        while self._drain(timeout=0.1):
+            pass
+        self._processes.clear()
+
+    def _drain(self, timeout: float) -> bool:
+        try:
+            batch = self._channel.get(timeout=timeout)
+        except queue.Empty:
+            return False
+        if self.server.logger:
+            for sensor_id, ts, value, unit in batch:
+                self.server.logger.log_reading(
+                    sensor_id=sensor_id,
+                    timestamp=datetime.fromtimestamp(ts),
+                    value=value,
+                    unit=unit
+                )
+        return True
+
+    def stop(self) -> None:
+        self._stop_event.set()
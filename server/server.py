@@ -1,14 +1,102 @@
+import asyncio
+import os
 import socket
+import struct
 import threading
+import time
 import json
-from network.system_logger import system_logger as logger
+from datetime import datetime
+from network.metrics import REGISTRY
+from network.framing import LineFramer, DEFAULT_RECV_SIZE, DEFAULT_MAX_FRAME
+from network.protocol import BinaryDecoder, BINARY_HELLO, HELLO_PREFIX
+from network.system_logger import system_logger as logger, reading_log_enabled
+from server.multiprocess import MultiProcessIngest
+
+# Dostępne tryby pracy serwera
+SERVER_MODES = ("threaded", "async", "multiprocess")
+# Tryby potwierdzeń: ACK dla każdej linii lub jedno "ACK <n>" na odebraną paczkę
+ACK_MODES = ("line", "batch")
+# domyślny tryb potwierdzeń (także w settings.json); NetworkClient obsługuje oba
+DEFAULT_ACK_MODE = "batch"
+
+# Metryki serwera (w trybie "multiprocess" liczone w procesach roboczych,
+# więc endpoint procesu nadrzędnego pokazuje tylko metryki Loggera)
+CONNECTIONS = REGISTRY.counter("server_connections_total", "Przyjęte połączenia")
+CONNECTIONS_ACTIVE = REGISTRY.gauge("server_connections_active", "Aktywne połączenia")
+CONNECTIONS_REJECTED = REGISTRY.counter("server_connections_rejected_total", "Połączenia odrzucone z powodu limitu")
+READINGS = REGISTRY.counter("server_readings_total", "Przyjęte odczyty")
+PARSE_ERRORS = REGISTRY.counter("server_parse_errors_total", "Odrzucone linie JSON i ramki binarne")
+BYTES_RECEIVED = REGISTRY.counter("server_bytes_received_total", "Bajty odebrane od klientów")
+BYTES_SENT = REGISTRY.counter("server_bytes_sent_total", "Bajty potwierdzeń wysłane do klientów")
+PARSE_SECONDS = REGISTRY.histogram(
+    "server_parse_seconds", "Czas przetworzenia odebranej porcji danych (parsowanie i przekazanie do Loggera)"
+)
+
+
+class ConnectionState:
+    """
+    Stan protokołu jednego połączenia (JSON lub wynegocjowany binarny).
+    """
+
+    __slots__ = ("negotiated", "decoder")
+
+    def __init__(self):
+        self.negotiated = False
+        self.decoder = None
+
 
 class NetworkServer:
-    def __init__(self, logger=None):
+    def __init__(
+        self,
+        logger=None,
+        mode="threaded",
+        max_connections=1000,
+        idle_timeout=60.0,
+        recv_size=DEFAULT_RECV_SIZE,
+        max_frame_size=DEFAULT_MAX_FRAME,
+        ack_mode=DEFAULT_ACK_MODE,
+        workers=None,
+        worker_mode="async",
+        reuse_port=False
+    ):
+        """
+        :param logger: Logger aplikacji, do którego trafiają odebrane odczyty; `log_reading`
+            wywoływane jest z wielu wątków (także w trybie "async")
+        :param mode: "threaded" (wątek na połączenie) lub "async" (jedna pętla asyncio)
+        :param max_connections: Maksymalna liczba jednoczesnych połączeń
+        :param idle_timeout: Czas bezczynności (s), po którym połączenie jest zamykane
+        :param recv_size: Rozmiar pojedynczego odczytu z gniazda (bajty)
+        :param max_frame_size: Maksymalna długość jednej linii (bajty)
+        :param ack_mode: "line" (ACK/NAK po każdej linii) lub "batch" ("ACK <n>"/"NAK <n>" po paczce linii)
+        :param workers: Liczba procesów w trybie "multiprocess" (domyślnie liczba rdzeni)
+        :param worker_mode: Tryb serwera w procesach roboczych ("threaded" lub "async")
+        :param reuse_port: Ustawia SO_REUSEPORT, aby wiele procesów mogło nasłuchiwać na porcie
+        """
+        if mode not in SERVER_MODES:
+            raise ValueError(f"Nieznany tryb serwera: {mode}")
+        if ack_mode not in ACK_MODES:
+            raise ValueError(f"Nieznany tryb potwierdzeń: {ack_mode}")
         self.port = None
         self.running = False
         self.server_sock = None
         self.logger = logger
+        self.mode = mode
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.recv_size = recv_size
+        self.max_frame_size = max_frame_size
+        self.ack_mode = ack_mode
+        self.workers = workers or os.cpu_count() or 1
+        self.worker_mode = worker_mode
+        self.reuse_port = reuse_port
+
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._loop = None
+        self._stop_event = None
+        self._connections = set()
+        self._ingest = None
+        # stop() wywołany, zanim pętla/gniazdo/procesy zdążyły powstać
+        self._stop_requested = False
 
     def configure(self, port):
         self.port = port
@@ -17,70 +105,285 @@ class NetworkServer:
         if not self.port:
             raise ValueError("Port nie został ustawiony.")
 
+        try:
+            if self.mode == "async":
+                self._start_async()
+            elif self.mode == "multiprocess":
+                self._start_multiprocess()
+            else:
+                self._start_threaded()
+        finally:
+            self._stop_requested = False
+
+    def _start_threaded(self):
         self.server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            self.server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_sock.bind(("0.0.0.0", self.port))
         self.server_sock.listen()
         self.running = True
         logger.info(f"Serwer nasłuchuje na porcie {self.port}")
 
         try:
-            while self.running:
+            while self.running and not self._stop_requested:
                 self.server_sock.settimeout(1.0)
                 try:
                     client_sock, addr = self.server_sock.accept()
                 except socket.timeout:
                     continue
+                if not self._slots.acquire(blocking=False):
+                    CONNECTIONS_REJECTED.inc()
+                    logger.warning(f"Odrzucono połączenie {addr}: osiągnięto limit {self.max_connections}")
+                    client_sock.close()
+                    continue
                 threading.Thread(target=self._handle_client, args=(client_sock, addr), daemon=True).start()
         except Exception as e:
             logger.error(f"Błąd serwera: {e}")
         finally:
+            self.running = False
             if self.server_sock:
                 self.server_sock.close()
             logger.info("Serwer został zatrzymany.")
 
+    def _start_async(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve_async())
+        except Exception as e:
+            logger.error(f"Błąd serwera: {e}")
+        finally:
+            # dokończenie paczek przetwarzanych w puli wątków przerwanych połączeń
+            self._loop.run_until_complete(self._loop.shutdown_default_executor())
+            self._loop.close()
+            self._loop = None
+            logger.info("Serwer został zatrzymany.")
+
+    async def _serve_async(self):
+        self._stop_event = asyncio.Event()
+        if self._stop_requested:
+            self._stop_event.set()
+        server = await asyncio.start_server(
+            self._handle_client_async, "0.0.0.0", self.port,
+            reuse_address=True, reuse_port=self.reuse_port or None
+        )
+        self.running = True
+        logger.info(f"Serwer (asyncio) nasłuchuje na porcie {self.port}")
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            # Zamknięcie nasłuchu i wszystkich aktywnych połączeń
+            server.close()
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await server.wait_closed()
+            self.running = False
+
+    def _start_multiprocess(self):
+        self._ingest = MultiProcessIngest(self, self.workers)
+        if self._stop_requested:
+            self._ingest.stop()
+        try:
+            self._ingest.run()
+        finally:
+            self._ingest = None
+
     def stop(self):
+        # flaga przed sprawdzeniem _ingest/_stop_event: start() sprawdza ją
+        # dopiero po ich utworzeniu, więc żadne zatrzymanie nie zginie
+        self._stop_requested = True
         self.running = False
+        if self._ingest:
+            self._ingest.stop()
+        if self._loop and self._stop_event:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
         if self.server_sock:
             try:
                 self.server_sock.close()
             except Exception as e:
                 logger.error(f"Błąd przy zamykaniu socketu serwera: {e}")
 
+    def _consume(self, framer: LineFramer, state: ConnectionState, addr) -> bytes:
+        """
+        Przetwarza dane zgromadzone w buforze połączenia i zwraca odpowiedź.
+        Pierwsza linia połączenia może negocjować protokół binarny.
+        """
+        if state.decoder is not None:
+            return self._process_frames(framer.frames(), state.decoder, addr)
+        if state.negotiated:
+            return self._process_lines(framer.lines(), addr)
+
+        line = framer.next_line()
+        if line is None:
+            return b""
+        state.negotiated = True
+        if line.startswith(HELLO_PREFIX):
+            if line.strip() == BINARY_HELLO:
+                state.decoder = BinaryDecoder()
+                logger.info(f"Połączenie {addr} używa protokołu binarnego")
+                return BINARY_HELLO + b"\n" + self._consume(framer, state, addr)
+            return b"PROTO JSON\n" + self._consume(framer, state, addr)
+        return self._process_lines([line] + framer.lines(), addr)
+
+    def _process_lines(self, lines, addr) -> bytes:
+        """
+        Przetwarza paczkę linii i zwraca odpowiedź dla klienta.
+        """
+        accepted = rejected = 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if self._process_line(line, addr):
+                accepted += 1
+            else:
+                rejected += 1
+        READINGS.inc(accepted)
+        PARSE_ERRORS.inc(rejected)
+        return self._ack_response(accepted, rejected)
+
+    def _process_frames(self, frames, decoder: BinaryDecoder, addr) -> bytes:
+        """
+        Przetwarza paczkę ramek binarnych i zwraca odpowiedź dla klienta.
+        """
+        accepted = rejected = 0
+        for payload in frames:
+            try:
+                reading = decoder.decode(payload)
+            except (ValueError, IndexError, struct.error) as e:
+                logger.error(f"Błąd ramki od {addr}: {e}")
+                rejected += 1
+                continue
+            if reading is None:
+                continue
+            sensor_id, ts, value, unit = reading
+            if reading_log_enabled():
+                logger.debug(f"Odebrano dane od {addr}: {sensor_id} {ts} {value} {unit}")
+            if self.logger:
+                self.logger.log_reading(sensor_id=sensor_id, timestamp=ts, value=value, unit=unit)
+            accepted += 1
+        READINGS.inc(accepted)
+        PARSE_ERRORS.inc(rejected)
+        return self._ack_response(accepted, rejected)
+
+    def _ack_response(self, accepted: int, rejected: int) -> bytes:
+        """
+        W trybie "line" każdy odczyt dostaje własną odpowiedź ("ACK" lub "NAK"),
+        w trybie "batch" paczka dostaje "ACK <n>" i "NAK <n>". Klient zlicza
+        odpowiedzi, więc odrzucony odczyt też musi zostać zgłoszony.
+        """
+        if self.ack_mode == "line":
+            return b"ACK\n" * accepted + b"NAK\n" * rejected
+        response = b""
+        if accepted:
+            response += b"ACK %d\n" % accepted
+        if rejected:
+            response += b"NAK %d\n" % rejected
+        return response
+
+    def _process_line(self, line: bytes, addr) -> bool:
+        """
+        Przetwarza jedną linię JSON. Zwraca True, jeśli odczyt został przyjęty.
+        """
+        try:
+            payload = json.loads(line)
+            if reading_log_enabled():
+                logger.debug(f"Odebrano dane od {addr}: {payload}")
+
+            # Logowanie do Loggera aplikacji
+            if self.logger:
+                ts = datetime.fromisoformat(payload["timestamp"])
+                self.logger.log_reading(
+                    sensor_id=payload["sensor_id"],
+                    timestamp=ts,
+                    value=payload["value"],
+                    unit=payload["unit"]
+                )
+
+            return True
+        except json.JSONDecodeError as e:
+            logger.error(f"Błąd JSON od {addr}: {e}")
+            return False
+        except (KeyError, ValueError, TypeError) as e:
+            # brak pola, błędny znacznik czasu lub wartość - odczyt odrzucany (NAK),
+            # reszta paczki jest przetwarzana dalej
+            logger.error(f"Niepoprawny odczyt od {addr}: {e!r}")
+            return False
+
     def _handle_client(self, client_socket: socket.socket, addr):
         logger.info(f"Nowe połączenie: {addr}")
+        CONNECTIONS.inc()
+        CONNECTIONS_ACTIVE.inc()
         try:
-            buffer = b""
+            client_socket.settimeout(self.idle_timeout)
+            framer = LineFramer(self.recv_size, self.max_frame_size)
+            state = ConnectionState()
             while True:
-                chunk = client_socket.recv(1024)
-                if not chunk:
+                received = framer.recv_into(client_socket)
+                if not received:
                     break
-                buffer += chunk
-                while b"\n" in buffer:
-                    line, buffer = buffer.split(b"\n", 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        payload = json.loads(line.decode())
-                        logger.info(f"Odebrano dane od {addr}: {payload}")
-
-                        # Logowanie do Loggera aplikacji
-                        if self.logger:
-                            from datetime import datetime
-                            ts = datetime.fromisoformat(payload["timestamp"])
-                            self.logger.log_reading(
-                                sensor_id=payload["sensor_id"],
-                                timestamp=ts,
-                                value=payload["value"],
-                                unit=payload["unit"]
-                            )
-
-                        client_socket.sendall(b"ACK\n")
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Błąd JSON od {addr}: {e}")
+                BYTES_RECEIVED.inc(received)
+                started = time.perf_counter()
+                response = self._consume(framer, state, addr)
+                PARSE_SECONDS.observe(time.perf_counter() - started)
+                if response:
+                    client_socket.sendall(response)
+                    BYTES_SENT.inc(len(response))
+        except socket.timeout:
+            logger.info(f"Przekroczono czas bezczynności połączenia {addr}")
         except Exception as e:
             logger.error(f"Błąd klienta {addr}: {e}")
         finally:
             client_socket.close()
+            self._slots.release()
+            CONNECTIONS_ACTIVE.dec()
+            logger.info(f"Zamknięto połączenie z {addr}")
+
+    async def _handle_client_async(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        addr = writer.get_extra_info("peername")
+        if len(self._connections) >= self.max_connections:
+            CONNECTIONS_REJECTED.inc()
+            logger.warning(f"Odrzucono połączenie {addr}: osiągnięto limit {self.max_connections}")
+            writer.close()
+            return
+
+        task = asyncio.current_task()
+        self._connections.add(task)
+        logger.info(f"Nowe połączenie: {addr}")
+        CONNECTIONS.inc()
+        CONNECTIONS_ACTIVE.inc()
+        framer = LineFramer(self.recv_size, self.max_frame_size)
+        state = ConnectionState()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(reader.read(self.recv_size), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    logger.info(f"Przekroczono czas bezczynności połączenia {addr}")
+                    break
+                if not chunk:
+                    break
+                BYTES_RECEIVED.inc(len(chunk))
+                framer.feed(chunk)
+                started = time.perf_counter()
+                # parsowanie i log_reading (blokady, zapis i fsync Loggera) w puli
+                # wątków pętli, aby zapis nie wstrzymywał pozostałych połączeń;
+                # kolejne paczki połączenia nadal przetwarzane są po kolei
+                response = await asyncio.to_thread(self._consume, framer, state, addr)
+                PARSE_SECONDS.observe(time.perf_counter() - started)
+                if response:
+                    writer.write(response)
+                    BYTES_SENT.inc(len(response))
+                # backpressure: czekamy, aż klient odbierze potwierdzenia
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Błąd klienta {addr}: {e}")
+        finally:
+            self._connections.discard(task)
+            CONNECTIONS_ACTIVE.dec()
+            writer.close()
             logger.info(f"Zamknięto połączenie z {addr}")
@@ -0,0 +1,64 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from network.system_logger import system_logger as sys_logger
+
+
+class BackgroundArchiver:
+    """
+    Wykonuje w osobnym wątku zadania archiwizacji zrotowanych logów
+    (kompresja, indeksowanie, usuwanie starych archiwów), dzięki czemu
+    rotacja w `Logger.log_reading` ogranicza się do podmiany pliku.
+    Zadania wykonywane są po kolei, w kolejności zlecenia.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failures = 0
+        self._durations = deque(maxlen=100)
+
+    def submit(self, job: Callable[[], None]) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="BackgroundArchiver", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+
+    def wait(self) -> None:
+        """
+        Czeka na zakończenie wszystkich zleconych zadań.
+        """
+        self._queue.join()
+
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def metrics(self) -> Dict[str, float]:
+        durations = list(self._durations)
+        return {
+            "archives_completed": self.completed,
+            "archives_failed": self.failures,
+            "archives_pending": self.pending(),
+            "archive_ms_last": round(durations[-1] * 1000, 2) if durations else 0.0,
+            "archive_ms_avg": round(sum(durations) / len(durations) * 1000, 2) if durations else 0.0,
+        }
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            started = time.perf_counter()
+            try:
+                job()
+                self.completed += 1
+                self._durations.append(time.perf_counter() - started)
+            except Exception as e:
+                self.failures += 1
+                sys_logger.error(f"Błąd archiwizacji logu: {e}")
+            finally:
+                self._queue.task_done()
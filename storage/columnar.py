@@ -0,0 +1,348 @@
+"""
+Kolumnowy, kompresowany blokowo format plików logów (`.col`).
+
+Plik zaczyna się nagłówkiem `SCOL1\\n`, po którym następują bloki:
+
+    <nagłówek bloku> <słownik JSON> <dane skompresowane zlib>
+
+Nagłówek bloku zawiera liczbę wierszy, długość danych oraz statystyki
+(min/max znacznika czasu w µs, min/max wartości), a słownik - listy
+identyfikatorów czujników i jednostek występujących w bloku. Dzięki temu
+bloki spoza zakresu zapytania lub bez szukanego czujnika są pomijane bez
+dekompresji. Dane bloku to kolumny: znaczniki czasu jako różnice int64,
+wartości float64 oraz indeksy słownikowe czujników i jednostek (uint16).
+
+Konwersja istniejących logów CSV/ZIP:
+    python -m storage.columnar convert ./logs
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from typing import Iterator, List, Optional, Tuple
+
+MAGIC = b"SCOL1\n"
+BLOCK_MAGIC = b"BLK1"
+BLOCK_HEADER = struct.Struct("<4sIIqqddH")
+DEFAULT_BLOCK_ROWS = 8192
+# maksymalny czas (s), przez jaki niepełny blok czeka w pamięci na zapis
+DEFAULT_MAX_BLOCK_AGE = 60.0
+
+
+def to_micros(timestamp: datetime) -> int:
+    return round(timestamp.timestamp() * 1_000_000)
+
+
+def from_micros(micros: int) -> datetime:
+    return datetime.fromtimestamp(micros / 1_000_000)
+
+
+def _to_bytes(arr: array) -> bytes:
+    # format pliku jest little-endian niezależnie od platformy
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_bytes(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+class BlockHeader:
+    __slots__ = ("rows", "length", "min_ts", "max_ts", "min_value", "max_value", "sensors", "units", "offset")
+
+    def __init__(self, rows, length, min_ts, max_ts, min_value, max_value, sensors, units, offset):
+        self.rows = rows
+        self.length = length
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self.min_value = min_value
+        self.max_value = max_value
+        self.sensors = sensors
+        self.units = units
+        # pozycja skompresowanych danych w pliku
+        self.offset = offset
+
+
+def encode_block(rows: List[Tuple[datetime, str, float, str]], level: int = 6) -> bytes:
+    """
+    Koduje wiersze (timestamp, sensor_id, value, unit) jako jeden blok.
+    """
+    sensors, units = {}, {}
+    micros = array("q")
+    values = array("d")
+    sensor_idx = array("H")
+    unit_idx = array("H")
+    previous = 0
+    min_ts = max_ts = None
+    for timestamp, sensor_id, value, unit in rows:
+        ts = to_micros(timestamp)
+        micros.append(ts - previous)
+        previous = ts
+        if min_ts is None or ts < min_ts:
+            min_ts = ts
+        if max_ts is None or ts > max_ts:
+            max_ts = ts
+        values.append(float(value))
+        sensor_idx.append(sensors.setdefault(sensor_id, len(sensors)))
+        unit_idx.append(units.setdefault(unit, len(units)))
+
+    payload = zlib.compress(
+        _to_bytes(micros) + _to_bytes(values) + _to_bytes(sensor_idx) + _to_bytes(unit_idx),
+        level
+    )
+    dictionary = json.dumps({"sensors": list(sensors), "units": list(units)}).encode("utf-8")
+    header = BLOCK_HEADER.pack(
+        BLOCK_MAGIC, len(rows), len(payload),
+        min_ts, max_ts, min(values), max(values), len(dictionary)
+    )
+    return header + dictionary + payload
+
+
+def iter_block_headers(fileobj) -> Iterator[BlockHeader]:
+    """
+    Przechodzi po nagłówkach bloków, przeskakując dane (bez dekompresji).
+    Niekompletny blok na końcu pliku (przerwany zapis) kończy iterację.
+    """
+    fileobj.seek(0)
+    if fileobj.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Plik nie jest w formacie kolumnowym")
+    position = len(MAGIC)
+    while True:
+        raw = fileobj.read(BLOCK_HEADER.size)
+        if len(raw) < BLOCK_HEADER.size:
+            return
+        magic, rows, length, min_ts, max_ts, min_value, max_value, dict_len = BLOCK_HEADER.unpack(raw)
+        if magic != BLOCK_MAGIC:
+            return
+        dictionary = fileobj.read(dict_len)
+        if len(dictionary) < dict_len:
+            return
+        dictionary = json.loads(dictionary)
+        offset = position + BLOCK_HEADER.size + dict_len
+        yield BlockHeader(
+            rows, length, min_ts, max_ts, min_value, max_value,
+            dictionary["sensors"], dictionary["units"], offset
+        )
+        position = offset + length
+        fileobj.seek(position)
+
+
+def read_block_raw(fileobj, header: BlockHeader) -> Tuple[array, array, array, array]:
+    """
+    Zwraca kolumny bloku bez dekodowania czasu: różnice znaczników czasu (µs),
+    wartości, indeksy czujników, indeksy jednostek.
+    """
+    fileobj.seek(header.offset)
+    data = zlib.decompress(fileobj.read(header.length))
+    n = header.rows
+    deltas = _from_bytes("q", data[:8 * n])
+    values = _from_bytes("d", data[8 * n:16 * n])
+    sensor_idx = _from_bytes("H", data[16 * n:18 * n])
+    unit_idx = _from_bytes("H", data[18 * n:20 * n])
+    return deltas, values, sensor_idx, unit_idx
+
+
+def read_block(fileobj, header: BlockHeader) -> Tuple[array, array, array, array]:
+    """
+    Zwraca kolumny bloku: znaczniki czasu (µs), wartości, indeksy czujników, indeksy jednostek.
+    """
+    deltas, values, sensor_idx, unit_idx = read_block_raw(fileobj, header)
+    return array("q", accumulate(deltas)), values, sensor_idx, unit_idx
+
+
+def matching_blocks(fileobj, start_us: int, end_us: int, sensor_id: Optional[str] = None) -> List[BlockHeader]:
+    return [
+        header for header in iter_block_headers(fileobj)
+        if header.max_ts >= start_us and header.min_ts <= end_us
+        and (sensor_id is None or sensor_id in header.sensors)
+    ]
+
+
+def scan(fileobj, start: datetime, end: datetime, sensor_id: Optional[str] = None) -> Iterator[Tuple]:
+    """
+    Zwraca wiersze (timestamp, sensor_id, value, unit) z zakresu [start, end].
+    """
+    start_us, end_us = to_micros(start), to_micros(end)
+    for header in matching_blocks(fileobj, start_us, end_us, sensor_id):
+        micros, values, sensor_idx, unit_idx = read_block(fileobj, header)
+        wanted = header.sensors.index(sensor_id) if sensor_id is not None else None
+        for i in range(header.rows):
+            if wanted is not None and sensor_idx[i] != wanted:
+                continue
+            ts = micros[i]
+            if start_us <= ts <= end_us:
+                yield from_micros(ts), header.sensors[sensor_idx[i]], values[i], header.units[unit_idx[i]]
+
+
+def _truncate_incomplete(path: str) -> None:
+    """
+    Obcina niekompletny ostatni blok (np. po awarii w trakcie zapisu),
+    aby kolejne bloki dopisywane były za ostatnim poprawnym.
+    """
+    size = os.path.getsize(path)
+    valid = len(MAGIC)
+    with open(path, "rb") as f:
+        for header in iter_block_headers(f):
+            if header.offset + header.length > size:
+                break
+            valid = header.offset + header.length
+    if valid < size:
+        with open(path, "r+b") as f:
+            f.truncate(valid)
+
+
+class ColumnarWriter:
+    """
+    Zapis logu w formacie kolumnowym. Wiersze gromadzone są w pamięci
+    i zapisywane blokami po `block_rows`; niepełny blok trafia na dysk
+    przy `close()`, `sync()`, `flush(force=True)` lub przy `flush()`, gdy
+    najstarszy niezapisany wiersz czeka dłużej niż `max_block_age` sekund.
+    """
+
+    extension = ".col"
+
+    def __init__(self, path: str, block_rows: int = DEFAULT_BLOCK_ROWS, max_block_age: float = DEFAULT_MAX_BLOCK_AGE):
+        self.path = path
+        self.block_rows = block_rows
+        self.max_block_age = max_block_age
+        self._pending_since = None
+        is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not is_new:
+            _truncate_incomplete(path)
+        self.file = open(path, "ab")
+        if is_new:
+            self.file.write(MAGIC)
+            self.file.flush()
+        self._pending = []
+
+    def write_rows(self, rows) -> None:
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending.extend(rows)
+        while len(self._pending) >= self.block_rows:
+            block, self._pending = self._pending[:self.block_rows], self._pending[self.block_rows:]
+            self.file.write(encode_block(block))
+            self._pending_since = time.monotonic()
+
+    def flush(self, force: bool = False) -> None:
+        expired = self._pending and time.monotonic() - self._pending_since >= self.max_block_age
+        if self._pending and (force or expired):
+            self.file.write(encode_block(self._pending))
+            self._pending = []
+        self.file.flush()
+
+    def oldest_unflushed(self) -> Optional[datetime]:
+        """
+        Najstarszy znacznik czasu wierszy niepełnego bloku (jeszcze niewidocznych dla odczytu).
+        """
+        pending = self._pending
+        return min(row[0] for row in pending) if pending else None
+
+    def sync(self) -> None:
+        self.flush(force=True)
+        os.fsync(self.file.fileno())
+
+    def size(self) -> int:
+        return self.file.tell()
+
+    def close(self) -> None:
+        self.flush(force=True)
+        self.file.close()
+
+
+def _csv_rows(text_file) -> Iterator[Tuple[datetime, str, float, str]]:
+    for row in csv.reader(text_file):
+        if len(row) < 4 or row[0] == "timestamp":
+            continue
+        yield datetime.fromisoformat(row[0]), row[1], float(row[2]), row[3]
+
+
+def convert_csv(csv_path: str, col_path: str, block_rows: int = DEFAULT_BLOCK_ROWS) -> int:
+    writer = ColumnarWriter(col_path, block_rows)
+    count = 0
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        for row in _csv_rows(f):
+            writer.write_rows([row])
+            count += 1
+    writer.close()
+    return count
+
+
+def convert_archive(zip_path: str, block_rows: int = DEFAULT_BLOCK_ROWS) -> str:
+    """
+    Tworzy obok archiwum CSV archiwum z plikiem kolumnowym. Zwraca jego ścieżkę.
+    """
+    target = zip_path[:-len(".zip")] + ".col.zip"
+    with zipfile.ZipFile(zip_path, "r") as src, zipfile.ZipFile(target, "w", zipfile.ZIP_STORED) as dst:
+        for name in src.namelist():
+            if not name.endswith(".csv"):
+                continue
+            buffer = io.BytesIO()
+            buffer.write(MAGIC)
+            with src.open(name) as f:
+                rows = list(_csv_rows(io.TextIOWrapper(f, encoding="utf-8", newline="")))
+            for i in range(0, len(rows), block_rows):
+                buffer.write(encode_block(rows[i:i + block_rows]))
+            dst.writestr(name[:-len(".csv")] + ColumnarWriter.extension, buffer.getvalue())
+    return target
+
+
+def convert(log_dir: str, keep: bool = False) -> int:
+    """
+    Konwertuje archiwa i pliki CSV katalogu logów do formatu kolumnowego.
+    Bez `keep` oryginały (i ich indeksy) są usuwane. Zwraca liczbę plików.
+    """
+    from storage.log_index import index_path
+
+    converted = []
+    archive_dir = os.path.join(log_dir, "archive")
+    if os.path.isdir(archive_dir):
+        for filename in sorted(os.listdir(archive_dir)):
+            if filename.endswith(".zip") and not filename.endswith(".col.zip"):
+                path = os.path.join(archive_dir, filename)
+                convert_archive(path)
+                converted.append(path)
+    for filename in sorted(os.listdir(log_dir)):
+        if filename.endswith(".csv"):
+            path = os.path.join(log_dir, filename)
+            convert_csv(path, path[:-len(".csv")] + ColumnarWriter.extension)
+            converted.append(path)
+
+    if not keep:
+        for path in converted:
+            os.remove(path)
+            if os.path.exists(index_path(path)):
+                os.remove(index_path(path))
+    return len(converted)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Kolumnowy format logów czujników")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert_parser = subparsers.add_parser("convert", help="konwertuj logi CSV/ZIP do formatu kolumnowego")
+    convert_parser.add_argument("log_dir", nargs="?", default="./logs")
+    convert_parser.add_argument("--keep", action="store_true", help="nie usuwaj oryginalnych plików")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        count = convert(args.log_dir, keep=args.keep)
+        print(f"Skonwertowano plików: {count}")
+
+
+if __name__ == "__main__":
+    main()
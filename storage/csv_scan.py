@@ -0,0 +1,166 @@
+"""
+Szybki odczyt bieżących (niezindeksowanych) plików CSV przez mmap.
+
+Wiersze dopisywane są w kolejności zapisu, więc znaczniki czasu w pliku
+są (prawie) rosnące. Początek i koniec zakresu wyszukiwane są binarnie po
+granicach linii, a następnie kopiowany i dzielony jest tylko potrzebny
+fragment pliku. Znaczniki czasu porównywane są jako bajty (format ISO bez
+strefy czasowej porządkuje się leksykograficznie), więc datetime tworzony
+jest tylko dla zwracanych wierszy.
+
+Odczyty z wielu połączeń mogą trafić do pliku nieznacznie nie po kolei,
+dlatego zakres poszerzany jest o `slack` sekund, a wiersze filtrowane dokładnie.
+Plik, do którego trafił wiersz starszy o więcej niż `DEFAULT_SLACK` od
+najnowszego (np. odtworzony z outboxa), zapisujący oznacza plikiem
+`<plik>.unordered` (`mark_unordered`) - taki plik czytany jest w całości.
+"""
+import mmap
+import os
+from array import array
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from storage.columnar import to_micros
+
+# maksymalne spodziewane przesunięcie kolejności wierszy w pliku
+DEFAULT_SLACK = timedelta(seconds=60)
+# znacznik pliku z wierszami spóźnionymi o więcej niż DEFAULT_SLACK
+UNORDERED_SUFFIX = ".unordered"
+
+
+def unordered_path(path: str) -> str:
+    return path + UNORDERED_SUFFIX
+
+
+def mark_unordered(path: str) -> None:
+    open(unordered_path(path), "a").close()
+
+
+def is_ordered(path: str) -> bool:
+    """
+    Czy wiersze pliku są uporządkowane po czasie z dokładnością do `DEFAULT_SLACK`
+    (tylko wtedy można wyszukiwać zakres binarnie).
+    """
+    return not os.path.exists(unordered_path(path))
+
+
+def open_map(fileobj) -> Optional[mmap.mmap]:
+    """
+    Mapuje plik tylko do odczytu. Zwraca None dla pustego pliku
+    lub pliku z polami w cudzysłowach (wymaga pełnego parsera CSV).
+    """
+    try:
+        mm = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        return None
+    if mm.find(b'"') != -1:
+        mm.close()
+        return None
+    return mm
+
+
+def _data_start(mm) -> int:
+    # pominięcie nagłówka
+    newline = mm.find(b"\n")
+    return len(mm) if newline == -1 else newline + 1
+
+
+def _data_end(mm) -> int:
+    # ostatnia linia może być w trakcie zapisu
+    return mm.rfind(b"\n") + 1
+
+
+def seek_time(mm, bound: bytes, lo: int, hi: int) -> int:
+    """
+    Przesunięcie pierwszej linii w [lo, hi) ze znacznikiem czasu >= `bound`
+    (ISO jako bajty); `lo` musi być początkiem linii.
+    """
+    while lo < hi:
+        mid = (lo + hi) // 2
+        newline = mm.find(b"\n", mid, hi)
+        if newline == -1 or newline + 1 >= hi:
+            # w (mid, hi) nie zaczyna się żadna linia - zostało najwyżej kilka linii
+            break
+        line = newline + 1
+        if mm[line:mm.find(b",", line, hi)] < bound:
+            lo = line
+        else:
+            hi = line
+    # dokończenie liniowo od `lo`
+    while lo < hi:
+        comma = mm.find(b",", lo, hi)
+        if comma == -1 or mm[lo:comma] >= bound:
+            return lo
+        newline = mm.find(b"\n", comma, hi)
+        if newline == -1:
+            return hi
+        lo = newline + 1
+    return lo
+
+
+def region(mm, start: datetime, end: datetime, slack: timedelta = DEFAULT_SLACK) -> bytes:
+    """
+    Fragment pliku (pełne linie) mogący zawierać wiersze z zakresu [start, end].
+    """
+    lo, hi = _data_start(mm), _data_end(mm)
+    first = seek_time(mm, (start - slack).isoformat().encode(), lo, hi)
+    last = seek_time(mm, (end + slack).isoformat().encode(), first, hi)
+    # linia z czasem równym (end + slack) leży poza zakresem, ale bez znaczenia
+    return mm[first:last]
+
+
+def _lines(mm, start, end, slack):
+    start_b = start.isoformat().encode()
+    end_b = end.isoformat().encode()
+    for line in region(mm, start, end, slack).split(b"\n"):
+        fields = line.rstrip(b"\r").split(b",")
+        if len(fields) < 4:
+            continue
+        ts = fields[0]
+        if start_b <= ts <= end_b:
+            yield fields
+
+
+def iter_rows(
+    mm,
+    start: datetime,
+    end: datetime,
+    sensor_id: Optional[str] = None,
+    slack: timedelta = DEFAULT_SLACK
+) -> Iterator[Tuple[datetime, str, float, str]]:
+    """
+    Wiersze (timestamp, sensor_id, value, unit) z zakresu [start, end].
+    """
+    wanted = sensor_id.encode() if sensor_id is not None else None
+    for fields in _lines(mm, start, end, slack):
+        if wanted is not None and fields[1] != wanted:
+            continue
+        yield datetime.fromisoformat(fields[0].decode()), fields[1].decode(), float(fields[2]), fields[3].decode()
+
+
+def read_arrays(
+    mm,
+    start: datetime,
+    end: datetime,
+    sensor_ids: Optional[Sequence[str]] = None,
+    slack: timedelta = DEFAULT_SLACK
+) -> Tuple[List[str], array, array, array]:
+    """
+    Wiersze z zakresu jako kolumny: (nazwy czujników, indeksy czujników,
+    różnice kolejnych znaczników czasu w µs, wartości) - format porcji
+    `Logger._iter_chunks`.
+    """
+    wanted = {s.encode() for s in sensor_ids} if sensor_ids is not None else None
+    sensors = {}
+    sensor_idx, deltas, values = array("H"), array("q"), array("d")
+    previous = 0
+    for fields in _lines(mm, start, end, slack):
+        sensor = fields[1]
+        if wanted is not None and sensor not in wanted:
+            continue
+        ts = to_micros(datetime.fromisoformat(fields[0].decode()))
+        sensor_idx.append(sensors.setdefault(sensor, len(sensors)))
+        deltas.append(ts - previous)
+        values.append(float(fields[2]))
+        previous = ts
+    return [s.decode() for s in sensors], sensor_idx, deltas, values
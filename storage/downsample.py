@@ -0,0 +1,104 @@
+"""
+Przyrostowe próbkowanie w dół historii czujnika do wykresu o zadanej
+szerokości w pikselach (min/max na piksel).
+
+Okres wykresu dzielony jest na `width` przedziałów wyrównanych do czasu
+bezwzględnego (`floor(ts / bucket_seconds)`), więc przedziały nie zmieniają
+się wraz z upływem czasu: nowe odczyty aktualizują tylko ostatni przedział,
+a najstarsze przedziały wypadają z okna. Każda aktualizacja przetwarza
+wyłącznie odczyty dopisane od poprzedniej, a rysowanie kosztuje O(width)
+niezależnie od liczby odczytów w oknie (np. 43 200 na 12 h przy 1 Hz).
+Zachowanie min i max przedziału sprawia, że krótkie skoki wartości
+pozostają widoczne na wykresie.
+"""
+from collections import deque
+from typing import List, Optional, Tuple
+
+
+class MinMaxDownsampler:
+    """
+    Przedziały (numer, min, max) ostatnich `span_seconds` odczytów jednego czujnika.
+
+    :param sensor_id: Identyfikator czujnika
+    :param span_seconds: Długość okna wykresu w sekundach (np. 12 h)
+    :param width: Liczba przedziałów, zwykle szerokość wykresu w pikselach
+    """
+
+    def __init__(self, sensor_id: str, span_seconds: float, width: int):
+        if width <= 0:
+            raise ValueError("Szerokość wykresu musi być dodatnia.")
+        self.sensor_id = sensor_id
+        self.span_seconds = span_seconds
+        self.width = width
+        self.bucket_seconds = span_seconds / width
+        self.buckets = deque()
+        # bezwzględny indeks (SensorSeries.offset + pozycja) następnego nieprzetworzonego odczytu
+        self.next_index = None
+        # SensorSeries.late przy poprzedniej aktualizacji
+        self.late_seen = 0
+
+    def add(self, ts: float, value: float) -> None:
+        bucket = int(ts // self.bucket_seconds)
+        buckets = self.buckets
+        if buckets and buckets[-1][0] == bucket:
+            last = buckets[-1]
+            if value < last[1]:
+                last[1] = value
+            elif value > last[2]:
+                last[2] = value
+        elif not buckets or bucket > buckets[-1][0]:
+            buckets.append([bucket, value, value])
+        else:
+            # odczyt spóźniony względem ostatniego przedziału (rzadkie)
+            for i in range(len(buckets) - 1, -1, -1):
+                if buckets[i][0] == bucket:
+                    buckets[i][1] = min(buckets[i][1], value)
+                    buckets[i][2] = max(buckets[i][2], value)
+                    return
+                if buckets[i][0] < bucket:
+                    buckets.insert(i + 1, [bucket, value, value])
+                    return
+            buckets.appendleft([bucket, value, value])
+
+    def update(self, series, now: float) -> None:
+        """
+        Dodaje odczyty serii (storage.readings_store.SensorSeries) dopisane od
+        poprzedniej aktualizacji i usuwa przedziały spoza okna. Wywołujący
+        zapewnia wyłączny dostęp do serii (`Logger._store_lock`).
+        """
+        if series is not None:
+            timestamps, values = series.timestamps, series.values
+            if series.late != self.late_seen:
+                # spóźnione odczyty przesunęły pozycje w serii - przeliczamy okno od nowa
+                self.late_seen = series.late
+                self.buckets.clear()
+                self.next_index = None
+            if self.next_index is None:
+                start = series.index_since(now - self.span_seconds)
+            else:
+                # odczyty usunięte w międzyczasie z okna retencji są pomijane
+                start = max(self.next_index - series.offset, series.head)
+            for i in range(start, len(timestamps)):
+                self.add(timestamps[i], values[i])
+            self.next_index = series.offset + len(timestamps)
+
+        first = self.last_bucket(now) - self.width + 1
+        buckets = self.buckets
+        while buckets and buckets[0][0] < first:
+            buckets.popleft()
+
+    def last_bucket(self, now: float) -> int:
+        return int(now // self.bucket_seconds)
+
+    def points(self, now: float) -> List[Tuple[int, float, float]]:
+        """
+        Niepuste przedziały okna kończącego się w `now`:
+        (pozycja 0..width-1 od lewej krawędzi wykresu, min, max).
+        """
+        first = self.last_bucket(now) - self.width + 1
+        return [(bucket - first, low, high) for bucket, low, high in self.buckets if bucket >= first]
+
+    def value_range(self) -> Optional[Tuple[float, float]]:
+        if not self.buckets:
+            return None
+        return min(b[1] for b in self.buckets), max(b[2] for b in self.buckets)
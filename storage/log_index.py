@@ -0,0 +1,176 @@
+"""
+Indeks plików logów (plik towarzyszący `<plik>.idx.json`).
+
+Dla każdego pliku CSV (także spakowanego w archiwum ZIP) indeks zawiera
+zakres czasu, liczbę wierszy per czujnik oraz bloki wierszy z przesunięciem
+w bajtach, zakresem czasu i licznikami czujników. Dzięki temu `read_logs`
+pomija pliki i bloki spoza zapytania i czyta tylko potrzebne fragmenty.
+
+Przebudowa indeksów istniejących logów:
+    python -m storage.log_index rebuild ./logs
+"""
+import argparse
+import json
+import os
+import zipfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+INDEX_SUFFIX = ".idx.json"
+INDEX_VERSION = 1
+BLOCK_ROWS = 4096
+
+
+def index_path(path: str) -> str:
+    return path + INDEX_SUFFIX
+
+
+def _new_block(offset: int) -> Dict:
+    return {"offset": offset, "length": 0, "rows": 0, "min_ts": None, "max_ts": None, "sensors": {}}
+
+
+def build_index(fileobj, member: Optional[str] = None, block_rows: int = BLOCK_ROWS) -> Dict:
+    """
+    Buduje indeks pliku CSV czytanego binarnie (nagłówek w pierwszej linii).
+    """
+    header = fileobj.readline()
+    offset = len(header)
+    blocks: List[Dict] = []
+    sensors: Dict[str, int] = {}
+    block = _new_block(offset)
+
+    for line in fileobj:
+        fields = line.split(b",", 2)
+        if len(fields) < 3:
+            offset += len(line)
+            block["length"] += len(line)
+            continue
+        ts = datetime.fromisoformat(fields[0].decode()).timestamp()
+        sensor_id = fields[1].decode()
+
+        block["rows"] += 1
+        block["length"] += len(line)
+        block["sensors"][sensor_id] = block["sensors"].get(sensor_id, 0) + 1
+        if block["min_ts"] is None or ts < block["min_ts"]:
+            block["min_ts"] = ts
+        if block["max_ts"] is None or ts > block["max_ts"]:
+            block["max_ts"] = ts
+        sensors[sensor_id] = sensors.get(sensor_id, 0) + 1
+        offset += len(line)
+
+        if block["rows"] >= block_rows:
+            blocks.append(block)
+            block = _new_block(offset)
+    if block["rows"]:
+        blocks.append(block)
+
+    return {
+        "version": INDEX_VERSION,
+        "member": member,
+        "size": offset,
+        "rows": sum(sensors.values()),
+        "min_ts": min((b["min_ts"] for b in blocks), default=None),
+        "max_ts": max((b["max_ts"] for b in blocks), default=None),
+        "sensors": sensors,
+        "blocks": blocks,
+    }
+
+
+def write_index(path: str, index: Dict) -> None:
+    tmp_path = index_path(path) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path(path))
+
+
+def load_index(path: str) -> Optional[Dict]:
+    """
+    Wczytuje indeks pliku lub zwraca None, jeśli go brak lub jest nieaktualny.
+    """
+    try:
+        with open(index_path(path), "r") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    # plik CSV mógł urosnąć od czasu budowy indeksu
+    if path.endswith(".csv") and os.path.getsize(path) != index["size"]:
+        return None
+    return index
+
+
+def index_csv(csv_path: str, target: Optional[str] = None, member: Optional[str] = None) -> Dict:
+    """
+    Indeksuje plik CSV i zapisuje indeks obok `target` (domyślnie obok pliku).
+    `member` to nazwa pliku w archiwum (domyślnie nazwa pliku CSV).
+    """
+    with open(csv_path, "rb") as f:
+        index = build_index(f, member=member or os.path.basename(csv_path))
+    write_index(target or csv_path, index)
+    return index
+
+
+def index_archive(zip_path: str) -> Optional[Dict]:
+    """
+    Indeksuje plik CSV w archiwum ZIP. Archiwa plików kolumnowych (`.col`)
+    nie potrzebują indeksu - bloki niosą własne statystyki - więc zwraca None.
+    """
+    with zipfile.ZipFile(zip_path, "r") as zipf:
+        member = next((name for name in zipf.namelist() if name.endswith(".csv")), None)
+        if member is None:
+            return None
+        with zipf.open(member) as f:
+            index = build_index(f, member=member)
+    write_index(zip_path, index)
+    return index
+
+
+def matching_blocks(index: Dict, start: float, end: float, sensor_id: Optional[str] = None) -> List[Dict]:
+    """
+    Zwraca bloki, które mogą zawierać wiersze z zakresu [start, end] (epoch)
+    i opcjonalnie danego czujnika.
+    """
+    if index["min_ts"] is None or index["max_ts"] < start or index["min_ts"] > end:
+        return []
+    if sensor_id is not None and sensor_id not in index["sensors"]:
+        return []
+    return [
+        block for block in index["blocks"]
+        if block["max_ts"] >= start and block["min_ts"] <= end
+        and (sensor_id is None or sensor_id in block["sensors"])
+    ]
+
+
+def rebuild(log_dir: str) -> int:
+    """
+    Przebudowuje indeksy wszystkich archiwów CSV i plików CSV w katalogu logów
+    (archiwa kolumnowe są pomijane). Zwraca liczbę zaindeksowanych plików.
+    """
+    count = 0
+    archive_dir = os.path.join(log_dir, "archive")
+    if os.path.isdir(archive_dir):
+        for filename in sorted(os.listdir(archive_dir)):
+            if filename.endswith(".zip") and index_archive(os.path.join(archive_dir, filename)) is not None:
+                count += 1
+    for filename in sorted(os.listdir(log_dir)):
+        if filename.endswith(".csv"):
+            index_csv(os.path.join(log_dir, filename))
+            count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Indeksy plików logów czujników")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = subparsers.add_parser("rebuild", help="przebuduj indeksy istniejących logów")
+    rebuild_parser.add_argument("log_dir", nargs="?", default="./logs")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        count = rebuild(args.log_dir)
+        print(f"Zaindeksowano plików: {count}")
+
+
+if __name__ == "__main__":
+    main()
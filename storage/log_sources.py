@@ -0,0 +1,145 @@
+"""
+Otwieranie i parsowanie pojedynczych plików logów (CSV, kolumnowych, ZIP)
+niezależnie od instancji Loggera, dzięki czemu te same funkcje działają
+w procesach roboczych równoległego odczytu archiwów (`scan_archive`).
+
+Źródło to krotka (plik, format, bloki): format "csv", "columnar" lub
+"mapped" (mmap niezindeksowanego CSV), bloki - pasujące bloki indeksu CSV
+lub None (cały plik).
+"""
+import csv
+import io
+import zipfile
+from array import array
+from datetime import datetime
+from typing import Iterator, Optional, Sequence, Tuple
+
+from storage import columnar, csv_scan
+from storage.log_index import load_index, matching_blocks
+
+
+def csv_blocks(path: str, start_ts: float, end_ts: float, sensor_ids: Optional[Sequence[str]] = None):
+    """
+    Zwraca (indeks, pasujące bloki) pliku lub (None, None), gdy brak indeksu.
+    """
+    index = load_index(path)
+    if index is None:
+        return None, None
+    blocks = matching_blocks(index, start_ts, end_ts)
+    if sensor_ids is not None:
+        blocks = [b for b in blocks if any(s in b["sensors"] for s in sensor_ids)]
+    return index, blocks
+
+
+def archive_sources(path: str, start_ts: float, end_ts: float, sensor_ids: Optional[Sequence[str]] = None):
+    """
+    Źródła z archiwum ZIP; archiwum z indeksem spoza zakresu nie jest otwierane.
+    """
+    index, blocks = csv_blocks(path, start_ts, end_ts, sensor_ids)
+    if index is not None and not blocks:
+        return
+    try:
+        zipf = zipfile.ZipFile(path, 'r')
+    except FileNotFoundError:
+        # usunięte w międzyczasie przez retencję
+        return
+    with zipf:
+        for name in zipf.namelist():
+            with zipf.open(name) as f:
+                if name.endswith(columnar.ColumnarWriter.extension):
+                    yield f, "columnar", None
+                    continue
+                indexed = index is not None and index.get("member") == name
+                yield f, "csv", blocks if indexed else None
+
+
+def file_source(fileobj, kind: str, blocks, ordered: bool = True) -> Iterator[Tuple]:
+    """
+    Niezindeksowany plik CSV na dysku udostępniany jest przez mmap
+    (format "mapped", storage.csv_scan), pozostałe bez zmian. Plik
+    z wierszami nie po kolei (`ordered=False`, csv_scan.is_ordered)
+    czytany jest w całości, bo wyszukiwanie binarne pominęłoby spóźnione wiersze.
+    """
+    if kind == "csv" and blocks is None and ordered:
+        mm = csv_scan.open_map(fileobj)
+        if mm is not None:
+            with mm:
+                yield mm, "mapped", None
+            return
+    yield fileobj, kind, blocks
+
+
+def csv_lines(fileobj, blocks) -> Iterator:
+    """
+    Wiersze CSV pliku binarnego: całości (blocks=None) lub tylko wskazanych bloków.
+    """
+    if blocks is None:
+        yield from csv.reader(io.TextIOWrapper(fileobj, encoding="utf-8", newline=""))
+        return
+    for block in blocks:
+        fileobj.seek(block["offset"])
+        data = fileobj.read(block["length"]).decode("utf-8")
+        yield from csv.reader(data.splitlines())
+
+
+def source_rows(
+    fileobj,
+    kind: str,
+    blocks,
+    start: datetime,
+    end: datetime,
+    sensor_id: Optional[str] = None
+) -> Iterator[Tuple[datetime, str, float, str]]:
+    """
+    Wiersze (timestamp, sensor_id, value, unit) źródła z zakresu [start, end].
+    """
+    if kind == "columnar":
+        yield from columnar.scan(fileobj, start, end, sensor_id)
+        return
+    if kind == "mapped":
+        yield from csv_scan.iter_rows(fileobj, start, end, sensor_id)
+        return
+
+    for row in csv_lines(fileobj, blocks):
+        if len(row) < 4 or row[0] == "timestamp":
+            continue
+        if sensor_id is not None and row[1] != sensor_id:
+            continue
+        row_time = datetime.fromisoformat(row[0])
+        if start <= row_time <= end:
+            yield row_time, row[1], float(row[2]), row[3]
+
+
+def scan_archive(path: str, start: datetime, end: datetime, sensor_id: Optional[str] = None) -> Tuple:
+    """
+    Odczyt jednego archiwum w procesie roboczym. Zwraca wiersze posortowane
+    po czasie w zwartej postaci kolumnowej (tanie przesłanie między procesami):
+    (nazwy czujników, jednostki, indeksy czujników, indeksy jednostek, znaczniki czasu µs, wartości).
+    """
+    sensors, units = {}, {}
+    sensor_idx, unit_idx, micros, values = array("H"), array("H"), array("q"), array("d")
+    sensor_ids = [sensor_id] if sensor_id is not None else None
+    for fileobj, kind, blocks in archive_sources(path, start.timestamp(), end.timestamp(), sensor_ids):
+        for row_time, row_sensor, value, unit in source_rows(fileobj, kind, blocks, start, end, sensor_id):
+            sensor_idx.append(sensors.setdefault(row_sensor, len(sensors)))
+            unit_idx.append(units.setdefault(unit, len(units)))
+            micros.append(columnar.to_micros(row_time))
+            values.append(value)
+
+    order = sorted(range(len(micros)), key=micros.__getitem__)
+    if any(order[i] != i for i in range(len(order))):
+        sensor_idx = array("H", (sensor_idx[i] for i in order))
+        unit_idx = array("H", (unit_idx[i] for i in order))
+        micros = array("q", (micros[i] for i in order))
+        values = array("d", (values[i] for i in order))
+    return list(sensors), list(units), sensor_idx, unit_idx, micros, values
+
+
+def columns_rows(columns: Tuple) -> Iterator[Tuple[datetime, str, float, str]]:
+    """
+    Odtwarza wiersze (timestamp, sensor_id, value, unit) z wyniku `scan_archive`.
+    """
+    sensors, units, sensor_idx, unit_idx, micros, values = columns
+    from_micros = columnar.from_micros
+    for i in range(len(micros)):
+        yield from_micros(micros[i]), sensors[sensor_idx[i]], values[i], units[unit_idx[i]]
@@ -0,0 +1,261 @@
+"""
+Wektorowe zapytania agregujące po historycznych logach (`Logger.query`).
+
+Dane wczytywane są porcjami kolumnowymi (`Logger._iter_chunks`) prosto do
+tablic NumPy, a podział na przedziały i agregaty liczone są bez pętli
+w Pythonie po wierszach (sortowanie + `ufunc.reduceat`). Najszybciej
+działa z formatem kolumnowym, którego bloki trafiają do NumPy bez parsowania.
+
+numpy importowany jest dopiero przy pierwszym zapytaniu, więc reszta
+Loggera nie wymaga tej zależności.
+
+Przedziały wyrównane są do początku doby, od której zaczyna się zakres, więc
+te same przedziały powtarzają się w kolejnych zapytaniach; przy włączonej
+pamięci podręcznej (storage.query_cache) zamknięte przedziały nie są liczone ponownie.
+"""
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from storage.columnar import from_micros, to_micros
+from storage.csv_scan import DEFAULT_SLACK
+from storage.query_cache import MISSING
+
+INTERVAL_UNITS = {"s": 1, "min": 60, "h": 3600, "d": 86400}
+AGGREGATIONS = ("count", "sum", "mean", "min", "max", "std")
+_INTERVAL = re.compile(r"^\s*(\d+(?:\.\d+)?)?\s*(s|min|h|d)\s*$")
+_PERCENTILE = re.compile(r"^p(\d{1,2}(?:\.\d+)?|100)$")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Logger.query wymaga pakietu numpy (pip install numpy).")
+    return numpy
+
+
+def parse_interval(text: str) -> float:
+    """
+    Zamienia opis przedziału ("30s", "1min", "15min", "1h", "1d") na sekundy.
+    """
+    match = _INTERVAL.match(text)
+    if not match:
+        raise ValueError(f"Niepoprawny przedział: {text!r} (np. 30s, 1min, 1h, 1d)")
+    seconds = float(match.group(1) or 1) * INTERVAL_UNITS[match.group(2)]
+    if seconds <= 0:
+        raise ValueError(f"Przedział musi być dodatni: {text!r}")
+    return seconds
+
+
+def _validate(aggs: Sequence[str]) -> None:
+    for agg in aggs:
+        if agg not in AGGREGATIONS and not _PERCENTILE.match(agg):
+            raise ValueError(f"Nieznany agregat: {agg} (dostępne: {', '.join(AGGREGATIONS)}, pNN)")
+
+
+def load(logger, sensor_ids: Optional[List[str]], start: datetime, end: datetime) -> Dict:
+    """
+    Wczytuje odczyty z zakresu do tablic: {sensor_id: (znaczniki czasu µs, wartości)},
+    posortowanych po czasie.
+    """
+    np = _numpy()
+    start_us, end_us = to_micros(start), to_micros(end)
+    parts: Dict[str, tuple] = {}
+
+    for names, sensor_idx, deltas, values in logger._iter_chunks(start, end, sensor_ids):
+        sensor_idx = np.frombuffer(sensor_idx, dtype=np.uint16)
+        micros = np.cumsum(np.frombuffer(deltas, dtype=np.int64))
+        values = np.frombuffer(values, dtype=np.float64)
+        in_range = (micros >= start_us) & (micros <= end_us)
+        for i, name in enumerate(names):
+            if sensor_ids is not None and name not in sensor_ids:
+                continue
+            mask = in_range & (sensor_idx == i) if len(names) > 1 else in_range
+            if mask.any():
+                chunks = parts.setdefault(name, ([], []))
+                chunks[0].append(micros[mask])
+                chunks[1].append(values[mask])
+
+    result = {}
+    for name, (micros, values) in parts.items():
+        micros = np.concatenate(micros)
+        values = np.concatenate(values)
+        order = np.argsort(micros, kind="stable")
+        result[name] = (micros[order], values[order])
+    return result
+
+
+def aggregate(micros, values, origin_us: int, step_us: Optional[int], aggs: Sequence[str]) -> Dict:
+    """
+    Dzieli posortowane odczyty na przedziały `step_us` liczone od `origin_us`
+    (None - jeden przedział) i liczy dla nich agregaty.
+    """
+    return _aggregate(micros, values, origin_us, step_us, aggs)[1]
+
+
+def _aggregate(micros, values, origin_us: int, step_us: Optional[int], aggs: Sequence[str]):
+    # (numery niepustych przedziałów, kolumny wyniku)
+    np = _numpy()
+    if step_us is None:
+        buckets = np.zeros(len(micros), dtype=np.int64)
+    else:
+        buckets = (micros - origin_us) // step_us
+    # odczyty są posortowane po czasie, więc przedziały tworzą ciągłe fragmenty
+    bucket_ids, starts = np.unique(buckets, return_index=True)
+    counts = np.diff(np.append(starts, len(values)))
+
+    columns = {"timestamp": (origin_us + bucket_ids * (step_us or 0)) / 1_000_000}
+    sums = np.add.reduceat(values, starts)
+    means = sums / counts
+    sorted_values = None
+
+    for agg in aggs:
+        if agg == "count":
+            columns[agg] = counts
+        elif agg == "sum":
+            columns[agg] = sums
+        elif agg == "mean":
+            columns[agg] = means
+        elif agg == "min":
+            columns[agg] = np.minimum.reduceat(values, starts)
+        elif agg == "max":
+            columns[agg] = np.maximum.reduceat(values, starts)
+        elif agg == "std":
+            deviations = values - np.repeat(means, counts)
+            columns[agg] = np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts)
+        else:
+            if sorted_values is None:
+                # wartości posortowane w obrębie każdego przedziału
+                sorted_values = values[np.lexsort((values, buckets))]
+            # interpolacja liniowa jak w numpy.percentile
+            position = starts + (counts - 1) * (float(agg[1:]) / 100)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, starts + counts - 1)
+            fraction = position - lower
+            columns[agg] = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+    return bucket_ids, columns
+
+
+def query(
+    logger,
+    sensor_ids: Optional[List[str]],
+    start: datetime,
+    end: datetime,
+    resample: Optional[str] = "1min",
+    aggs: Sequence[str] = ("mean", "min", "max", "p95")
+) -> Dict[str, Dict]:
+    """
+    Zwraca {sensor_id: {"timestamp": ..., agregat: tablica, ...}}; puste
+    przedziały są pomijane. Opis parametrów: `Logger.query`.
+    """
+    _validate(aggs)
+    step_us = round(parse_interval(resample) * 1_000_000) if resample else None
+    origin_us = to_micros(start)
+    if step_us is not None:
+        origin_us = to_micros(start.replace(hour=0, minute=0, second=0, microsecond=0))
+        cache = getattr(logger, "query_cache", None)
+        if cache is not None and sensor_ids is not None:
+            return _cached_query(logger, cache, sensor_ids, start, end, origin_us, step_us, aggs)
+    return {
+        name: aggregate(micros, values, origin_us, step_us, aggs)
+        for name, (micros, values) in load(logger, sensor_ids, start, end).items()
+    }
+
+
+def _runs(ids: List[int]):
+    # ciągi kolejnych liczb z posortowanej listy: [(pierwsza, ostatnia), ...]
+    runs = []
+    for k in ids:
+        if runs and runs[-1][1] == k - 1:
+            runs[-1][1] = k
+        else:
+            runs.append([k, k])
+    return runs
+
+
+def _cached_query(logger, cache, sensor_ids, start, end, origin_us, step_us, aggs) -> Dict[str, Dict]:
+    """
+    `query` z pamięcią podręczną: przedziały w całości zawarte w [start, end]
+    i zakończone przed `DEFAULT_SLACK` od teraz (później mogą jeszcze dojść
+    odczyty) brane są z pamięci, a z logów wczytywany jest tylko zakres
+    pokrywający brakujące i niepełne przedziały.
+    """
+    np = _numpy()
+    start_us, end_us = to_micros(start), to_micros(end)
+    horizon_us = min(end_us + 1, to_micros(datetime.now() - DEFAULT_SLACK))
+    generation = cache.begin(horizon_us)
+    # wiersze czekające w zapisującym (niepełny blok kolumnowy) nie są jeszcze
+    # widoczne; sprawdzane po `begin`, bo późniejsze zapisy unieważnią generację
+    unflushed = logger._unflushed_since()
+    if unflushed is not None:
+        horizon_us = min(horizon_us, to_micros(unflushed))
+    first, last = (start_us - origin_us) // step_us, (end_us - origin_us) // step_us
+    # zamknięte przedziały: od pierwszego zaczynającego się w `start` lub później
+    # do ostatniego kończącego się przed horyzontem
+    first_closed = -((origin_us - start_us) // step_us)
+    last_closed = (horizon_us - origin_us) // step_us - 1
+
+    buckets = {name: {} for name in sensor_ids}
+    missing = []
+    for k in range(first, last + 1):
+        if not first_closed <= k <= last_closed:
+            missing.append(k)
+            continue
+        bucket_us = origin_us + k * step_us
+        keys = [(name, step_us, bucket_us, agg) for name in sensor_ids for agg in aggs]
+        values = cache.get_many(keys)
+        if MISSING in values:
+            missing.append(k)
+            continue
+        for i, name in enumerate(sensor_ids):
+            row = values[i * len(aggs):(i + 1) * len(aggs)]
+            if row[0] is not None:
+                buckets[name][k] = row
+
+    computed = {name: {} for name in sensor_ids}
+    for run_first, run_last in _runs(missing):
+        # każdy ciąg brakujących przedziałów wczytywany osobno
+        lo = max(start_us, origin_us + run_first * step_us)
+        hi = min(end_us, origin_us + (run_last + 1) * step_us - 1)
+        for name, (micros, values) in load(logger, sensor_ids, from_micros(lo), from_micros(hi)).items():
+            bucket_ids, columns = _aggregate(micros, values, origin_us, step_us, aggs)
+            rows = zip(*(columns[agg].tolist() for agg in aggs))
+            computed[name].update(zip(bucket_ids.tolist(), rows))
+    if missing:
+        for name in sensor_ids:
+            buckets[name].update(computed[name])
+        cache.put_many((
+            ((name, step_us, origin_us + k * step_us, agg), computed[name].get(k, (None,) * len(aggs))[j])
+            for k in missing if first_closed <= k <= last_closed
+            for name in sensor_ids
+            for j, agg in enumerate(aggs)
+        ), generation)
+
+    result = {}
+    for name, rows in buckets.items():
+        if not rows:
+            continue
+        ids = sorted(rows)
+        columns = {"timestamp": (origin_us + np.array(ids, dtype=np.int64) * step_us) / 1_000_000}
+        for j, agg in enumerate(aggs):
+            columns[agg] = np.array([rows[k][j] for k in ids])
+        result[name] = columns
+    return result
+
+
+def to_table(result: Dict[str, Dict]) -> List[tuple]:
+    """
+    Spłaszcza wynik `query` do wierszy (sensor_id, początek przedziału, agregaty...),
+    np. do raportu lub zapisu CSV. Pierwszy wiersz to nagłówek.
+    """
+    rows = []
+    header = None
+    for name, columns in sorted(result.items()):
+        names = [key for key in columns if key != "timestamp"]
+        if header is None:
+            header = ("sensor_id", "timestamp", *names)
+            rows.append(header)
+        for i, ts in enumerate(columns["timestamp"]):
+            rows.append((name, datetime.fromtimestamp(ts), *(columns[key][i].item() for key in names)))
+    return rows
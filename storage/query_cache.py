@@ -0,0 +1,190 @@
+"""
+Pamięć podręczna wyników `Logger.query` dla zamkniętych przedziałów czasu.
+
+Wpis to wartość jednego agregatu jednego czujnika w jednym przedziale:
+klucz (sensor_id, szerokość przedziału µs, początek przedziału µs, agregat),
+wartość - liczba lub None dla przedziału bez odczytów. Powtarzane zapytania
+(panele, raporty) po historycznych danych wczytują z logów tylko przedziały,
+których brak w pamięci.
+
+Wpisy usuwane są według LRU po przekroczeniu limitu pamięci. Unieważniane są:
+- przy zapisie do bieżącego pliku wiersza starszego niż wpisy w pamięci
+  (`note_write`; zwykle nic nie robi, bo nowe odczyty są nowsze),
+- przy usuwaniu archiwów przez retencję (`invalidate_before`).
+
+Opcjonalnie zawartość zapisywana jest do pliku JSON przy zatrzymaniu Loggera
+i wczytywana przy starcie, o ile od zapisu nie zniknęło żadne archiwum.
+"""
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# wynik `get_many` dla klucza spoza pamięci (None oznacza pusty przedział)
+MISSING = object()
+CACHE_VERSION = 1
+# przybliżony narzut wpisu OrderedDict (węzeł listy + slot słownika)
+_ENTRY_OVERHEAD = 100
+
+Key = Tuple[str, int, int, str]
+
+
+class QueryCache:
+    """
+    Pamięć LRU agregatów przedziałów, ograniczona do `max_bytes` (szacunkowo).
+    Bezpieczna dla wielu wątków.
+    """
+
+    def __init__(self, max_bytes: int, path: Optional[str] = None):
+        """
+        :param max_bytes: Limit pamięci wpisów w bajtach
+        :param path: Plik JSON do zapisu zawartości między uruchomieniami (None - bez zapisu)
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: "OrderedDict[Key, Optional[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        # koniec najpóźniejszego przedziału, który mógł trafić do pamięci
+        self._watermark = None
+        # zmienia się przy każdym unieważnieniu; wyniki liczone przed nim nie są zapisywane
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _size(key: Key, value) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(key[1]) + sys.getsizeof(key[2]) + sys.getsizeof(value) + _ENTRY_OVERHEAD
+
+    def begin(self, horizon_us: int) -> int:
+        """
+        Rozpoczyna zapytanie, które zapisze przedziały kończące się najpóźniej
+        w `horizon_us`. Zwraca generację do przekazania do `put_many`.
+        """
+        with self._lock:
+            if self._watermark is None or horizon_us > self._watermark:
+                self._watermark = horizon_us
+            return self.generation
+
+    def get_many(self, keys: Iterable[Key]) -> List:
+        """
+        Wartości kluczy w kolejności; MISSING dla kluczy spoza pamięci.
+        """
+        with self._lock:
+            values = []
+            for key in keys:
+                value = self._entries.get(key, MISSING)
+                if value is MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                values.append(value)
+            return values
+
+    def put_many(self, items: Iterable[Tuple[Key, Optional[float]]], generation: int) -> bool:
+        """
+        Zapisuje wpisy, o ile od `begin` nie było unieważnienia
+        (dane mogły się zmienić w trakcie liczenia). Zwraca, czy zapisano.
+        """
+        with self._lock:
+            if generation != self.generation:
+                return False
+            for key, value in items:
+                previous = self._entries.pop(key, MISSING)
+                if previous is not MISSING:
+                    self._bytes -= self._size(key, previous)
+                self._entries[key] = value
+                self._bytes += self._size(key, value)
+            while self._bytes > self.max_bytes and self._entries:
+                key, value = self._entries.popitem(last=False)
+                self._bytes -= self._size(key, value)
+                self.evictions += 1
+            return True
+
+    def note_write(self, min_us: int) -> None:
+        """
+        Zapis do bieżącego pliku wierszy od `min_us`: unieważnia przedziały,
+        które mogą je zawierać. Wiersze nowsze niż wszystko w pamięci nic nie kosztują.
+        """
+        with self._lock:
+            if self._watermark is None or min_us >= self._watermark:
+                return
+            self._drop(lambda key: key[2] + key[1] > min_us)
+            self._watermark = min_us
+
+    def invalidate_before(self, until_us: int) -> None:
+        """
+        Usunięcie danych do `until_us` (retencja): unieważnia przedziały zaczynające się wcześniej.
+        """
+        with self._lock:
+            self._drop(lambda key: key[2] <= until_us)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._drop(lambda key: True)
+
+    def _drop(self, predicate) -> None:
+        # wymaga `_lock`
+        self.generation += 1
+        for key in [key for key in self._entries if predicate(key)]:
+            self._bytes -= self._size(key, self._entries.pop(key))
+            self.invalidations += 1
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_entries": len(self._entries),
+                "cache_bytes": self._bytes,
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "cache_evictions": self.evictions,
+                "cache_invalidations": self.invalidations,
+            }
+
+    def save(self, archives: List[str]) -> None:
+        """
+        Zapisuje wpisy (od najdawniej używanego) wraz z listą archiwów,
+        z których mogły pochodzić.
+        """
+        if self.path is None:
+            return
+        with self._lock:
+            data = {
+                "version": CACHE_VERSION,
+                "archives": sorted(archives),
+                "watermark": self._watermark,
+                "entries": [[*key, value] for key, value in self._entries.items()],
+            }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self, archives: List[str]) -> int:
+        """
+        Wczytuje wpisy zapisane przez `save`. Jeśli któreś z ówczesnych
+        archiwów zniknęło (retencja, ręczne usunięcie), zapis jest pomijany.
+        Zwraca liczbę wczytanych wpisów.
+        """
+        if self.path is None:
+            return 0
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        if data.get("version") != CACHE_VERSION or not set(data["archives"]) <= set(archives):
+            return 0
+        with self._lock:
+            self._watermark = data["watermark"]
+            generation = self.generation
+        entries = (((sensor_id, step, bucket, agg), value) for sensor_id, step, bucket, agg, value in data["entries"])
+        self.put_many(entries, generation)
+        return len(self._entries)
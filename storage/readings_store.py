@@ -0,0 +1,232 @@
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, Optional, Tuple
+
+from storage.rolling import RollingWindow
+
+# Minimalna liczba usuniętych elementów, po której kompaktujemy tablice
+COMPACT_MIN = 1024
+
+
+class SensorSeries:
+    """
+    Okno czasowe odczytów jednego czujnika, posortowane po czasie.
+
+    Znaczniki czasu (epoch, float) i wartości przechowywane są w tablicach
+    `array('d')`, jednostki jako indeksy do słownika jednostek magazynu.
+    Usuwanie najstarszych wpisów przesuwa jedynie wskaźnik `head`,
+    a fizyczne skrócenie tablic następuje rzadko (amortyzowane O(1)).
+    `offset` to liczba wpisów usuniętych przy kompaktowaniu, pozwalająca
+    oknom agregatów (`windows`) posługiwać się indeksami bezwzględnymi.
+    `late` liczy odczyty wstawione przed ostatnim (spóźnione).
+    """
+
+    __slots__ = ("timestamps", "values", "unit_ids", "head", "offset", "windows", "late")
+
+    def __init__(self):
+        self.timestamps = array("d")
+        self.values = array("d")
+        self.unit_ids = array("H")
+        self.head = 0
+        self.offset = 0
+        self.windows: Dict[float, RollingWindow] = {}
+        self.late = 0
+
+    def __len__(self) -> int:
+        return len(self.timestamps) - self.head
+
+    def append(self, ts: float, value: float, unit_id: int) -> int:
+        """
+        Dodaje wpis z zachowaniem kolejności czasu i zwraca jego pozycję.
+        Spóźniony odczyt (ponowienie, odtworzenie outboxa) wstawiany jest
+        na właściwe miejsce kosztem O(n), zwykły odczyt na koniec w O(1).
+        """
+        timestamps = self.timestamps
+        if len(timestamps) == self.head or ts >= timestamps[-1]:
+            timestamps.append(ts)
+            self.values.append(value)
+            self.unit_ids.append(unit_id)
+            return len(timestamps) - 1
+        position = bisect_right(timestamps, ts, self.head)
+        timestamps.insert(position, ts)
+        self.values.insert(position, value)
+        self.unit_ids.insert(position, unit_id)
+        self.late += 1
+        return position
+
+    def evict_before(self, cutoff: float) -> None:
+        """
+        Usuwa z początku okna wpisy starsze niż `cutoff`.
+        """
+        timestamps = self.timestamps
+        head = self.head
+        end = len(timestamps)
+        while head < end and timestamps[head] < cutoff:
+            head += 1
+        self.head = head
+        if head >= COMPACT_MIN and head * 2 >= end:
+            self._compact()
+
+    def _compact(self) -> None:
+        head = self.head
+        del self.timestamps[:head]
+        del self.values[:head]
+        del self.unit_ids[:head]
+        self.offset += head
+        self.head = 0
+
+    def index_since(self, cutoff: float) -> int:
+        """
+        Zwraca indeks pierwszego wpisu o znaczniku czasu >= `cutoff`.
+        """
+        return bisect_left(self.timestamps, cutoff, self.head)
+
+    def last(self) -> Optional[Tuple[float, float, int]]:
+        if len(self) == 0:
+            return None
+        return self.timestamps[-1], self.values[-1], self.unit_ids[-1]
+
+    def nbytes(self) -> int:
+        return (
+            self.timestamps.buffer_info()[1] * self.timestamps.itemsize
+            + self.values.buffer_info()[1] * self.values.itemsize
+            + self.unit_ids.buffer_info()[1] * self.unit_ids.itemsize
+        )
+
+
+class ReadingsStore:
+    """
+    Magazyn ostatnich odczytów (per czujnik) ograniczony oknem retencji.
+
+    :param retention_seconds: Jak długo (w sekundach) przechowywać odczyty w pamięci
+    """
+
+    def __init__(self, retention_seconds: float):
+        self.retention_seconds = retention_seconds
+        self._series: Dict[str, SensorSeries] = {}
+        self._units = []
+        self._unit_ids: Dict[str, int] = {}
+        self._windows = []
+
+    def __contains__(self, sensor_id: str) -> bool:
+        return sensor_id in self._series
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._series)
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def series(self, sensor_id: str) -> Optional[SensorSeries]:
+        return self._series.get(sensor_id)
+
+    def unit(self, unit_id: int) -> str:
+        return self._units[unit_id]
+
+    def _unit_id(self, unit: str) -> int:
+        unit_id = self._unit_ids.get(unit)
+        if unit_id is None:
+            unit_id = len(self._units)
+            self._units.append(unit)
+            self._unit_ids[unit] = unit_id
+        return unit_id
+
+    def has_window(self, seconds: float) -> bool:
+        return seconds in self._windows
+
+    def register_window(self, seconds: float) -> None:
+        """
+        Rejestruje okno agregatów kroczących dla wszystkich czujników.
+        Okno dłuższe niż retencja wydłuża retencję magazynu.
+        Istniejące serie są jednorazowo przeliczane, kolejne odczyty
+        aktualizują okno przyrostowo.
+        """
+        if seconds in self._windows:
+            return
+        self._windows.append(seconds)
+        self.retention_seconds = max(self.retention_seconds, seconds)
+        cutoff = time.time() - seconds
+        for series in self._series.values():
+            start = series.index_since(cutoff)
+            series.windows[seconds] = self._build_window(series, seconds, start)
+
+    @staticmethod
+    def _build_window(series: SensorSeries, seconds: float, start: int) -> RollingWindow:
+        window = RollingWindow(seconds, series.offset + start)
+        timestamps, values = series.timestamps, series.values
+        for i in range(start, len(values)):
+            window.add(timestamps[i], values[i])
+        return window
+
+    def append(self, sensor_id: str, ts: float, value: float, unit: str) -> SensorSeries:
+        """
+        Dodaje odczyt, aktualizuje okna agregatów i usuwa wpisy starsze
+        niż okno retencji.
+        """
+        series = self._series.get(sensor_id)
+        if series is None:
+            series = self._series[sensor_id] = SensorSeries()
+            for seconds in self._windows:
+                series.windows[seconds] = RollingWindow(seconds)
+        position = series.append(ts, value, self._unit_id(unit))
+
+        now = time.time()
+        late = position < len(series.timestamps) - 1
+        for window in series.windows.values():
+            if late:
+                window.insert(series.offset + position, ts, value)
+            else:
+                window.add(ts, value)
+            window.expire(series, now - window.seconds)
+        series.evict_before(now - self.retention_seconds)
+        return series
+
+    def window_stats(self, sensor_id: str, seconds: float) -> Optional[Dict[str, float]]:
+        """
+        Zwraca agregaty zarejestrowanego okna (count, mean, min, max, variance)
+        lub None, jeśli brak danych lub okno nie zostało zarejestrowane.
+        """
+        series = self._series.get(sensor_id)
+        if series is None:
+            return None
+        window = series.windows.get(seconds)
+        if window is None:
+            return None
+        window.expire(series, time.time() - seconds)
+        return window.stats()
+
+    def scan_stats(self, sensor_id: str, seconds: float) -> Optional[Dict[str, float]]:
+        """
+        Agregaty dowolnego okna liczone jednorazowo z odczytów w pamięci, w O(n),
+        bez rejestracji okna (nie zmienia kosztu `append` ani retencji).
+        Okno dłuższe niż retencja obejmuje tylko przechowywane odczyty.
+        """
+        series = self._series.get(sensor_id)
+        if series is None:
+            return None
+        start = series.index_since(time.time() - seconds)
+        return self._build_window(series, seconds, start).stats()
+
+    def latest(self, sensor_id: str) -> Optional[Tuple[float, float, str]]:
+        series = self._series.get(sensor_id)
+        if series is None:
+            return None
+        last = series.last()
+        if last is None:
+            return None
+        ts, value, unit_id = last
+        return ts, value, self._units[unit_id]
+
+    def memory_usage(self) -> Dict[str, Dict[str, int]]:
+        """
+        Raport zajętości pamięci: liczba próbek i bajty zaalokowane na czujnik.
+        """
+        return {
+            sensor_id: {
+                "samples": len(series),
+                "bytes": series.nbytes() + sys.getsizeof(series),
+            }
+            for sensor_id, series in self._series.items()
+        }
@@ -0,0 +1,121 @@
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Optional
+
+
+class RollingWindow:
+    """
+    Przyrostowe agregaty (liczność, suma, min, max, wariancja) dla jednego
+    przesuwnego okna czasowego jednego czujnika.
+
+    Okno przechowuje jedynie bezwzględny indeks najstarszej próbki w serii
+    (`start`), dzięki czemu aktualizacja przy dodaniu i usunięciu próbki
+    kosztuje O(1) (min/max przez kolejki monotoniczne (czas, wartość),
+    zamortyzowane O(1)). Seria jest posortowana po czasie, a spóźnione
+    próbki trafiają na właściwe miejsce przez `insert`.
+
+    :param seconds: Długość okna w sekundach
+    """
+
+    __slots__ = ("seconds", "start", "count", "shift", "sum", "sumsq", "min_q", "max_q")
+
+    def __init__(self, seconds: float, start: int = 0):
+        self.seconds = seconds
+        self.start = start
+        self.count = 0
+        # sumy liczone względem przesunięcia poprawiają stabilność wariancji
+        self.shift = 0.0
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self.min_q = deque()
+        self.max_q = deque()
+
+    def _include(self, value: float) -> None:
+        if self.count == 0:
+            self.shift = value
+            self.sum = 0.0
+            self.sumsq = 0.0
+        self.count += 1
+        d = value - self.shift
+        self.sum += d
+        self.sumsq += d * d
+
+    def add(self, ts: float, value: float) -> None:
+        """
+        Dodaje próbkę nie starszą niż pozostałe próbki okna.
+        """
+        self._include(value)
+
+        max_q = self.max_q
+        while max_q and max_q[-1][1] <= value:
+            max_q.pop()
+        max_q.append((ts, value))
+
+        min_q = self.min_q
+        while min_q and min_q[-1][1] >= value:
+            min_q.pop()
+        min_q.append((ts, value))
+
+    def insert(self, index: int, ts: float, value: float) -> None:
+        """
+        Uwzględnia spóźnioną próbkę wstawioną do serii na bezwzględną pozycję
+        `index` (próbki od tej pozycji przesunęły się o jeden). Próbka przed
+        początkiem okna tylko przesuwa `start`; starsze niż okno usunie `expire`.
+        """
+        if index < self.start:
+            self.start += 1
+            return
+        self._include(value)
+        # element kolejki pozostaje, jeśli jest większy (mniejszy) od wszystkich późniejszych
+        self._insert_extreme(self.max_q, ts, value, lambda a, b: a <= b)
+        self._insert_extreme(self.min_q, ts, value, lambda a, b: a >= b)
+
+    @staticmethod
+    def _insert_extreme(queue: deque, ts: float, value: float, dominated) -> None:
+        i = bisect_right([entry[0] for entry in queue], ts)
+        if i < len(queue) and dominated(value, queue[i][1]):
+            # późniejsza próbka jest co najmniej tak samo skrajna
+            return
+        queue.insert(i, (ts, value))
+        while i > 0 and dominated(queue[i - 1][1], value):
+            del queue[i - 1]
+            i -= 1
+
+    def expire(self, series, cutoff: float) -> None:
+        """
+        Usuwa z okna próbki starsze niż `cutoff`.
+        """
+        timestamps = series.timestamps
+        values = series.values
+        offset = series.offset
+        start = self.start
+        end = offset + len(timestamps)
+        while start < end and timestamps[start - offset] < cutoff:
+            if self.count:
+                d = values[start - offset] - self.shift
+                self.count -= 1
+                self.sum -= d
+                self.sumsq -= d * d
+            start += 1
+        self.start = start
+
+        max_q = self.max_q
+        while max_q and max_q[0][0] < cutoff:
+            max_q.popleft()
+        min_q = self.min_q
+        while min_q and min_q[0][0] < cutoff:
+            min_q.popleft()
+
+    def stats(self) -> Optional[Dict[str, float]]:
+        n = self.count
+        if n == 0:
+            return None
+        mean_d = self.sum / n
+        variance = max(self.sumsq / n - mean_d * mean_d, 0.0)
+        return {
+            "count": n,
+            "mean": self.shift + mean_d,
+            "min": self.min_q[0][1],
+            "max": self.max_q[0][1],
+            "variance": variance,
+        }
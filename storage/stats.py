@@ -0,0 +1,11 @@
+from typing import Sequence
+
+
+def percentile_ms(values: Sequence[float], q: float) -> float:
+    """
+    Percentyl `q` (0-1) metodą najbliższej rangi z posortowanych czasów
+    w sekundach, w milisekundach (0.0 dla pustej listy).
+    """
+    if not values:
+        return 0.0
+    return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 3)
@@ -0,0 +1,134 @@
+import queue
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+gui = pytest.importorskip("gui")
+
+
+class _Tree:
+    """
+    Zastępuje ttk.Treeview: zapamiętuje wiersze i wywołania zmieniające tabelę.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.items = []
+        self.values = {}
+        self.calls = []
+
+    def __getitem__(self, key):
+        assert key == "columns"
+        return self.columns
+
+    def insert(self, parent, index, iid, values):
+        self.calls.append(("insert", iid))
+        self.items.insert(index, iid)
+        self.values[iid] = list(values)
+
+    def delete(self, iid):
+        self.calls.append(("delete", iid))
+        self.items.remove(iid)
+        del self.values[iid]
+
+    def move(self, iid, parent, index):
+        self.calls.append(("move", iid))
+        self.items.remove(iid)
+        self.items.insert(index, iid)
+
+    def set(self, iid, column, value):
+        self.calls.append(("set", iid, column))
+        self.values[iid][self.columns.index(column)] = value
+
+
+class _Widget:
+    """
+    Zastępuje zmienną Tk i przycisk: zapamiętuje ostatnią wartość.
+    """
+
+    def __init__(self):
+        self.value = None
+        self.state = None
+
+    def set(self, value):
+        self.value = value
+
+    def config(self, state):
+        self.state = state
+
+
+def _table(page_size=2):
+    table = SimpleNamespace(
+        PAGE_SIZE=page_size, tree=_Tree(("id", "value")), rows={}, sensor_ids=[], visible_ids=[], shown={}, page=0,
+        page_var=_Widget(), prev_button=_Widget(), next_button=_Widget()
+    )
+    table.page_count = lambda: gui.SensorGUI.page_count(table)
+    return table
+
+
+def _show(table, rows, page):
+    table.rows = rows
+    table.sensor_ids = sorted(rows)
+    table.tree.calls.clear()
+    gui.SensorGUI.show_page(table, page)
+    return table.tree.calls
+
+
+def test_table_updates_only_changed_cells():
+    table = _table()
+    rows = {"A": ("A", "1.00"), "B": ("B", "2.00"), "C": ("C", "3.00")}
+    assert _show(table, rows, 0) == [("insert", "A"), ("insert", "B")]
+    # w Treeview jest tylko bieżąca strona
+    assert table.tree.items == ["A", "B"]
+
+    rows = dict(rows, B=("B", "2.50"), C=("C", "9.00"))
+    assert _show(table, rows, 0) == [("set", "B", "value")]
+    assert table.tree.values["B"] == ["B", "2.50"]
+    assert _show(table, rows, 0) == []
+
+    assert _show(table, rows, 1) == [("delete", "A"), ("delete", "B"), ("insert", "C")]
+    assert table.tree.values == {"C": ["C", "9.00"]}
+    # strona spoza zakresu - ostatnia strona
+    assert _show(table, rows, 5) == []
+    assert table.page == 1
+    assert table.page_var.value == "Strona 2/2"
+    assert table.next_button.state == gui.tk.DISABLED
+
+
+def test_new_sensor_moves_rows_instead_of_rebuilding_page():
+    table = _table(page_size=3)
+    _show(table, {"B": ("B", "1"), "C": ("C", "2")}, 0)
+    calls = _show(table, {"A": ("A", "0"), "B": ("B", "1"), "C": ("C", "2")}, 0)
+    assert calls == [("insert", "A"), ("move", "B"), ("move", "C")]
+    assert table.tree.items == ["A", "B", "C"]
+
+
+class _SnapshotLogger:
+    def __init__(self):
+        self.calls = 0
+
+    def get_snapshot(self, hours):
+        self.calls += 1
+        stats = {"mean": float(self.calls)}
+        return {"T1": {"last_value": 1.0, "unit": "C", "timestamp": datetime(2025, 1, 1), "stats": {1: stats, 12: None}}}
+
+
+def test_snapshot_worker_keeps_only_latest_result():
+    logger = _SnapshotLogger()
+    results = queue.Queue(maxsize=1)
+    worker = gui.SnapshotWorker(logger, results, interval=0.01)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while logger.calls < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+        worker.join(5)
+    # nieodebrane starsze wyniki zastępowane są nowszymi, więc wątek nie blokuje się na kolejce
+    assert logger.calls >= 5
+    row = results.get_nowait()["rows"]["T1"]
+    assert row == ("T1", "1.00", "C", "2025-01-01 00:00:00", f"{logger.calls:.2f}", "-")
+    assert results.empty()
@@ -0,0 +1,287 @@
+import json
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+import pytest
+
+from network.client import NetworkClient
+from network.framing import FRAME_LENGTH, FrameTooLongError, LineFramer
+from network.metrics import CONTENT_TYPE, MetricsServer, Registry
+from network.outbox import Outbox
+from network.protocol import BinaryDecoder, BinaryEncoder
+from network.sender import BackgroundSender
+
+
+def _reading(i, sensor_id="T1", unit="C"):
+    return {
+        "sensor_id": sensor_id,
+        "timestamp": datetime(2025, 1, 1, 12, 0, 0, i).isoformat(),
+        "value": float(i),
+        "unit": unit,
+    }
+
+
+def test_framer_joins_partial_lines():
+    framer = LineFramer(recv_size=16)
+    framer.feed(b"ab")
+    assert framer.lines() == []
+    framer.feed(b"c\nde")
+    assert framer.next_line() == b"abc"
+    assert framer.next_line() is None
+    framer.feed(b"f\ng\nh")
+    assert framer.lines() == [b"def", b"g"]
+    framer.feed(b"\n")
+    assert framer.lines() == [b"h"]
+    assert len(framer) == 0
+
+
+def test_framer_keeps_data_when_buffer_is_compacted():
+    framer = LineFramer(recv_size=8)
+    expected = [b"line-%d" % i for i in range(200)]
+    stream = b"".join(line + b"\n" for line in expected)
+    received = []
+    for i in range(0, len(stream), 5):
+        framer.feed(stream[i:i + 5])
+        received.extend(framer.lines())
+    assert received == expected
+
+
+def test_framer_recv_into_reads_from_socket():
+    left, right = socket.socketpair()
+    with left, right:
+        framer = LineFramer(recv_size=4)
+        left.sendall(b"ACK 3\nNAK 1\n")
+        lines = []
+        while len(lines) < 2:
+            assert framer.recv_into(right) > 0
+            lines.extend(framer.lines())
+        assert lines == [b"ACK 3", b"NAK 1"]
+        left.close()
+        assert framer.recv_into(right) == 0
+
+
+def test_framer_rejects_too_long_line():
+    framer = LineFramer(recv_size=16, max_frame=10)
+    framer.feed(b"x" * 11)
+    with pytest.raises(FrameTooLongError):
+        framer.lines()
+
+    framer = LineFramer(recv_size=16, max_frame=10)
+    framer.feed(b"ok\n" + b"y" * 20 + b"\n")
+    with pytest.raises(FrameTooLongError):
+        framer.lines()
+
+
+def test_parse_ack():
+    assert NetworkClient._parse_ack("ACK") == (1, 0)
+    assert NetworkClient._parse_ack("ACK 50") == (50, 0)
+    assert NetworkClient._parse_ack("NAK 2") == (0, 2)
+
+
+class _PartialClient:
+    """
+    Klient, którego pierwsza wysyłka zostaje przerwana po 3 odczytach
+    (jeden z nich odrzucony przez serwer), a kolejne się udają.
+    """
+
+    outbox = None
+    window = 100
+
+    def __init__(self):
+        self.handled = []
+        self.calls = 0
+
+    def deliver(self, batch):
+        self.calls += 1
+        if self.calls == 1:
+            self.handled.extend(batch[:3])
+            return 2, 3
+        self.handled.extend(batch)
+        return len(batch), len(batch)
+
+
+def test_sender_requeues_only_unhandled_records():
+    client = _PartialClient()
+    sender = BackgroundSender(client, backoff_initial=0.01)
+    records = [_reading(i) for i in range(5)]
+    for data in records:
+        sender.submit(data)
+    sender.start()
+    deadline = time.monotonic() + 5
+    while len(client.handled) < len(records) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    sender.stop()
+
+    # odczyty obsłużone przez serwer (również odrzucone) nie są wysyłane ponownie
+    assert client.handled == records
+    metrics = sender.metrics()
+    assert metrics["sent"] == 4
+    assert metrics["rejected"] == 1
+    assert metrics["failures"] == 1
+    assert metrics["queue_depth"] == 0
+
+
+def test_outbox_replays_from_committed_position(tmp_path):
+    outbox = Outbox(str(tmp_path), segment_size=64)
+    lines = [json.dumps(_reading(i)).encode() + b"\n" for i in range(10)]
+    outbox.append_lines(lines)
+    assert not outbox.empty()
+
+    batch, position = outbox.read_batch(4)
+    assert batch == lines[:4]
+    # bez commit ta sama paczka zostanie odczytana ponownie (np. po awarii)
+    assert Outbox(str(tmp_path), segment_size=64).read_batch(4)[0] == lines[:4]
+
+    outbox.commit(position)
+    reopened = Outbox(str(tmp_path), segment_size=64)
+    batch, position = reopened.read_batch(100)
+    assert batch == lines[4:]
+    reopened.commit(position)
+    assert reopened.empty()
+    assert reopened.read_batch(100) == ([], None)
+
+
+def test_outbox_skips_unfinished_line(tmp_path):
+    outbox = Outbox(str(tmp_path))
+    outbox.append_lines([b"complete\n", b"partial"])
+    assert outbox.read_batch(10)[0] == [b"complete\n"]
+
+
+def test_outbox_drops_oldest_segments_over_budget(tmp_path):
+    outbox = Outbox(str(tmp_path), segment_size=100, max_bytes=300)
+    lines = [b"%05d" % i + b"x" * 44 + b"\n" for i in range(20)]
+    for line in lines:
+        outbox.append_lines([line])
+    assert outbox.size_bytes() <= 300
+    batch, _ = outbox.read_batch(100)
+    assert batch == lines[-len(batch):]
+
+
+def test_framer_splits_length_prefixed_frames():
+    framer = LineFramer(recv_size=16, max_frame=100)
+    stream = b"".join(FRAME_LENGTH.pack(len(body)) + body for body in (b"abc", b"", b"defgh"))
+    framer.feed(stream[:13])
+    assert framer.frames() == [b"abc", b""]
+    framer.feed(stream[13:])
+    assert framer.frames() == [b"defgh"]
+
+    framer.feed(FRAME_LENGTH.pack(101))
+    with pytest.raises(FrameTooLongError):
+        framer.frames()
+
+
+def test_binary_protocol_round_trip():
+    encoder = BinaryEncoder()
+    decoder = BinaryDecoder()
+    framer = LineFramer()
+    readings = [_reading(1), _reading(2), _reading(3, "H1", "%")]
+    for data in readings:
+        framer.feed(encoder.encode(data))
+
+    decoded = [reading for reading in map(decoder.decode, framer.frames()) if reading is not None]
+    assert decoded == [
+        (data["sensor_id"], datetime.fromisoformat(data["timestamp"]), data["value"], data["unit"])
+        for data in readings
+    ]
+
+
+def test_binary_encoder_sends_dictionary_once():
+    encoder = BinaryEncoder()
+    first = encoder.encode(_reading(1))
+    second = encoder.encode(_reading(2))
+    # 25 bajtów ramki odczytu (4 długość + 1 typ + 20 dane); słownik tylko w pierwszej
+    assert len(second) == 25
+    assert len(first) > len(second)
+
+
+def test_binary_decoder_rejects_unknown_frame():
+    with pytest.raises(ValueError):
+        BinaryDecoder().decode(b"X123")
+
+
+def test_client_falls_back_to_json_without_server_hello():
+    # starszy serwer: nie odpowiada na powitanie protokołu
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    port = listener.getsockname()[1]
+    accepted = []
+    thread = threading.Thread(target=lambda: accepted.append(listener.accept()[0]), daemon=True)
+    thread.start()
+
+    client = NetworkClient("127.0.0.1", port, timeout=0.2, protocol="binary")
+    try:
+        client.connect()
+        assert client.sock is not None
+        assert client.wire == "json"
+        assert client._serialize(_reading(1)).endswith(b"\n")
+    finally:
+        client.close()
+        thread.join(1)
+        for sock in accepted:
+            sock.close()
+        listener.close()
+
+
+def test_registry_renders_prometheus_text_format():
+    registry = Registry()
+    readings = registry.counter("test_readings_total", "Przyjęte odczyty")
+    readings.inc(3)
+    readings.inc()
+    connections = registry.gauge("test_connections", "Połączenia")
+    connections.inc(2)
+    connections.dec()
+    latency = registry.histogram("test_seconds", "Czas", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        latency.observe(value)
+
+    assert registry.counter("test_readings_total", "inny opis") is readings
+    with pytest.raises(ValueError):
+        registry.gauge("test_readings_total", "Przyjęte odczyty")
+    assert registry.render() == "\n".join([
+        "# HELP test_connections Połączenia",
+        "# TYPE test_connections gauge",
+        "test_connections 1",
+        "# HELP test_readings_total Przyjęte odczyty",
+        "# TYPE test_readings_total counter",
+        "test_readings_total 4",
+        "# HELP test_seconds Czas",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 2',
+        'test_seconds_bucket{le="1"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 2.65",
+        "test_seconds_count 4",
+    ]) + "\n"
+
+    values = registry.snapshot()
+    assert values["test_readings_total"] == 4
+    assert values["test_seconds_count"] == 4
+    # kwantyl jako górna granica przedziału; powyżej ostatniej granicy - ostatnia granica
+    assert values["test_seconds_p50"] == 0.1
+    assert values["test_seconds_p99"] == 1.0
+    assert Registry().histogram("empty_seconds", "Pusty").quantile(0.5) is None
+
+
+def test_metrics_server_serves_registry_over_http():
+    registry = Registry()
+    registry.counter("test_requests_total", "Żądania").inc(7)
+    server = MetricsServer(0, registry=registry)
+    assert server.start()
+    try:
+        url = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(url + "/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            body = response.read().decode("utf-8")
+        assert "test_requests_total 7\n" in body
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + "/other", timeout=5)
+        assert error.value.code == 404
+        # zajęty port: błąd zgłaszany wynikiem, bez wyjątku
+        assert MetricsServer(server.port, registry=registry).start() is False
+    finally:
+        server.stop()
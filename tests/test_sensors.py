@@ -0,0 +1,142 @@
+import time
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from Sensors.AirQualitySensor import AirQualitySensor
+from Sensors.HumiditySensor import HumiditySensor
+from Sensors.PressureSensor import PressureSensor
+from Sensors.SensorBank import SensorBank
+from Sensors.SensorScheduler import SensorScheduler
+from Sensors.TemperatureSensor import TemperatureSensor
+
+RANGES = {
+    TemperatureSensor: ("°C", -20, 40),
+    HumiditySensor: ("%", 0, 100),
+    PressureSensor: ("hPa", 950, 1050),
+    AirQualitySensor: ("AQI", 0, 500),
+}
+
+
+def _bank(seed, count=50):
+    bank = SensorBank(seed)
+    for sensor_class, (unit, min_value, max_value) in RANGES.items():
+        bank.add(sensor_class, count, unit, min_value, max_value)
+    return bank
+
+
+def test_sensor_bank_is_reproducible_with_seed():
+    times = [datetime(2025, 1, 1, hour, 30) for hour in (0, 6, 14, 22)]
+    first, second, other = _bank(11), _bank(11), _bank(12)
+    for now in times:
+        a, b, c = first.tick(now), second.tick(now), other.tick(now)
+        assert a.sensor_ids.tolist() == b.sensor_ids.tolist()
+        assert a.values.tolist() == b.values.tolist()
+        assert a.values.tolist() != c.values.tolist()
+
+
+@pytest.mark.parametrize("sensor_class", list(RANGES))
+def test_sensor_bank_matches_sensor_model(sensor_class):
+    unit, min_value, max_value = RANGES[sensor_class]
+    bank = SensorBank(3)
+    bank.add(sensor_class, 20, unit, min_value, max_value)
+    sensor = sensor_class("X", "X", unit, min_value, max_value)
+    # ten sam strumień szumu co grupa banku
+    rng = np.random.default_rng([3, 0])
+    now = datetime(2025, 1, 1, 14, 0)
+
+    for t in range(5):
+        batch = bank.tick(now)
+        noise = rng.uniform(-sensor.noise_level, sensor.noise_level, 20)
+        expected = [sensor._clamp(sensor.model(t, n, now)) for n in noise.tolist()]
+        assert batch.values.tolist() == pytest.approx(expected)
+        assert all(min_value <= value <= max_value for value in batch.values.tolist())
+        if sensor.precision is not None:
+            assert batch.values.tolist() == [round(value, sensor.precision) for value in batch.values.tolist()]
+
+
+def test_stopped_sensors_produce_no_readings():
+    bank = _bank(1, count=3)
+    bank.stop(["T01", "H02"])
+    batch = bank.tick(datetime(2025, 1, 1))
+    assert len(batch) == 10
+    assert "T01" not in batch.sensor_ids.tolist()
+    assert [record["sensor_id"] for record in batch.records()] == batch.sensor_ids.tolist()
+    with pytest.raises(KeyError):
+        bank.start(["X99"])
+
+
+class _FakeSensor:
+    """
+    Czujnik zapamiętujący chwile odczytów; odczyt trwa `duration` sekund.
+    """
+
+    def __init__(self, sensor_id, frequency, duration=0.0):
+        self.sensor_id = sensor_id
+        self.frequency = frequency
+        self.duration = duration
+        self.times = []
+
+    def read_value(self):
+        self.times.append(time.monotonic())
+        if self.duration:
+            time.sleep(self.duration)
+        return 0.0
+
+
+def _run(scheduler, seconds):
+    scheduler.start()
+    time.sleep(seconds)
+    scheduler.stop()
+
+
+def test_scheduler_reads_each_sensor_at_its_own_rate():
+    fast, slow = _FakeSensor("F", 0.02), _FakeSensor("S", 0.1)
+    scheduler = SensorScheduler([fast, slow])
+    _run(scheduler, 1.0)
+    # ok. 50 i 10 odczytów; tolerancja na obciążoną maszynę testową
+    assert 40 <= len(fast.times) <= 51
+    assert 8 <= len(slow.times) <= 11
+    stats = scheduler.get_stats()
+    assert stats["F"]["frequency_s"] == 0.02
+    assert stats["S"]["reads"] == len(slow.times)
+
+
+def test_scheduler_deadlines_do_not_drift_with_read_duration():
+    # odczyt trwa ponad połowę okresu: przy sleep(okres) po odczycie byłoby ok. 6 odczytów
+    sensor = _FakeSensor("T", 0.05, duration=0.03)
+    scheduler = SensorScheduler([sensor])
+    _run(scheduler, 0.5)
+    assert len(sensor.times) >= 9
+    assert sensor.times[-1] - sensor.times[0] == pytest.approx((len(sensor.times) - 1) * 0.05, abs=0.03)
+
+
+def test_scheduler_skips_missed_deadlines_instead_of_bursting():
+    sensor = _FakeSensor("T", 0.05, duration=0.25)
+    scheduler = SensorScheduler([sensor])
+    _run(scheduler, 0.6)
+    stats = scheduler.get_stats()["T"]
+    assert stats["skipped"] >= 4
+    # po długim odczycie następny startuje w najbliższym terminie, nie seria zaległych
+    gaps = [b - a for a, b in zip(sensor.times, sensor.times[1:])]
+    assert all(gap >= 0.25 for gap in gaps)
+
+
+def test_slow_sensor_does_not_delay_others_with_pool():
+    slow, fast = _FakeSensor("S", 0.05, duration=0.3), _FakeSensor("F", 0.02)
+    scheduler = SensorScheduler([slow, fast], workers=2)
+    _run(scheduler, 0.6)
+    assert len(fast.times) >= 25
+    assert scheduler.get_stats()["S"]["overruns"] > 0
+
+
+def test_scheduler_rejects_invalid_sensors():
+    scheduler = SensorScheduler([_FakeSensor("T", 1)])
+    with pytest.raises(ValueError):
+        scheduler.add(_FakeSensor("T", 1))
+    with pytest.raises(ValueError):
+        scheduler.add(_FakeSensor("X", 0))
+    with pytest.raises(KeyError):
+        scheduler.remove("X")
@@ -0,0 +1,276 @@
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from network.client import NetworkClient
+from network.protocol import BINARY_HELLO
+from server.server import DEFAULT_ACK_MODE, NetworkServer
+
+
+class _Collector:
+    """
+    Zastępuje Logger: zapamiętuje przyjęte odczyty.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def log_reading(self, sensor_id, timestamp, value, unit):
+        with self._lock:
+            self.rows.append((sensor_id, timestamp, value, unit))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _reading(i, sensor_id="T1"):
+    return {
+        "sensor_id": sensor_id,
+        "timestamp": datetime(2025, 1, 1, 12, 0, 0, i).isoformat(),
+        "value": float(i),
+        "unit": "C",
+    }
+
+
+def _start(server, timeout=30.0):
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + timeout
+    while not server.running:
+        assert thread.is_alive(), "serwer zakończył się przed rozpoczęciem nasłuchu"
+        assert time.monotonic() < deadline, "serwer nie zaczął nasłuchiwać"
+        time.sleep(0.01)
+    return thread
+
+
+@pytest.fixture(params=["threaded", "async"])
+def mode(request):
+    return request.param
+
+
+def _running_server(mode, ack_mode="batch", **kwargs):
+    logger = _Collector()
+    server = NetworkServer(logger=logger, mode=mode, ack_mode=ack_mode, **kwargs)
+    server.configure(_free_port())
+    return server, logger, _start(server)
+
+
+def _exchange(port, payload, replies):
+    """
+    Wysyła surowe dane i zwraca `replies` linii odpowiedzi serwera.
+    """
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(payload)
+        data = b""
+        while data.count(b"\n") < replies:
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    return data.decode().splitlines()
+
+
+def test_batch_mode_acks_and_naks_counts(mode):
+    server, logger, thread = _running_server(mode)
+    try:
+        lines = [json.dumps(_reading(i)).encode() for i in range(3)] + [b"not json"]
+        replies = _exchange(server.port, b"\n".join(lines) + b"\n", 2)
+    finally:
+        server.stop()
+        thread.join(5)
+    assert replies == ["ACK 3", "NAK 1"]
+    assert len(logger.rows) == 3
+
+
+def test_line_mode_replies_to_every_reading(mode):
+    server, logger, thread = _running_server(mode, ack_mode="line")
+    try:
+        lines = [json.dumps(_reading(i)).encode() for i in range(4)] + [b"not json"]
+        replies = _exchange(server.port, b"\n".join(lines) + b"\n", 5)
+    finally:
+        server.stop()
+        thread.join(5)
+    assert replies == ["ACK"] * 4 + ["NAK"]
+    assert [row[2] for row in logger.rows] == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_malformed_record_is_naked_without_duplicates(mode):
+    server, logger, thread = _running_server(mode)
+    records = [_reading(i) for i in range(100)]
+    del records[10]["unit"]
+    records[50]["timestamp"] = "wczoraj"
+    client = NetworkClient("127.0.0.1", server.port, batch_size=10, window=40)
+    try:
+        acked, done = client.deliver(records)
+    finally:
+        client.close()
+        server.stop()
+        thread.join(5)
+    # błędny rekord nie zrywa połączenia, więc paczka nie jest wysyłana ponownie
+    assert (acked, done) == (98, 100)
+    values = sorted(row[2] for row in logger.rows)
+    assert values == [float(i) for i in range(100) if i not in (10, 50)]
+
+
+def test_malformed_record_in_line_mode_is_naked_without_duplicates(mode):
+    server, logger, thread = _running_server(mode, ack_mode="line")
+    records = [_reading(i) for i in range(6)]
+    records[2]["timestamp"] = "wczoraj"
+    client = NetworkClient("127.0.0.1", server.port, batch_size=2, window=4)
+    try:
+        started = time.monotonic()
+        acked, done = client.deliver(records)
+        elapsed = time.monotonic() - started
+    finally:
+        client.close()
+        server.stop()
+        thread.join(5)
+    # każdy odczyt dostaje odpowiedź, więc klient nie czeka na brakujące ACK
+    assert (acked, done) == (5, 6)
+    assert elapsed < 0.5
+    assert sorted(row[2] for row in logger.rows) == [0.0, 1.0, 3.0, 4.0, 5.0]
+
+
+@pytest.mark.parametrize("ack_mode", ["line", "batch"])
+def test_send_does_not_retry_or_spool_naked_record(mode, ack_mode, tmp_path):
+    server, logger, thread = _running_server(mode, ack_mode=ack_mode)
+    bad = _reading(1)
+    bad["timestamp"] = "wczoraj"
+    client = NetworkClient("127.0.0.1", server.port, outbox_dir=str(tmp_path / "outbox"))
+    try:
+        started = time.monotonic()
+        assert client.send(bad) is False
+        assert time.monotonic() - started < 0.5
+        assert client.outbox.empty()
+        assert client.send(_reading(2)) is True
+    finally:
+        client.close()
+        server.stop()
+        thread.join(5)
+    assert [row[2] for row in logger.rows] == [2.0]
+
+
+def test_binary_protocol_negotiation(mode):
+    server, logger, thread = _running_server(mode)
+    client = NetworkClient("127.0.0.1", server.port, protocol="binary", batch_size=7)
+    records = [_reading(i, f"S{i % 3}") for i in range(50)]
+    try:
+        client.connect()
+        assert client.wire == "binary"
+        assert client.send_many(records) == 50
+    finally:
+        client.close()
+        server.stop()
+        thread.join(5)
+    assert logger.rows == [
+        (data["sensor_id"], datetime.fromisoformat(data["timestamp"]), data["value"], data["unit"])
+        for data in records
+    ]
+
+
+def test_unknown_protocol_falls_back_to_json(mode):
+    server, logger, thread = _running_server(mode)
+    try:
+        payload = b"PROTO XYZ\n" + json.dumps(_reading(1)).encode() + b"\n"
+        replies = _exchange(server.port, payload, 2)
+        assert _exchange(server.port, BINARY_HELLO + b"\n", 1) == [BINARY_HELLO.decode()]
+    finally:
+        server.stop()
+        thread.join(5)
+    assert replies == ["PROTO JSON", "ACK 1"]
+    assert len(logger.rows) == 1
+
+
+@pytest.mark.parametrize("server_mode", ["threaded", "async", "multiprocess"])
+def test_stop_before_start_is_not_lost(server_mode):
+    server = NetworkServer(mode=server_mode, workers=1)
+    server.configure(_free_port())
+    server.stop()
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive()
+    assert not server.running
+
+
+def test_multiprocess_shutdown_keeps_acked_readings():
+    server, logger, thread = _running_server("multiprocess", workers=2)
+    acked = []
+
+    def send(client_id):
+        client = NetworkClient("127.0.0.1", server.port, batch_size=50, window=200)
+        acked.append(client.send_many([_reading(i, f"S{client_id}") for i in range(2000)]))
+        client.close()
+
+    clients = [threading.Thread(target=send, args=(i,)) for i in range(4)]
+    for t in clients:
+        t.start()
+    for t in clients:
+        t.join()
+    # zatrzymanie zaraz po ostatnim ACK: odczyty w buforach procesów roboczych nie mogą zginąć
+    server.stop()
+    thread.join(30)
+    assert not thread.is_alive()
+    assert sum(acked) == 8000
+    assert len(logger.rows) == 8000
+
+
+def test_multiprocess_fails_when_worker_cannot_listen():
+    # port zajęty bez SO_REUSEPORT - procesy robocze nie mogą się do niego dowiązać
+    with socket.socket() as blocker:
+        blocker.bind(("0.0.0.0", 0))
+        blocker.listen()
+        server = NetworkServer(mode="multiprocess", workers=2)
+        server.configure(blocker.getsockname()[1])
+        with pytest.raises(RuntimeError):
+            server.start()
+    assert not server.running
+
+
+def test_default_ack_mode_matches_settings():
+    settings_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "settings.json")
+    with open(settings_path) as f:
+        settings = json.load(f)
+    assert settings["ack_mode"] == DEFAULT_ACK_MODE
+    assert NetworkServer().ack_mode == DEFAULT_ACK_MODE
+
+
+class _SlowCollector(_Collector):
+    """
+    Collector, którego zapis odczytów czujnika "SLOW" trwa długo (np. fsync).
+    """
+
+    def log_reading(self, sensor_id, timestamp, value, unit):
+        if sensor_id == "SLOW":
+            time.sleep(0.5)
+        super().log_reading(sensor_id, timestamp, value, unit)
+
+
+def test_slow_logger_does_not_block_other_connections(mode):
+    logger = _SlowCollector()
+    server = NetworkServer(logger=logger, mode=mode)
+    server.configure(_free_port())
+    thread = _start(server)
+    slow = threading.Thread(target=_exchange, args=(server.port, json.dumps(_reading(1, "SLOW")).encode() + b"\n", 1))
+    try:
+        slow.start()
+        time.sleep(0.1)
+        started = time.monotonic()
+        replies = _exchange(server.port, json.dumps(_reading(2)).encode() + b"\n", 1)
+        elapsed = time.monotonic() - started
+        slow.join(5)
+    finally:
+        server.stop()
+        thread.join(5)
+    assert replies == ["ACK 1"]
+    assert elapsed < 0.3
+    assert len(logger.rows) == 2
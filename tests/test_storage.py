@@ -0,0 +1,546 @@
+import io
+import json
+import os
+import random
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from Logger import Logger
+from storage import columnar, csv_scan, log_index, log_sources
+from storage.downsample import MinMaxDownsampler
+from storage.query_cache import MISSING, QueryCache
+from storage.readings_store import ReadingsStore
+
+
+def _expected(samples, now, seconds):
+    values = [value for ts, value in samples if ts >= now - seconds]
+    mean = sum(values) / len(values)
+    return {
+        "count": len(values),
+        "mean": mean,
+        "min": min(values),
+        "max": max(values),
+        "variance": sum((v - mean) ** 2 for v in values) / len(values),
+    }
+
+
+def _assert_stats(stats, expected):
+    assert stats["count"] == expected["count"]
+    for key in ("mean", "min", "max", "variance"):
+        assert stats[key] == pytest.approx(expected[key], abs=1e-6)
+
+
+def test_late_reading_outside_window_is_not_averaged():
+    store = ReadingsStore(12 * 3600)
+    store.register_window(3600)
+    now = time.time()
+    store.append("T1", now - 60, 10.0, "C")
+    # spóźniony odczyt sprzed 2 h (np. z outboxa) nie należy do okna 1 h
+    store.append("T1", now - 7200, 100.0, "C")
+
+    stats = store.window_stats("T1", 3600)
+    assert stats["count"] == 1
+    assert stats["mean"] == 10.0
+    assert stats["max"] == 10.0
+
+
+def test_late_reading_inside_window_is_included():
+    store = ReadingsStore(12 * 3600)
+    store.register_window(3600)
+    now = time.time()
+    store.append("T1", now - 60, 10.0, "C")
+    store.append("T1", now - 120, 30.0, "C")
+
+    stats = store.window_stats("T1", 3600)
+    assert stats["count"] == 2
+    assert stats["mean"] == 20.0
+    assert stats["max"] == 30.0
+    assert store.latest("T1")[1] == 10.0
+
+
+def test_out_of_order_readings_match_brute_force():
+    rng = random.Random(7)
+    store = ReadingsStore(3 * 3600)
+    store.register_window(1800)
+    store.register_window(3600)
+    now = time.time()
+    samples = []
+    for i in range(3000):
+        ts = now - 3 * 3600 + i * 3.6
+        if rng.random() < 0.1:
+            ts -= rng.uniform(0, 7200)
+        value = rng.uniform(-50, 50)
+        samples.append((ts, value))
+        store.append("T1", ts, value, "C")
+
+    series = store.series("T1")
+    timestamps = list(series.timestamps[series.head:])
+    assert timestamps == sorted(timestamps)
+    for seconds in (1800, 3600):
+        _assert_stats(store.window_stats("T1", seconds), _expected(samples, time.time(), seconds))
+
+
+def test_unregistered_window_is_computed_without_registering():
+    store = ReadingsStore(3600)
+    now = time.time()
+    samples = [(now - 3000 + i, float(i % 17)) for i in range(3000)]
+    for ts, value in samples:
+        store.append("T1", ts, value, "C")
+
+    _assert_stats(store.scan_stats("T1", 600), _expected(samples, time.time(), 600))
+    assert not store.has_window(600)
+    assert store.retention_seconds == 3600
+    assert store.scan_stats("X", 600) is None
+
+
+def _rows(count, start=datetime(2025, 1, 1, 12, 0, 0)):
+    rng = random.Random(3)
+    return [
+        (start + timedelta(microseconds=i * 250_001), f"S{i % 5}", rng.uniform(-50, 50), "C" if i % 2 else "%")
+        for i in range(count)
+    ]
+
+
+def test_columnar_round_trip(tmp_path):
+    path = str(tmp_path / "sensors.col")
+    rows = _rows(1000)
+    writer = columnar.ColumnarWriter(path, block_rows=256)
+    writer.write_rows(rows[:600])
+    writer.write_rows(rows[600:])
+    writer.close()
+
+    with open(path, "rb") as f:
+        assert [h.rows for h in columnar.iter_block_headers(f)] == [256, 256, 256, 232]
+        assert list(columnar.scan(f, rows[0][0], rows[-1][0])) == rows
+        # zakres i filtr czujnika pomijają niepasujące bloki i wiersze
+        start, end = rows[300][0], rows[399][0]
+        assert list(columnar.scan(f, start, end, "S2")) == [r for r in rows[300:400] if r[1] == "S2"]
+        assert len(columnar.matching_blocks(f, columnar.to_micros(start), columnar.to_micros(end))) == 1
+
+
+def test_columnar_writer_drops_incomplete_block(tmp_path):
+    path = str(tmp_path / "sensors.col")
+    rows = _rows(300)
+    writer = columnar.ColumnarWriter(path, block_rows=100)
+    writer.write_rows(rows[:200])
+    writer.close()
+    # przerwany zapis: połowa kolejnego bloku
+    with open(path, "ab") as f:
+        f.write(columnar.encode_block(rows[200:])[:40])
+
+    writer = columnar.ColumnarWriter(path, block_rows=100)
+    writer.write_rows(rows[200:])
+    writer.close()
+    with open(path, "rb") as f:
+        assert list(columnar.scan(f, rows[0][0], rows[-1][0])) == rows
+
+
+def _logger(tmp_path, **config):
+    settings = {
+        "log_dir": str(tmp_path / "logs"), "filename_pattern": "sensors_%Y%m%d.csv", "buffer_size": 10,
+        "rotate_every_hours": 24, "max_size_mb": 100, "retention_days": 30, "query_cache_mb": 0,
+        "flush_interval_ms": 0,
+    }
+    settings.update(config)
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(settings))
+    logger = Logger(str(config_path))
+    logger.start()
+    return logger
+
+
+def test_late_rows_in_current_csv_are_found(tmp_path):
+    logger = _logger(tmp_path)
+    now = datetime.now().replace(microsecond=0)
+    for i in range(100):
+        logger.log_reading("T1", now - timedelta(seconds=3600 - i * 36), 20.0, "C")
+    late = now - timedelta(hours=2)
+    for i in range(20):
+        logger.log_reading("T1", late + timedelta(seconds=i), 30.0, "C")
+    logger.stop()
+
+    path = os.path.join(logger.log_dir, logger.current_filename)
+    assert not csv_scan.is_ordered(path)
+    start, end = late - timedelta(minutes=1), late + timedelta(minutes=1)
+
+    # dopisywanie po ponownym uruchomieniu zachowuje znacznik
+    logger = _logger(tmp_path)
+    assert len(list(logger.read_logs(start, end))) == 20
+    result = logger.query(["T1"], start, end, resample=None, aggs=("count", "mean"))
+    assert result["T1"]["count"][0] == 20
+    assert result["T1"]["mean"][0] == 30.0
+
+    # po rotacji znacznik przechodzi na plik w archive/, a po kompresji znika
+    logger._rotate()
+    logger.stop()
+    assert len(list(logger.read_logs(start, end))) == 20
+    assert not any(name.endswith(csv_scan.UNORDERED_SUFFIX) for name in os.listdir(os.path.join(logger.log_dir, "archive")))
+
+
+def test_writer_marks_file_after_restart(tmp_path):
+    logger = _logger(tmp_path)
+    now = datetime.now().replace(microsecond=0)
+    for i in range(10):
+        logger.log_reading("T1", now - timedelta(seconds=10 - i), 1.0, "C")
+    logger.stop()
+    path = os.path.join(logger.log_dir, logger.current_filename)
+    assert csv_scan.is_ordered(path)
+
+    # najnowszy znacznik odtworzony z końca istniejącego pliku
+    logger = _logger(tmp_path)
+    for i in range(10):
+        logger.log_reading("T1", now - timedelta(hours=3), 2.0, "C")
+    logger.stop()
+    assert not csv_scan.is_ordered(path)
+
+
+def test_concurrent_writers_with_rotation_write_every_row_once(tmp_path):
+    logger = _logger(tmp_path, buffer_size=50, rotate_after_lines=500, flush_interval_ms=5)
+    start = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+    threads, per_thread = 8, 2000
+
+    def produce(n):
+        for i in range(per_thread):
+            logger.log_reading(f"S{n}", start + timedelta(milliseconds=i), float(n * per_thread + i), "C")
+
+    workers = [threading.Thread(target=produce, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    logger.stop()
+
+    assert logger.rotations > 0
+    values = sorted(row[2] for row in logger.read_rows(start, start + timedelta(hours=1)))
+    assert values == [float(v) for v in range(threads * per_thread)]
+
+
+def test_full_buffer_is_written_when_io_lock_is_busy(tmp_path):
+    logger = _logger(tmp_path, buffer_size=5, flush_interval_ms=0)
+    now = datetime.now()
+    logger._io_lock.acquire()
+    writer = threading.Thread(target=lambda: [logger.log_reading("T1", now, float(i), "C") for i in range(5)])
+    writer.start()
+    time.sleep(0.1)
+    # zapis trwający w innym wątku kończy się, nie zapisawszy podmienionego bufora
+    logger._io_lock.release()
+    writer.join(5)
+    try:
+        assert not logger._pending
+        assert logger.line_count == 5
+    finally:
+        logger.stop()
+
+
+def test_parallel_and_sequential_reads_return_the_same_rows(tmp_path):
+    logger = _logger(tmp_path, buffer_size=20, rotate_after_lines=100)
+    start = datetime.now().replace(microsecond=0) - timedelta(hours=2)
+    for i in range(450):
+        logger.log_reading(f"S{i % 3}", start + timedelta(seconds=i), float(i), "C")
+    # spóźnione odczyty trafiają do bieżącego pliku, a należą do zakresu archiwów
+    for i in range(30):
+        logger.log_reading("S0", start + timedelta(seconds=i * 7, milliseconds=500), -float(i), "C")
+    logger.stop()
+    assert logger.rotations >= 4
+
+    end = start + timedelta(hours=1)
+    sequential = list(logger.read_rows(start, end, workers=1))
+    parallel = list(logger.read_rows(start, end, workers=2))
+    assert len(sequential) == 480
+    assert sequential == parallel
+    assert [row[0] for row in sequential] == sorted(row[0] for row in sequential)
+    unordered = list(logger.read_rows(start, end, workers=2, ordered=False))
+    assert sorted(unordered) == sorted(sequential)
+    assert list(logger.read_rows(start, end, "S1", workers=2)) == [row for row in sequential if row[1] == "S1"]
+    logger.stop()
+
+
+def test_index_prunes_blocks_by_time_and_sensor():
+    rows = _rows(1000)
+    lines = [b"timestamp,sensor_id,value,unit\n"]
+    # czujnik S9 tylko w ostatnich 50 wierszach
+    for i, (ts, sensor, value, unit) in enumerate(rows):
+        lines.append(f"{ts.isoformat()},{'S9' if i >= 950 else sensor},{value},{unit}\n".encode())
+    index = log_index.build_index(io.BytesIO(b"".join(lines)), member="sensors.csv", block_rows=100)
+
+    assert index["rows"] == 1000
+    assert [block["rows"] for block in index["blocks"]] == [100] * 10
+    assert index["min_ts"] == rows[0][0].timestamp()
+    assert index["max_ts"] == rows[-1][0].timestamp()
+
+    start, end = rows[250][0].timestamp(), rows[349][0].timestamp()
+    blocks = log_index.matching_blocks(index, start, end)
+    assert [block["offset"] for block in blocks] == [block["offset"] for block in index["blocks"][2:4]]
+    assert log_index.matching_blocks(index, start, end, "S9") == []
+    assert len(log_index.matching_blocks(index, index["min_ts"], index["max_ts"], "S9")) == 1
+    assert log_index.matching_blocks(index, index["max_ts"] + 1, index["max_ts"] + 2) == []
+
+    # czytane są tylko wskazane bloki
+    data = io.BytesIO(b"".join(lines))
+    found = list(log_sources.csv_lines(data, blocks))
+    assert [row[0] for row in found] == [ts.isoformat() for ts, *_ in rows[200:400]]
+
+
+def test_read_logs_does_not_open_archives_outside_range(tmp_path):
+    logger = _logger(tmp_path, buffer_size=50, rotate_after_lines=100)
+    start = datetime.now().replace(microsecond=0) - timedelta(hours=5)
+    for i in range(400):
+        logger.log_reading("T1", start + timedelta(seconds=30 * i), float(i), "C")
+    logger.stop()
+
+    archive_dir = os.path.join(logger.log_dir, "archive")
+    archives = sorted(name for name in os.listdir(archive_dir) if name.endswith(".zip"))
+    assert len(archives) == 4
+    indexes = [log_index.load_index(os.path.join(archive_dir, name)) for name in archives]
+    assert [index["rows"] for index in indexes] == [100] * 4
+
+    # archiwum spoza zakresu uszkodzone - odczyt musi je pominąć na podstawie indeksu
+    with open(os.path.join(archive_dir, archives[0]), "wb") as f:
+        f.write(b"to nie jest zip")
+    first, last = start + timedelta(seconds=30 * 150), start + timedelta(seconds=30 * 249)
+    assert [row["value"] for row in logger.read_logs(first, last)] == [float(i) for i in range(150, 250)]
+
+    # przebudowa odtwarza usunięte indeksy archiwów (i indeksuje bieżący plik CSV)
+    os.remove(os.path.join(archive_dir, archives[0]))
+    os.remove(log_index.index_path(os.path.join(archive_dir, archives[0])))
+    for name in archives[1:]:
+        os.remove(log_index.index_path(os.path.join(archive_dir, name)))
+    assert log_index.rebuild(logger.log_dir) == len(archives[1:]) + 1
+    assert [log_index.load_index(os.path.join(archive_dir, name)) for name in archives[1:]] == indexes[1:]
+
+
+def _brute_force(rows, origin, step, aggs):
+    # {sensor_id: {początek przedziału (epoch): {agregat: wartość}}}
+    np = pytest.importorskip("numpy")
+    buckets = {}
+    for ts, sensor, value, _ in rows:
+        bucket = origin + ((ts - origin) // step) * step
+        buckets.setdefault(sensor, {}).setdefault(bucket.timestamp(), []).append(value)
+    functions = {"count": len, "mean": np.mean, "min": np.min, "max": np.max, "std": np.std,
+                 "p95": lambda values: np.percentile(values, 95)}
+    return {
+        sensor: {ts: {agg: functions[agg](values) for agg in aggs} for ts, values in sorted(series.items())}
+        for sensor, series in buckets.items()
+    }
+
+
+def test_query_matches_brute_force(tmp_path):
+    pytest.importorskip("numpy")
+    logger = _logger(tmp_path, buffer_size=50, rotate_after_lines=300)
+    rng = random.Random(5)
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    start = day + timedelta(hours=10, seconds=17)
+    for i in range(1000):
+        logger.log_reading(f"S{i % 3}", start + timedelta(seconds=i * 1.3), rng.uniform(-20, 40), "C")
+    logger.stop()
+    assert logger.rotations == 3
+
+    aggs = ("count", "mean", "min", "max", "std", "p95")
+    end = start + timedelta(seconds=1000)
+    rows = list(logger.read_rows(start, end))
+    expected = _brute_force(rows, day, timedelta(minutes=1), aggs)
+    result = logger.query(None, start, end, resample="1min", aggs=aggs)
+    assert sorted(result) == ["S0", "S1", "S2"]
+    for sensor, series in expected.items():
+        assert list(result[sensor]["timestamp"]) == list(series)
+        for agg in aggs:
+            assert list(result[sensor][agg]) == pytest.approx([bucket[agg] for bucket in series.values()])
+
+    # bez podziału na przedziały - jeden wiersz dla czujnika
+    result = logger.query(["S1"], start, end, resample=None, aggs=("count", "max"))
+    values = [row[2] for row in rows if row[1] == "S1"]
+    assert list(result) == ["S1"]
+    assert result["S1"]["count"][0] == len(values)
+    assert result["S1"]["max"][0] == max(values)
+
+
+def test_rotation_archives_in_background_and_applies_retention(tmp_path):
+    archive_dir = tmp_path / "logs" / "archive"
+    archive_dir.mkdir(parents=True)
+    # stare archiwum (z indeksem) do usunięcia przez retencję
+    old = archive_dir / "sensors_20240101.csv_20240102_000000.zip"
+    with zipfile.ZipFile(old, "w") as zipf:
+        zipf.writestr("sensors_20240101.csv", "timestamp,sensor_id,value,unit\n")
+    log_index.index_archive(str(old))
+    expired = time.time() - 40 * 86400
+    os.utime(old, (expired, expired))
+
+    logger = _logger(tmp_path, buffer_size=50, rotate_after_lines=100)
+    start = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+    for i in range(300):
+        logger.log_reading("T1", start + timedelta(seconds=i), float(i), "C")
+    logger.stop()
+
+    metrics = logger.get_rotation_metrics()
+    assert metrics["rotations"] == 3
+    assert metrics["archives_completed"] == 3
+    assert metrics["archives_failed"] == 0
+    assert metrics["archives_pending"] == 0
+    names = sorted(os.listdir(archive_dir))
+    assert not old.exists()
+    assert not os.path.exists(log_index.index_path(str(old)))
+    # po archiwizacji zostają tylko archiwa ZIP z indeksami, bez plików oczekujących
+    zips = [name for name in names if name.endswith(".zip")]
+    assert len(zips) == 3
+    assert sorted(names) == sorted(zips + [name + log_index.INDEX_SUFFIX for name in zips])
+    with zipfile.ZipFile(archive_dir / zips[0]) as zipf:
+        assert zipf.namelist() == [logger.current_filename]
+    assert [row[2] for row in logger.read_rows(start, start + timedelta(hours=1))] == [float(i) for i in range(300)]
+
+
+def test_pending_archive_is_resumed_on_start(tmp_path):
+    archive_dir = tmp_path / "logs" / "archive"
+    archive_dir.mkdir(parents=True)
+    start = datetime.now().replace(microsecond=0) - timedelta(hours=1)
+    # plik przeniesiony do archive/ przez rotację przerwanego procesu
+    pending = archive_dir / "sensors_20250101.csv_20250102_000000.csv"
+    lines = ["timestamp,sensor_id,value,unit"]
+    lines += [f"{(start + timedelta(seconds=i)).isoformat()},T1,{float(i)},C" for i in range(20)]
+    pending.write_text("\n".join(lines) + "\n")
+
+    logger = _logger(tmp_path)
+    logger.stop()
+    assert not pending.exists()
+    archive = archive_dir / "sensors_20250101.csv_20250102_000000.zip"
+    with zipfile.ZipFile(archive) as zipf:
+        assert zipf.namelist() == ["sensors_20250101.csv"]
+    assert log_index.load_index(str(archive))["rows"] == 20
+    assert len(list(logger.read_rows(start, start + timedelta(minutes=1)))) == 20
+
+
+@pytest.mark.parametrize("policy", ["never", "batch", "interval"])
+def test_group_commit_and_fsync_policy(tmp_path, policy):
+    logger = _logger(tmp_path, buffer_size=10, fsync=policy, fsync_interval_s=3600)
+    now = datetime.now()
+    for i in range(100):
+        logger.log_reading("T1", now, float(i), "C")
+    # pełny bufor to jedna paczka: jeden zapis (i jeden fsync w polityce "batch";
+    # w polityce "interval" fsync dopiero po `fsync_interval_s`)
+    metrics = logger.get_write_metrics()
+    assert metrics["batches"] == 10
+    assert metrics["fsync_policy"] == policy
+    assert metrics["fsyncs"] == {"never": 0, "batch": 10, "interval": 0}[policy]
+    logger.log_reading("T1", now, 100.0, "C")
+    logger.stop()
+    # zatrzymanie zapisuje niepełny bufor; niezsynchronizowane dane dostają fsync
+    assert logger.get_write_metrics()["batches"] == 11
+    assert logger.fsyncs == {"never": 0, "batch": 11, "interval": 1}[policy]
+
+
+def test_unknown_fsync_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        _logger(tmp_path, fsync="always")
+
+
+def test_partial_buffer_is_flushed_after_interval(tmp_path):
+    logger = _logger(tmp_path, buffer_size=1000, flush_interval_ms=20)
+    now = datetime.now()
+    try:
+        for i in range(5):
+            logger.log_reading("T1", now, float(i), "C")
+        assert logger.line_count == 0
+        deadline = time.monotonic() + 5
+        while logger.line_count < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # rzadko raportujący czujnik: wiersze zapisane bez zapełnienia bufora
+        assert logger.line_count == 5
+        assert logger.get_write_metrics()["batches"] == 1
+        assert len(list(logger.read_rows(now, now))) == 5
+    finally:
+        logger.stop()
+
+
+def test_query_cache_is_invalidated_by_late_write(tmp_path):
+    pytest.importorskip("numpy")
+    logger = _logger(tmp_path, query_cache_mb=1)
+    start = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=1)
+    for i in range(600):
+        logger.log_reading("T1", start + timedelta(seconds=i), 1.0, "C")
+    logger._flush()
+    end = start + timedelta(minutes=10) - timedelta(microseconds=1)
+
+    first = logger.query(["T1"], start, end, aggs=("count", "sum"))
+    misses = logger.get_cache_metrics()["cache_misses"]
+    second = logger.query(["T1"], start, end, aggs=("count", "sum"))
+    metrics = logger.get_cache_metrics()
+    # zamknięte przedziały (10 minut x 2 agregaty) wzięte z pamięci
+    assert metrics["cache_hits"] == 20
+    assert metrics["cache_misses"] == misses
+    assert list(second["T1"]["count"]) == list(first["T1"]["count"]) == [60] * 10
+
+    # spóźniony odczyt (np. z outboxa) w już zapamiętanym przedziale
+    logger.log_reading("T1", start + timedelta(minutes=3, seconds=30), 5.0, "C")
+    logger._flush()
+    assert logger.get_cache_metrics()["cache_invalidations"] > 0
+    result = logger.query(["T1"], start, end, aggs=("count", "sum"))
+    assert list(result["T1"]["count"]) == [60, 60, 60, 61] + [60] * 6
+    assert result["T1"]["sum"][3] == 65.0
+    logger.stop()
+
+
+def test_query_cache_drops_results_computed_before_invalidation():
+    cache = QueryCache(max_bytes=10_000)
+    generation = cache.begin(1_000)
+    cache.note_write(500)
+    # wynik liczony przed zapisem mógł nie uwzględnić nowych wierszy
+    assert cache.put_many([(("T1", 100, 0, "mean"), 1.0)], generation) is False
+    generation = cache.begin(1_000)
+    assert cache.put_many([(("T1", 100, 0, "mean"), 1.0)], generation) is True
+    assert cache.get_many([("T1", 100, 0, "mean"), ("T1", 100, 100, "mean")]) == [1.0, MISSING]
+
+    # LRU: przy przekroczeniu limitu usuwane są najdawniej używane wpisy
+    cache.put_many([(("T1", 100, k * 100, "mean"), float(k)) for k in range(1, 200)], generation)
+    metrics = cache.metrics()
+    assert metrics["cache_evictions"] > 0
+    assert metrics["cache_bytes"] <= 10_000
+    assert cache.get_many([("T1", 100, 199 * 100, "mean")]) == [199.0]
+
+
+def _expected_points(samples, now, span, width):
+    # brute force: min i max odczytów każdego przedziału okna
+    bucket_seconds = span / width
+    first = int(now // bucket_seconds) - width + 1
+    buckets = {}
+    for ts, value in samples:
+        bucket = int(ts // bucket_seconds)
+        if bucket >= first:
+            low, high = buckets.get(bucket, (value, value))
+            buckets[bucket] = (min(low, value), max(high, value))
+    return [(bucket - first, low, high) for bucket, (low, high) in sorted(buckets.items())]
+
+
+def test_downsampler_keeps_min_and_max_of_every_bucket():
+    rng = random.Random(11)
+    store = ReadingsStore(2 * 3600)
+    span, width = 3600, 120
+    trend = MinMaxDownsampler("T1", span, width)
+    now = time.time() - 2 * 3600
+    samples = []
+    for step in range(40):
+        for _ in range(100):
+            now += 1.5
+            value = rng.gauss(20, 5)
+            # krótkie skoki muszą pozostać widoczne
+            if rng.random() < 0.01:
+                value += 100
+            samples.append((now, value))
+            store.append("T1", now, value, "C")
+        # aktualizacja przetwarza tylko nowe odczyty serii
+        trend.update(store.series("T1"), now)
+        assert trend.points(now) == _expected_points(samples, now, span, width)
+    assert len(trend.points(now)) == width
+    assert trend.value_range() == (
+        min(low for _, low, _ in trend.points(now)), max(high for _, _, high in trend.points(now))
+    )
+
+    # spóźniony odczyt (np. z outboxa) trafia do właściwego przedziału
+    late = (now - 1800, -50.0)
+    samples.append(late)
+    store.append("T1", *late, "C")
+    trend.update(store.series("T1"), now)
+    assert trend.points(now) == _expected_points(samples, now, span, width)
+    assert trend.value_range()[0] == -50.0